@@ -47,6 +47,7 @@ DJANGO_APPS = [
     "django.contrib.messages",
     "django.contrib.staticfiles",
     "django.contrib.admin",
+    "django.contrib.postgres",
 ]
 THIRD_PARTY_APPS = [
     "corsheaders",
@@ -142,6 +143,69 @@ CORS_URLS_REGEX = r"^/api/.*$"
 
 DEFAULT_XRPL_ACCOUNT = "SYSTEM"
 DEFAULT_XRPL_ASSET = "XRP drops"
+# https://xrpl.org/account_tx.html
+XRPL_ACCOUNT_TX_PAGE_LIMIT = env.int("XRPL_ACCOUNT_TX_PAGE_LIMIT", default=200)
+# Max number of account_tx pages requested per sync, unlimited if not set
+XRPL_ACCOUNT_TX_MAX_PAGES = env.int("XRPL_ACCOUNT_TX_MAX_PAGES", default=None)
+# Payments are range partitioned by ledger_idx, partitions of that many
+# ledgers are created up to the given number of ranges ahead of the highest
+# stored ledger, see `manage.py create_payment_partitions`
+XRPL_LEDGER_PARTITION_SIZE = env.int("XRPL_LEDGER_PARTITION_SIZE",
+                                     default=10_000_000)
+XRPL_LEDGER_PARTITIONS_AHEAD = env.int("XRPL_LEDGER_PARTITIONS_AHEAD",
+                                       default=1)
+# Primary keys of accounts and assets kept by each process for ingestion
+XRPL_ACCOUNT_CACHE_SIZE = env.int("XRPL_ACCOUNT_CACHE_SIZE", default=100_000)
+XRPL_ASSET_CACHE_SIZE = env.int("XRPL_ASSET_CACHE_SIZE", default=10_000)
+# Inserts of ingested rows: "orm" for bulk_create, "copy" to stream them
+# with COPY through a staging table, much faster on large backfills
+XRPL_PAYMENTS_LOADER = env.str("XRPL_PAYMENTS_LOADER", default="orm")
+# Connection pools of XRPL nodes, HTTP/2 is used if the h2 package is
+# installed. Timeouts are in seconds
+XRPL_HTTP2 = env.bool("XRPL_HTTP2", default=True)
+XRPL_HTTP_TIMEOUT = env.float("XRPL_HTTP_TIMEOUT", default=10.0)
+XRPL_HTTP_CONNECT_TIMEOUT = env.float("XRPL_HTTP_CONNECT_TIMEOUT", default=5.0)
+XRPL_HTTP_MAX_CONNECTIONS = env.int("XRPL_HTTP_MAX_CONNECTIONS", default=20)
+XRPL_HTTP_MAX_KEEPALIVE = env.int("XRPL_HTTP_MAX_KEEPALIVE", default=10)
+XRPL_HTTP_KEEPALIVE_EXPIRY = env.float("XRPL_HTTP_KEEPALIVE_EXPIRY",
+                                       default=30.0)
+# Nodes of syncs requested without a URL, each request goes to the fastest
+# available one and fails over to the others within the deadline (seconds)
+XRPL_NODES = env.list(
+    "XRPL_NODES",
+    default=["https://s1.ripple.com:51234/", "https://s2.ripple.com:51234/"],
+)
+XRPL_REQUEST_DEADLINE = env.float("XRPL_REQUEST_DEADLINE", default=30.0)
+# Nodes health: number of last requests kept for latency percentiles and
+# error rates, consecutive failures which open the circuit of a node and
+# seconds before an open circuit lets a probe request through
+XRPL_NODE_WINDOW = env.int("XRPL_NODE_WINDOW", default=100)
+XRPL_NODE_FAILURE_THRESHOLD = env.int("XRPL_NODE_FAILURE_THRESHOLD", default=5)
+XRPL_NODE_RESET_TIMEOUT = env.float("XRPL_NODE_RESET_TIMEOUT", default=30.0)
+# Batch syncs: accounts per request, histories requested at once and
+# transactions stored per DB transaction, or fewer after the interval
+# (seconds) which also reports the job progress
+XRPL_BATCH_MAX_ACCOUNTS = env.int("XRPL_BATCH_MAX_ACCOUNTS", default=5000)
+XRPL_BATCH_CONCURRENCY = env.int("XRPL_BATCH_CONCURRENCY", default=8)
+XRPL_BATCH_FLUSH_SIZE = env.int("XRPL_BATCH_FLUSH_SIZE", default=5000)
+XRPL_BATCH_FLUSH_INTERVAL = env.float("XRPL_BATCH_FLUSH_INTERVAL",
+                                      default=60.0)
+# Sync jobs worker, see `manage.py run_payment_jobs`
+XRPL_JOB_POLL_INTERVAL = env.float("XRPL_JOB_POLL_INTERVAL", default=1.0)
+# Running jobs without progress for that long are handed to another worker
+XRPL_JOB_STALE_TIMEOUT = env.int("XRPL_JOB_STALE_TIMEOUT", default=600)
+# account_tx entries stored per transaction by `manage.py import_account_tx`
+XRPL_IMPORT_BATCH_SIZE = env.int("XRPL_IMPORT_BATCH_SIZE", default=10_000)
+# Live payments stream, see `manage.py stream_payments`: streamed
+# transactions are stored once that many are buffered or after the interval
+# (seconds), a lost connection is retried after the delay, doubled up to a
+# minute while connecting fails
+XRPL_STREAM_URL = env.str("XRPL_STREAM_URL", default="wss://s1.ripple.com/")
+XRPL_STREAM_FLUSH_SIZE = env.int("XRPL_STREAM_FLUSH_SIZE", default=500)
+XRPL_STREAM_FLUSH_INTERVAL = env.float("XRPL_STREAM_FLUSH_INTERVAL",
+                                       default=1.0)
+XRPL_STREAM_RECONNECT_DELAY = env.float("XRPL_STREAM_RECONNECT_DELAY",
+                                        default=1.0)
 
 
 # REST FRAMEWORK
@@ -155,6 +219,26 @@ REST_FRAMEWORK = {
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.LimitOffsetPagination",
     "PAGE_SIZE": 50,
 }
+# List endpoints report planner estimates instead of exact counts for
+# results of at least that many rows
+COUNT_ESTIMATE_THRESHOLD = env.int("COUNT_ESTIMATE_THRESHOLD", default=100_000)
+# Rows fetched per round trip by the server-side cursor of exports
+EXPORT_CHUNK_SIZE = env.int("EXPORT_CHUNK_SIZE", default=5000)
+
+
+# CACHES
+# https://docs.djangoproject.com/en/4.1/ref/settings/#caches
+# e.g. filecache:///var/tmp/xrpl-cache, the backend has to be shared with
+# the jobs worker for ingestion to invalidate responses of the web server
+CACHES = {"default": env.cache("DJANGO_CACHE_URL", default="locmemcache://")}
+RESPONSE_CACHE_ALIAS = "default"
+# List responses are cached for that many seconds, 0 disables the cache.
+# Off without a shared backend, other processes can't invalidate a
+# per-process one.
+RESPONSE_CACHE_TIMEOUT = env.int(
+    "RESPONSE_CACHE_TIMEOUT",
+    default=300 if env.str("DJANGO_CACHE_URL", default="") else 0,
+)
 
 
 API_SCHEMA_FILEPATH = env.str(
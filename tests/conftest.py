@@ -1,9 +1,25 @@
 import pytest
 from django.conf import settings
+from django.core.cache import caches
 from django.core.management import call_command
 from openapi_tester.schema_tester import SchemaTester
+from xrpl.models.response import Response, ResponseStatus
 
 from xrpl_app.models import AssetInfo, PaymentTransaction, XRPLAccount
+from xrpl_app.payments.queries import AccountsQuery, AssetsQuery
+
+
+@pytest.fixture(autouse=True)
+def clear_response_cache():
+    # cached responses outlive the rolled back data of previous tests
+    caches[settings.RESPONSE_CACHE_ALIAS].clear()
+
+
+@pytest.fixture(autouse=True)
+def clear_key_caches():
+    # primary keys of rows from previous tests are gone with their data
+    AccountsQuery.known.clear()
+    AssetsQuery.known.clear()
 
 
 @pytest.fixture
@@ -47,3 +63,57 @@ def transaction(django_db_setup, django_db_blocker):
             fee="666",
         )
     return obj1
+
+
+class FakeXRPLClient:
+    """
+    Serves prepared account_tx pages instead of a rippled node, the same
+    pages for every account or pages by account from a dict.
+    """
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.requests = []
+
+    def request(self, request):
+        self.requests.append(request)
+        pages = self.pages
+        if isinstance(pages, dict):
+            pages = pages[request.account]
+        idx = request.marker or 0
+        result = {
+            "account": request.account,
+            "ledger_index_min": 1,
+            "ledger_index_max": 100_000,
+            "transactions": pages[idx],
+        }
+        if idx + 1 < len(pages):
+            result["marker"] = idx + 1
+        return Response(status=ResponseStatus.SUCCESS, result=result)
+
+
+@pytest.fixture
+def payment_tx():
+    def make(tx_hash, ledger_idx, account="rSource", destination="rDest",
+             amount="1000", tx_type="Payment", result="tesSUCCESS"):
+        return {
+            "meta": {"TransactionResult": result},
+            "tx": {
+                "Account": account,
+                "Amount": amount,
+                "Destination": destination,
+                "DestinationTag": None,
+                "Fee": "12",
+                "TransactionType": tx_type,
+                "hash": tx_hash,
+                "ledger_index": ledger_idx,
+            },
+            "validated": True,
+        }
+
+    return make
+
+
+@pytest.fixture
+def xrpl_client():
+    return FakeXRPLClient
@@ -8,7 +8,7 @@ from django.urls import reverse
 @pytest.mark.django_db
 def test_get_accounts_hash_exact_match(client, transaction, schema_tester):
     url = f"{reverse('xrplaccount-list')}"
-    url += f"?{urlencode({'hash': transaction.account_id})}"
+    url += f"?{urlencode({'hash': transaction.account.hash})}"
     response = client.get(url, HTTP_HOST="localhost:8001")
     schema_tester.validate_response(response)
     assert len(response.json()["results"]) == 1
@@ -25,7 +25,7 @@ def test_get_accounts_hash_exact_empty(client, transaction, schema_tester):
 
 @pytest.mark.django_db
 def test_get_accounts_hash_contains_match(client, transaction, schema_tester):
-    partial_id = transaction.account_id[:-1]
+    partial_id = transaction.account.hash[:-1]
     url = reverse("xrplaccount-list")
     url += f"?{urlencode({'hash__contains': partial_id})}"
     response = client.get(url, HTTP_HOST="localhost:8001")
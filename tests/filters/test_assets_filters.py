@@ -8,7 +8,7 @@ from django.urls import reverse
 @pytest.mark.django_db
 def test_get_assets_issuer_exact_match(client, transaction, schema_tester):
     url = reverse("assetinfo-list")
-    url += f"?{urlencode({'issuer': transaction.asset_info.issuer_id})}"
+    url += f"?{urlencode({'issuer': transaction.asset_info.issuer.hash})}"
     response = client.get(url, HTTP_HOST="localhost:8001")
     schema_tester.validate_response(response)
     assert len(response.json()["results"]) == 1
@@ -25,7 +25,7 @@ def test_get_assets_issuer_exact_empty(client, transaction, schema_tester):
 
 @pytest.mark.django_db
 def test_get_assets_issuer_contains_match(client, transaction, schema_tester):
-    partial_id = transaction.asset_info.issuer_id[:-1]
+    partial_id = transaction.asset_info.issuer.hash[:-1]
     url = reverse("assetinfo-list")
     url += f"?{urlencode({'issuer__contains': partial_id})}"
     response = client.get(url, HTTP_HOST="localhost:8001")
@@ -45,10 +45,16 @@ def test_get_payments_hash_contains_empty(client, transaction, schema_tester):
 @pytest.mark.django_db
 def test_get_payments_account_exact_match(client, transaction, schema_tester):
     url = f"{reverse('paymenttransaction-list')}"
-    url += f"?{urlencode({'account': transaction.account_id})}"
+    url += f"?{urlencode({'account': transaction.account.hash})}"
     response = client.get(url, HTTP_HOST="localhost:8001")
     schema_tester.validate_response(response)
-    assert len(response.json()["results"]) == 1
+    results = response.json()["results"]
+    assert len(results) == 1
+    # hashes of the joined accounts rather than their keys
+    assert results[0]["account"] == transaction.account.hash
+    assert results[0]["asset_info"]["issuer"] == (
+        transaction.asset_info.issuer.hash
+    )
 
 
 @pytest.mark.django_db
@@ -63,7 +69,7 @@ def test_get_payments_account_exact_empty(client, transaction, schema_tester):
 @pytest.mark.django_db
 def test_get_payments_account_contains_match(client, transaction,
                                              schema_tester):
-    partial_id = transaction.account_id[:-1]
+    partial_id = transaction.account.hash[:-1]
     url = f"{reverse('paymenttransaction-list')}"
     url += f"?{urlencode({'account__contains': partial_id})}"
     response = client.get(url, HTTP_HOST="localhost:8001")
@@ -85,7 +91,7 @@ def test_get_payments_account_contains_empty(client, transaction,
 def test_get_payments_destination_exact_match(client, transaction,
                                               schema_tester):
     url = f"{reverse('paymenttransaction-list')}"
-    url += f"?{urlencode({'destination': transaction.destination_id})}"
+    url += f"?{urlencode({'destination': transaction.destination.hash})}"
     response = client.get(url, HTTP_HOST="localhost:8001")
     schema_tester.validate_response(response)
     assert len(response.json()["results"]) == 1
@@ -104,7 +110,7 @@ def test_get_payments_destination_exact_empty(client, transaction,
 @pytest.mark.django_db
 def test_get_payments_destination_contains_match(client, transaction,
                                                  schema_tester):
-    partial_id = transaction.destination_id[:-1]
+    partial_id = transaction.destination.hash[:-1]
     url = reverse("paymenttransaction-list")
     url += f"?{urlencode({'destination__contains': partial_id})}"
     response = client.get(url, HTTP_HOST="localhost:8001")
@@ -125,7 +131,7 @@ def test_get_payments_destination_contains_empty(client, transaction,
 @pytest.mark.django_db
 def test_get_payments_issuer_exact_match(client, transaction, schema_tester):
     url = f"{reverse('paymenttransaction-list')}"
-    url += f"?{urlencode({'issuer': transaction.asset_info.issuer_id})}"
+    url += f"?{urlencode({'issuer': transaction.asset_info.issuer.hash})}"
     response = client.get(url, HTTP_HOST="localhost:8001")
     schema_tester.validate_response(response)
     assert len(response.json()["results"]) == 1
@@ -143,7 +149,7 @@ def test_get_payments_issuer_exact_empty(client, transaction, schema_tester):
 @pytest.mark.django_db
 def test_get_payments_issuer_contains_match(client, transaction,
                                             schema_tester):
-    partial_id = transaction.asset_info.issuer_id[:-1]
+    partial_id = transaction.asset_info.issuer.hash[:-1]
     url = reverse("paymenttransaction-list")
     url += f"?{urlencode({'issuer__contains': partial_id})}"
     response = client.get(url, HTTP_HOST="localhost:8001")
@@ -258,3 +264,53 @@ def test_get_payments_ledger_idx_exact_empty(client, transaction,
     response = client.get(url, HTTP_HOST="localhost:8001")
     schema_tester.validate_response(response)
     assert len(response.json()["results"]) == 0
+
+
+@pytest.mark.django_db
+def test_get_payments_amount_range(client, transaction, schema_tester):
+    url = f"{reverse('paymenttransaction-list')}"
+    url += f"?{urlencode({'amount__gte': '1000.5', 'amount__lte': 1234})}"
+    response = client.get(url, HTTP_HOST="localhost:8001")
+    schema_tester.validate_response(response)
+    results = response.json()["results"]
+    assert [payment["hash"] for payment in results] == [transaction.pk]
+    assert results[0]["amount"] == "1234"
+
+
+@pytest.mark.django_db
+def test_get_payments_amount_range_empty(client, transaction, schema_tester):
+    url = f"{reverse('paymenttransaction-list')}"
+    url += f"?{urlencode({'amount__gte': 5000})}"
+    response = client.get(url, HTTP_HOST="localhost:8001")
+    schema_tester.validate_response(response)
+    assert len(response.json()["results"]) == 0
+
+
+@pytest.mark.django_db
+def test_get_payments_fee_range(client, transaction, schema_tester):
+    url = f"{reverse('paymenttransaction-list')}"
+    url += f"?{urlencode({'fee__gte': 600, 'fee__lte': 700})}"
+    response = client.get(url, HTTP_HOST="localhost:8001")
+    schema_tester.validate_response(response)
+    results = response.json()["results"]
+    assert [payment["fee"] for payment in results] == ["666"]
+
+
+@pytest.mark.django_db
+def test_get_payments_ledger_range(client, transaction, schema_tester):
+    url = f"{reverse('paymenttransaction-list')}"
+    params = {"ledger_idx__gte": 12000, "ledger_idx__lte": 13000}
+    url += f"?{urlencode(params)}"
+    response = client.get(url, HTTP_HOST="localhost:8001")
+    schema_tester.validate_response(response)
+    results = response.json()["results"]
+    assert [payment["hash"] for payment in results] == [transaction.pk]
+
+
+@pytest.mark.django_db
+def test_get_payments_latest_first(client, transaction, schema_tester):
+    url = f"{reverse('paymenttransaction-list')}"
+    response = client.get(url, HTTP_HOST="localhost:8001")
+    schema_tester.validate_response(response)
+    results = response.json()["results"]
+    assert [payment["ledger_idx"] for payment in results] == [54321, 12345]
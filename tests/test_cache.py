@@ -0,0 +1,77 @@
+import pytest
+from django.db import transaction as db_transaction
+from django.urls import reverse
+
+from xrpl_app.payments import PaymentsQuery
+
+
+@pytest.fixture(autouse=True)
+def response_cache(settings):
+    # off by default without a shared cache backend
+    settings.RESPONSE_CACHE_TIMEOUT = 300
+
+
+def get_results(client, url):
+    response = client.get(url, HTTP_HOST="localhost:8001")
+    assert response.status_code == 200
+    return [payment["hash"] for payment in response.json()["results"]]
+
+
+@pytest.mark.django_db
+def test_cached_list_served_without_queries(client, transaction,
+                                            django_assert_num_queries):
+    url = reverse("paymenttransaction-list") + "?account=src-src-src"
+    assert get_results(client, url) == [transaction.pk]
+    with django_assert_num_queries(0):
+        assert get_results(client, url) == [transaction.pk]
+
+
+@pytest.mark.django_db
+def test_cache_invalidated_for_touched_accounts(
+    client,
+    transaction,
+    payment_tx,
+    django_assert_num_queries,
+    django_capture_on_commit_callbacks,
+):
+    touched = reverse("paymenttransaction-list") + "?destination=dest"
+    untouched = reverse("paymenttransaction-list") + "?account=src-src-src"
+    everything = reverse("paymenttransaction-list")
+    for url in (touched, untouched, everything):
+        get_results(client, url)
+    with django_capture_on_commit_callbacks(execute=True):
+        PaymentsQuery("rSource").save_data(
+            [payment_tx("new-hash", 100, destination="dest")]
+        )
+    with django_assert_num_queries(0):
+        assert get_results(client, untouched) == [transaction.pk]
+    assert "new-hash" in get_results(client, touched)
+    assert "new-hash" in get_results(client, everything)
+
+
+@pytest.mark.django_db
+def test_cache_kept_on_rollback(client, transaction, payment_tx,
+                                django_capture_on_commit_callbacks):
+    url = reverse("paymenttransaction-list") + "?destination=dest"
+    expected = get_results(client, url)
+    with django_capture_on_commit_callbacks(execute=True) as callbacks:
+        with pytest.raises(RuntimeError), db_transaction.atomic():
+            PaymentsQuery("rSource").save_data(
+                [payment_tx("new-hash", 100, destination="dest")]
+            )
+            raise RuntimeError
+    assert callbacks == []
+    assert get_results(client, url) == expected
+
+
+@pytest.mark.django_db
+def test_accounts_list_invalidated_by_new_accounts(
+    client, transaction, payment_tx, django_capture_on_commit_callbacks
+):
+    url = reverse("xrplaccount-list")
+    before = client.get(url, HTTP_HOST="localhost:8001").json()["count"]
+    with django_capture_on_commit_callbacks(execute=True):
+        PaymentsQuery("rSource").save_data([payment_tx("new-hash", 100)])
+    after = client.get(url, HTTP_HOST="localhost:8001").json()["count"]
+    # rSource, rDest and the XRP issuer
+    assert after == before + 3
@@ -0,0 +1,74 @@
+import json
+
+import httpx
+import pytest
+from xrpl.clients import XRPLRequestFailureException
+from xrpl.models.requests import AccountTx
+
+from xrpl_app.payments.clients import ClientRegistry, PooledJsonRpcClient
+
+
+def test_registry_shares_pools_by_url(settings):
+    settings.XRPL_NODES = ["http://node-1:5005", "http://node-2:5005"]
+    registry = ClientRegistry()
+    first = registry.get("http://node-1:5005")
+    assert registry.get("http://node-1:5005").http_client is first.http_client
+    other = registry.get("http://node-2:5005")
+    assert other.http_client is not first.http_client
+    registry.after_fork()
+    assert registry.get("http://node-1:5005").http_client is not (
+        first.http_client
+    )
+    registry.close()
+
+
+def test_registry_pools_only_configured_nodes(settings):
+    settings.XRPL_NODES = ["http://node-1:5005"]
+    registry = ClientRegistry()
+    client = registry.get("http://other:5005")
+    assert client.http_client is None
+    assert list(registry.http_clients) == []
+
+
+def test_pooled_client_sends_json_rpc():
+    def handler(request):
+        body = json.loads(request.content)
+        assert body["method"] == "account_tx"
+        assert body["params"][0]["account"] == "rSource"
+        result = {"status": "success", "transactions": []}
+        return httpx.Response(200, json={"result": result})
+
+    http_client = httpx.Client(transport=httpx.MockTransport(handler))
+    client = PooledJsonRpcClient("http://node:5005", http_client)
+    response = client.request(AccountTx(account="rSource"))
+    assert response.is_successful()
+    assert response.result == {"transactions": []}
+
+
+def test_pooled_client_rejects_invalid_json():
+    http_client = httpx.Client(transport=httpx.MockTransport(
+        lambda request: httpx.Response(502, text="Bad Gateway")
+    ))
+    client = PooledJsonRpcClient("http://node:5005", http_client)
+    with pytest.raises(XRPLRequestFailureException):
+        client.request(AccountTx(account="rSource"))
+
+
+def test_unpooled_client_closes_its_connections(monkeypatch):
+    http_clients = []
+
+    def create_http_client():
+        result = {"status": "success", "transactions": []}
+        http_clients.append(httpx.Client(transport=httpx.MockTransport(
+            lambda request: httpx.Response(200, json={"result": result})
+        )))
+        return http_clients[-1]
+
+    monkeypatch.setattr("xrpl_app.payments.clients.create_http_client",
+                        create_http_client)
+    client = PooledJsonRpcClient("http://other:5005")
+    assert client.request(AccountTx(account="rSource")).is_successful()
+    assert client.request(AccountTx(account="rSource")).is_successful()
+    assert [http_client.is_closed for http_client in http_clients] == [
+        True, True
+    ]
@@ -0,0 +1,81 @@
+import pytest
+from django.urls import reverse
+
+from xrpl_app.payments import PaymentsQuery
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "url_name", ["paymenttransaction-list", "xrplaccount-list",
+                 "assetinfo-list"]
+)
+def test_list_not_modified(client, transaction, schema_tester, url_name):
+    url = reverse(url_name)
+    response = client.get(url, HTTP_HOST="localhost:8001")
+    schema_tester.validate_response(response)
+    etag = response["ETag"]
+    response = client.get(url, HTTP_HOST="localhost:8001",
+                          HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304
+    assert response["ETag"] == etag
+    assert response.content == b""
+
+
+@pytest.mark.django_db
+def test_payments_list_etag_changes(client, transaction, payment_tx,
+                                    django_capture_on_commit_callbacks):
+    url = reverse("paymenttransaction-list") + "?limit=1"
+    etag = client.get(url, HTTP_HOST="localhost:8001")["ETag"]
+    other = client.get(url + "&offset=1", HTTP_HOST="localhost:8001")
+    assert other["ETag"] != etag
+    with django_capture_on_commit_callbacks(execute=True):
+        PaymentsQuery("rSource").save_data([payment_tx("A" * 64, 100)])
+    response = client.get(url, HTTP_HOST="localhost:8001",
+                          HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response["ETag"] != etag
+
+
+@pytest.mark.django_db
+def test_list_not_modified_without_count(client, transaction, payment_tx,
+                                         django_assert_num_queries,
+                                         django_capture_on_commit_callbacks):
+    url = reverse("paymenttransaction-list") + "?cursor="
+    etag = client.get(url, HTTP_HOST="localhost:8001")["ETag"]
+    # only the page is read
+    with django_assert_num_queries(1):
+        response = client.get(url, HTTP_HOST="localhost:8001",
+                              HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304
+    # a payment of an older ledger within the page
+    with django_capture_on_commit_callbacks(execute=True):
+        PaymentsQuery("rSource").save_data([payment_tx("A" * 64, 20_000)])
+    response = client.get(url, HTTP_HOST="localhost:8001",
+                          HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+
+
+@pytest.mark.django_db
+def test_list_etag_covers_pagination_links(client, transaction, payment_tx,
+                                           django_capture_on_commit_callbacks):
+    url = reverse("paymenttransaction-list") + "?cursor=&limit=2"
+    response = client.get(url, HTTP_HOST="localhost:8001")
+    assert response.json()["next"] is None
+    # the page stays the same, but there is a next one now
+    with django_capture_on_commit_callbacks(execute=True):
+        PaymentsQuery("rSource").save_data([payment_tx("A" * 64, 1)])
+    response = client.get(url, HTTP_HOST="localhost:8001",
+                          HTTP_IF_NONE_MATCH=response["ETag"])
+    assert response.status_code == 200
+    assert response.json()["next"] is not None
+
+
+@pytest.mark.django_db
+def test_payment_retrieve_not_modified(client, transaction, schema_tester):
+    url = reverse("paymenttransaction-detail", args=[transaction.pk])
+    response = client.get(url, HTTP_HOST="localhost:8001")
+    schema_tester.validate_response(response)
+    assert response["ETag"] == f'"{transaction.pk}"'
+    response = client.get(url, HTTP_HOST="localhost:8001",
+                          HTTP_IF_NONE_MATCH=response["ETag"])
+    assert response.status_code == 304
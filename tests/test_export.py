@@ -0,0 +1,59 @@
+import csv
+import json
+from io import StringIO
+from urllib.parse import urlencode
+
+import pytest
+from django.urls import reverse
+
+
+def read_stream(response):
+    assert response.streaming
+    return b"".join(response.streaming_content).decode()
+
+
+@pytest.mark.django_db
+def test_export_ndjson(client, transaction):
+    response = client.get(reverse("paymenttransaction-export"),
+                          HTTP_HOST="localhost:8001")
+    assert response.status_code == 200
+    assert response["Content-Type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in read_stream(response).splitlines()]
+    assert [row["hash"] for row in rows] == ["unique-hash", transaction.pk]
+    assert rows[1] == {
+        "hash": transaction.pk,
+        "account": transaction.account.hash,
+        "destination": transaction.destination.hash,
+        "issuer": transaction.asset_info.issuer.hash,
+        "currency": transaction.asset_info.currency,
+        "ledger_idx": transaction.ledger_idx,
+        "destination_tag": transaction.destination_tag,
+        "amount": "1234",
+        "fee": "555",
+    }
+
+
+@pytest.mark.django_db
+def test_export_csv_with_filters(client, transaction):
+    params = {"format": "csv", "account": transaction.account.hash}
+    response = client.get(
+        f"{reverse('paymenttransaction-export')}?{urlencode(params)}",
+        HTTP_HOST="localhost:8001",
+    )
+    assert response.status_code == 200
+    assert response["Content-Type"].startswith("text/csv")
+    assert "payments.csv" in response["Content-Disposition"]
+    rows = list(csv.reader(StringIO(read_stream(response))))
+    assert rows[0][:3] == ["hash", "account", "destination"]
+    assert [row[0] for row in rows[1:]] == [transaction.pk]
+
+
+@pytest.mark.django_db
+def test_export_invalid_filter(client, transaction):
+    params = {"format": "csv", "ledger_idx": "not-a-number"}
+    response = client.get(
+        f"{reverse('paymenttransaction-export')}?{urlencode(params)}",
+        HTTP_HOST="localhost:8001",
+    )
+    assert response.status_code == 400
+    assert "ledger_idx" in response.content.decode()
@@ -0,0 +1,121 @@
+import gzip
+import io
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from xrpl_app.models import PaymentTransaction
+from xrpl_app.payments import dump
+from xrpl_app.payments.dump import iter_json_array
+
+
+def stored_hashes():
+    return set(PaymentTransaction.objects.values_list("hash", flat=True))
+
+
+def test_json_array_is_read_across_chunks(payment_tx):
+    entries = [payment_tx(f"tx-{idx}", idx) for idx in range(5)]
+    response = {"result": {"account": "rSource", "transactions": entries,
+                           "validated": True}}
+    stream = io.BytesIO(json.dumps(response, indent=2).encode())
+    assert list(iter_json_array(stream, chunk_size=7)) == entries
+    stream = io.BytesIO(json.dumps(entries).encode())
+    assert list(iter_json_array(stream, chunk_size=7)) == entries
+
+
+def test_truncated_json_array_fails(payment_tx):
+    data = json.dumps([payment_tx("a", 1), payment_tx("b", 2)]).encode()
+    with pytest.raises(ValueError):
+        list(iter_json_array(io.BytesIO(data[:-10]), chunk_size=16))
+
+
+class CountingStream(io.BytesIO):
+    def __init__(self, data):
+        super().__init__(data)
+        self.reads = 0
+
+    def read(self, size=-1):
+        self.reads += 1
+        return super().read(size)
+
+
+def test_malformed_json_item_fails_early(payment_tx):
+    entries = [payment_tx(f"tx-{idx}", idx) for idx in range(100)]
+    stream = CountingStream(
+        b'[{"tx": bad}, ' + json.dumps(entries)[1:].encode()
+    )
+    with pytest.raises(ValueError):
+        list(iter_json_array(stream, chunk_size=64))
+    assert stream.reads == 1
+
+
+def test_oversized_json_item_fails(payment_tx):
+    data = json.dumps([{"memo": "x" * 1000}]).encode()
+    with pytest.raises(ValueError, match="over 100 characters"):
+        list(iter_json_array(io.BytesIO(data), chunk_size=16,
+                             max_item_size=100))
+
+
+@pytest.mark.django_db
+def test_import_jsonl_gzip(tmp_path, payment_tx):
+    page = {"transactions": [payment_tx("b", 2), payment_tx("c", 3)]}
+    lines = [
+        json.dumps(payment_tx("a", 1)),
+        "{not json",
+        json.dumps({"result": page}),
+        json.dumps(payment_tx("offer", 4, tx_type="OfferCreate")),
+        "",
+    ]
+    path = tmp_path / "dump.jsonl.gz"
+    with gzip.open(path, "wt") as file:
+        file.write("\n".join(lines))
+    out = StringIO()
+    call_command("import_account_tx", str(path), "--batch-size", "2",
+                 stdout=out)
+    assert stored_hashes() == {"a", "b", "c"}
+    output = out.getvalue().splitlines()
+    # two progress lines for two batches
+    assert len([line for line in output if "entries/s" in line]) == 2
+    assert "1 invalid lines" in output[-2]
+    assert output[-1] == "Imported 1 files: 4 entries, 3 payments stored"
+
+
+@pytest.mark.django_db
+def test_import_json_skips_stored_payments(tmp_path, payment_tx):
+    path = tmp_path / "dump.json"
+    path.write_text(json.dumps(
+        {"result": {"transactions": [payment_tx("a", 1),
+                                     payment_tx("b", 2)]}}
+    ))
+    call_command("import_account_tx", str(path), stdout=StringIO())
+    out = StringIO()
+    call_command("import_account_tx", str(path), stdout=out)
+    assert stored_hashes() == {"a", "b"}
+    assert out.getvalue().endswith("2 entries, 0 payments stored\n")
+
+
+@pytest.mark.django_db(transaction=True)
+def test_import_with_workers(tmp_path, payment_tx):
+    paths = []
+    for shard in range(3):
+        path = tmp_path / f"shard-{shard}.jsonl"
+        path.write_text("\n".join(
+            json.dumps(payment_tx(f"tx-{shard}-{idx}", idx,
+                                  destination=f"rDest{idx}"))
+            for idx in range(4)
+        ))
+        paths.append(str(path))
+    out = StringIO()
+    call_command("import_account_tx", *paths, "--workers", "2", stdout=out)
+    assert len(stored_hashes()) == 12
+    assert out.getvalue().endswith("12 entries, 12 payments stored\n")
+
+
+def test_zstd_requires_zstandard(tmp_path, monkeypatch):
+    monkeypatch.setattr(dump, "zstandard", None)
+    path = tmp_path / "dump.jsonl.zst"
+    path.write_bytes(b"")
+    with pytest.raises(CommandError, match="zstandard"):
+        call_command("import_account_tx", str(path), stdout=StringIO())
@@ -0,0 +1,89 @@
+import pytest
+from django.db import transaction as db_transaction
+
+from xrpl_app.models import AssetInfo, PaymentTransaction, XRPLAccount
+from xrpl_app.payments import PaymentsQuery
+from xrpl_app.payments.keycache import KeyCache
+from xrpl_app.payments.queries import AccountsQuery, AssetsQuery
+
+
+def test_key_cache_evicts_least_recently_used():
+    cache = KeyCache(maxsize=2)
+    cache.put_many({"a": 1, "b": 2})
+    assert cache.get_many(["a"]) == {"a": 1}
+    cache.put_many({"c": 3})
+    assert cache.get_many(["a", "b", "c"]) == {"a": 1, "c": 3}
+    assert (cache.hits, cache.misses) == (3, 1)
+    assert len(cache) == 2
+
+
+@pytest.mark.django_db
+def test_repeated_sync_skips_lookups(payment_tx, django_assert_num_queries,
+                                     django_capture_on_commit_callbacks):
+    iou = {"issuer": "rIssuer", "currency": "USD", "value": "1.5"}
+    with django_capture_on_commit_callbacks(execute=True):
+        PaymentsQuery("rSource").save_data(
+            [payment_tx("first", 1), payment_tx("iou", 2, amount=iou)]
+        )
+    assert len(AccountsQuery.known) == 4
+    assert len(AssetsQuery.known) == 2
+    # existing hashes and the insert, accounts and assets are known, the
+    # insert runs in a savepoint which checks the foreign keys of their pks
+    with django_assert_num_queries(6):
+        PaymentsQuery("rSource").save_data(
+            [payment_tx("second", 3), payment_tx("iou-2", 4, amount=iou)]
+        )
+    assert PaymentTransaction.objects.count() == 4
+
+
+@pytest.mark.django_db
+def test_deleted_rows_of_cached_keys_are_recreated(
+    payment_tx, django_capture_on_commit_callbacks
+):
+    iou = {"issuer": "rIssuer", "currency": "USD", "value": "1.5"}
+    with django_capture_on_commit_callbacks(execute=True):
+        PaymentsQuery("rSource").save_data([payment_tx("first", 1,
+                                                       amount=iou)])
+    # e.g. by an admin, the process cache still has their keys
+    XRPLAccount.objects.filter(hash__in=["rIssuer", "rDest"]).delete()
+    with django_capture_on_commit_callbacks(execute=True):
+        stored = PaymentsQuery("rSource").save_data(
+            [payment_tx("second", 2, amount=iou)]
+        )
+    assert [obj.hash for obj in stored] == ["second"]
+    payment = PaymentTransaction.objects.get(hash="second")
+    assert payment.destination.hash == "rDest"
+    assert payment.asset_info.issuer.hash == "rIssuer"
+    assert AccountsQuery.known.get_many(["rDest"]) == {
+        "rDest": payment.destination_id
+    }
+
+
+@pytest.mark.django_db
+def test_rolled_back_rows_are_not_cached(payment_tx,
+                                         django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        with pytest.raises(RuntimeError), db_transaction.atomic():
+            PaymentsQuery("rSource").save_data([payment_tx("first", 1)])
+            raise RuntimeError
+    assert len(AccountsQuery.known) == 0
+    assert len(AssetsQuery.known) == 0
+    PaymentsQuery("rSource").save_data([payment_tx("first", 1)])
+    assert PaymentTransaction.objects.filter(hash="first").exists()
+
+
+@pytest.mark.django_db
+def test_assets_resolved_in_bulk(payment_tx, django_assert_num_queries):
+    AssetInfo.objects.create(issuer=XRPLAccount.objects.create(hash="rIssuer"),
+                             currency="C0")
+    transactions = [
+        payment_tx(f"iou-{idx}", idx,
+                   amount={"issuer": "rIssuer", "currency": f"C{idx}",
+                           "value": "1"})
+        for idx in range(20)
+    ]
+    # payments, accounts lookup and insert, assets lookup and insert,
+    # payments insert, the last four in a savepoint
+    with django_assert_num_queries(8):
+        PaymentsQuery("rSource").save_data(transactions)
+    assert AssetInfo.objects.filter(issuer__hash="rIssuer").count() == 20
@@ -0,0 +1,96 @@
+from decimal import Decimal
+
+import pytest
+
+from xrpl_app.models import AssetInfo, PaymentTransaction, XRPLAccount
+from xrpl_app.payments import PaymentsQuery
+from xrpl_app.payments.loader import BulkCreateLoader, CopyLoader, CopyStream
+from xrpl_app.payments.queries import AssetsQuery
+
+
+def test_copy_stream_escapes_values():
+    stream = CopyStream([("a\tb", None, 1), ("c\\d\ne", "", 2)])
+    assert stream.read(3) == "a\\t"
+    assert stream.read() == "b\t\\N\t1\nc\\\\d\\ne\t\t2\n"
+    assert stream.read() == ""
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("loader_class", [BulkCreateLoader, CopyLoader])
+def test_loader_skips_existing_rows(loader_class):
+    issuer = XRPLAccount.objects.create(hash="rIssuer")
+    existing = AssetInfo.objects.create(issuer=issuer, currency="USD")
+    loader = loader_class(AssetInfo, ["issuer", "currency"])
+    inserted = loader.load(
+        [AssetInfo(issuer=issuer, currency=currency)
+         for currency in ("USD", "EUR", "EUR")]
+    )
+    assert [(obj.currency, obj.pk is not None) for obj in inserted] == [
+        ("EUR", True)
+    ]
+    assert AssetInfo.objects.get(currency="EUR").pk == inserted[0].pk
+    assert AssetInfo.objects.filter(pk=existing.pk).exists()
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("loader_class", [BulkCreateLoader, CopyLoader])
+def test_loader_skips_single_existing_row(loader_class):
+    existing = XRPLAccount.objects.create(hash="rExisting")
+    loader = loader_class(XRPLAccount, ["hash"])
+    assert loader.load([XRPLAccount(hash="rExisting")]) == []
+    assert XRPLAccount.objects.get().pk == existing.pk
+
+
+@pytest.mark.django_db
+def test_save_data_with_copy_loader(settings, payment_tx):
+    settings.XRPL_PAYMENTS_LOADER = "copy"
+    iou = {"issuer": "rIssuer", "currency": "USD", "value": "1e-20"}
+    transactions = [payment_tx("xrp", 1), payment_tx("iou", 2, amount=iou)]
+    stored = PaymentsQuery("rSource").save_data(transactions)
+    assert sorted(obj.hash for obj in stored) == ["iou", "xrp"]
+    payment = PaymentTransaction.objects.get(hash="iou")
+    assert payment.amount == Decimal("1e-20")
+    assert payment.asset_info.issuer.hash == "rIssuer"
+    assert PaymentsQuery("rSource").save_data(transactions) == []
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("loader", ["orm", "copy"])
+def test_save_data_tolerates_concurrent_sync(settings, payment_tx, loader):
+    settings.XRPL_PAYMENTS_LOADER = loader
+    iou = {"issuer": "rIssuer", "currency": "USD", "value": "1"}
+    transactions = [payment_tx("xrp", 1), payment_tx("iou", 2, amount=iou)]
+    query = PaymentsQuery("rSource")
+    load_accounts = query.accounts.loader.load
+
+    def load_after_other_sync(objs):
+        # another worker stores the same page after our lookups
+        PaymentsQuery("rDest").save_data(transactions)
+        return load_accounts(objs)
+
+    query.accounts.loader.load = load_after_other_sync
+    query.save_data(transactions)
+    assert PaymentTransaction.objects.count() == 2
+    assert set(query.accounts.cache) == {"rSource", "rDest", "rIssuer",
+                                         "SYSTEM"}
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("loader", ["orm", "copy"])
+def test_assets_tolerate_concurrent_inserts(settings, monkeypatch, loader):
+    settings.XRPL_PAYMENTS_LOADER = loader
+    issuer = XRPLAccount.objects.create(hash="rIssuer")
+    asset = AssetInfo.objects.create(issuer=issuer, currency="USD")
+    query = AssetsQuery()
+    select = query.select
+    lookups = []
+
+    def select_missing_first(assets):
+        lookups.append(assets)
+        return {} if len(lookups) == 1 else select(assets)
+
+    monkeypatch.setattr(query, "select", select_missing_first)
+    query.setup_cache({(issuer.pk, "USD"), (issuer.pk, "EUR")})
+    assert query.get_pk(issuer.pk, "USD") == asset.pk
+    assert query.created == {(issuer.pk, "EUR")}
+    assert AssetInfo.objects.filter(issuer=issuer).count() == 2
@@ -0,0 +1,110 @@
+import pytest
+from django.db import IntegrityError, connection, connections
+from django.db.migrations.executor import MigrationExecutor
+
+ALIAS = "migrations"
+PAYMENTS = "xrpl_app_paymenttransaction"
+
+
+@pytest.fixture
+def migration_db(django_db_setup, django_db_blocker):
+    """
+    A database of its own: 0013 can't be reverted, so the test database
+    can't be taken back to the old schema.
+    """
+    name = f"{connection.settings_dict['NAME']}_migrations"
+    with django_db_blocker.unblock():
+        with connection._nodb_cursor() as cursor:
+            cursor.execute(f"DROP DATABASE IF EXISTS {name}")
+            cursor.execute(f"CREATE DATABASE {name}")
+        connections.settings[ALIAS] = {**connection.settings_dict,
+                                       "NAME": name}
+        try:
+            yield connections[ALIAS]
+        finally:
+            connections[ALIAS].close()
+            del connections[ALIAS]
+            del connections.settings[ALIAS]
+            with connection._nodb_cursor() as cursor:
+                cursor.execute(f"DROP DATABASE {name}")
+
+
+def migrate(db, migration):
+    """Migrate to `migration` and return the historical models."""
+    executor = MigrationExecutor(db)
+    target = ("xrpl_app", migration)
+    if migration is None:
+        target, = executor.loader.graph.leaf_nodes("xrpl_app")
+    executor.migrate([target])
+    apps = executor.loader.project_state(target).apps
+    return {
+        name: apps.get_model("xrpl_app", name).objects.using(ALIAS)
+        for name in ("XRPLAccount", "AssetInfo", "PaymentTransaction",
+                     "AccountSyncState")
+    }
+
+
+def create_payment(models, tx_hash, account, destination, ledger_idx):
+    return models["PaymentTransaction"].create(
+        hash=tx_hash,
+        account_id=account,
+        destination_id=destination,
+        asset_info=models["AssetInfo"].get(currency="USD"),
+        ledger_idx=ledger_idx,
+        amount="1",
+        fee="10",
+    )
+
+
+def test_migrations_keep_stored_rows(migration_db, settings):
+    settings.XRPL_LEDGER_PARTITION_SIZE = 10_000
+    models = migrate(migration_db, "0008_paymentjob_optional_url")
+    for account in ("rA", "rB", "rIssuer"):
+        models["XRPLAccount"].create(hash=account)
+    models["AssetInfo"].create(issuer_id="rIssuer", currency="USD")
+    models["AccountSyncState"].create(account_id="rA", ledger_idx=25_000)
+    create_payment(models, "a", "rA", "rB", 5_000)
+    create_payment(models, "b", "rB", "rA", 25_000)
+
+    # stored payments are copied into partitions of their ledgers
+    models = migrate(migration_db, "0010_payment_composite_indexes")
+    create_payment(models, "c", "rA", "rB", 15_000)
+
+    # the previous release keeps writing hash references meanwhile
+    models = migrate(migration_db, "0011_account_ids_prepare")
+    models["XRPLAccount"].create(hash="rC")
+    create_payment(models, "d", "rC", "rA", 25_001)
+
+    models = migrate(migration_db, None)
+    accounts = dict(models["XRPLAccount"].values_list("hash", "id"))
+    assert set(accounts) == {"rA", "rB", "rC", "rIssuer"}
+    assert len(set(accounts.values())) == 4
+    payments = models["PaymentTransaction"].values_list(
+        "hash", "account__hash", "destination__hash",
+        "asset_info__issuer__hash",
+    )
+    assert set(payments) == {
+        ("a", "rA", "rB", "rIssuer"),
+        ("b", "rB", "rA", "rIssuer"),
+        ("c", "rA", "rB", "rIssuer"),
+        ("d", "rC", "rA", "rIssuer"),
+    }
+    state = models["AccountSyncState"].get()
+    assert (state.account_id, state.ledger_idx) == (accounts["rA"], 25_000)
+
+    with migration_db.cursor() as cursor:
+        cursor.execute(f"SELECT hash, tableoid::regclass::text "
+                       f"FROM {PAYMENTS}")
+        partitions = dict(cursor.fetchall())
+    assert partitions == {
+        "a": f"{PAYMENTS}_l0",
+        "b": f"{PAYMENTS}_l20000",
+        "c": f"{PAYMENTS}_l10000",
+        "d": f"{PAYMENTS}_l20000",
+    }
+
+    # new accounts continue after the assigned ids
+    account = models["XRPLAccount"].create(hash="rNew")
+    assert account.id == max(accounts.values()) + 1
+    with pytest.raises(IntegrityError):
+        create_payment(models, "e", account.id, account.id + 1, 5_000)
@@ -0,0 +1,142 @@
+import pytest
+from httpx import ConnectError, ReadTimeout
+from xrpl.clients import XRPLRequestFailureException
+from xrpl.models.requests import AccountTx
+from xrpl.models.response import Response, ResponseStatus
+
+from xrpl_app.payments import NodePool
+from xrpl_app.payments.nodes import NodeHealth, health
+
+
+class FakeNode:
+    def __init__(self, url, outcomes):
+        self.url = url
+        self.outcomes = outcomes
+        self.requests = 0
+
+    def request(self, request, timeout=None):
+        self.requests += 1
+        outcome = self.outcomes.pop(0) if self.outcomes else "ok"
+        if isinstance(outcome, Exception):
+            raise outcome
+        if outcome == "ok":
+            return Response(status=ResponseStatus.SUCCESS,
+                            result={"transactions": []})
+        return Response(status=ResponseStatus.ERROR,
+                        result={"error": outcome})
+
+
+@pytest.fixture
+def nodes(monkeypatch, settings):
+    settings.XRPL_NODE_FAILURE_THRESHOLD = 2
+    settings.XRPL_NODE_RESET_TIMEOUT = 60
+    health.nodes.clear()
+    registry = {}
+
+    def make(url, *outcomes):
+        registry[url] = FakeNode(url, list(outcomes))
+        return registry[url]
+
+    monkeypatch.setattr("xrpl_app.payments.nodes.get_client",
+                        lambda url: registry[url])
+    yield make
+    health.nodes.clear()
+
+
+def test_pool_fails_over_to_next_node(nodes):
+    first = nodes("http://node-1", ConnectError("refused"))
+    second = nodes("http://node-2")
+    pool = NodePool([first.url, second.url])
+    assert pool.request(AccountTx(account="rSource")).is_successful()
+    assert (first.requests, second.requests) == (1, 1)
+    assert health.get(first.url).error_rate == 1
+
+
+def test_pool_fails_over_on_busy_server(nodes):
+    first = nodes("http://node-1", "tooBusy")
+    second = nodes("http://node-2")
+    pool = NodePool([first.url, second.url])
+    assert pool.request(AccountTx(account="rSource")).is_successful()
+    assert second.requests == 1
+
+
+def test_pool_returns_request_errors(nodes):
+    first = nodes("http://node-1", "actMalformed")
+    second = nodes("http://node-2")
+    pool = NodePool([first.url, second.url])
+    response = pool.request(AccountTx(account="rSource"))
+    assert response.result["error"] == "actMalformed"
+    assert second.requests == 0
+
+
+def test_pool_prefers_fastest_node(nodes):
+    slow, fast = nodes("http://slow"), nodes("http://fast")
+    health.get(slow.url).record_success(0.5)
+    health.get(fast.url).record_success(0.1)
+    NodePool([slow.url, fast.url]).request(AccountTx(account="rSource"))
+    assert (slow.requests, fast.requests) == (0, 1)
+
+
+def test_open_circuit_skips_node(nodes):
+    broken = nodes("http://broken", ReadTimeout("timeout"),
+                   ReadTimeout("timeout"))
+    spare = nodes("http://spare")
+    pool = NodePool([broken.url, spare.url])
+    for _ in range(3):
+        # the broken node is the fastest until its circuit opens
+        health.get(spare.url).latencies.append(1.0)
+        pool.request(AccountTx(account="rSource"))
+    assert health.get(broken.url).state == NodeHealth.OPEN
+    assert broken.requests == 2
+    assert spare.requests == 3
+
+
+def test_pool_raises_last_error(nodes):
+    first = nodes("http://node-1", ConnectError("refused"))
+    second = nodes("http://node-2", "noNetwork")
+    with pytest.raises(XRPLRequestFailureException):
+        NodePool([first.url, second.url]).request(
+            AccountTx(account="rSource")
+        )
+
+
+def test_half_open_probe_closes_circuit(monkeypatch):
+    node = NodeHealth("http://node", window=10, failure_threshold=1,
+                      reset_timeout=30)
+    node.record_failure(1.0)
+    assert not node.acquire()
+    node.opened_at -= 30
+    assert node.acquire()
+    assert node.state == NodeHealth.HALF_OPEN
+    assert not node.acquire()
+    node.record_success(0.1)
+    assert node.state == NodeHealth.CLOSED
+
+
+def test_ranking_keeps_probe_of_open_circuit(nodes):
+    broken = nodes("http://broken")
+    spare = nodes("http://spare")
+    node = health.get(broken.url)
+    node.record_failure(1.0)
+    node.record_failure(1.0)
+    node.opened_at -= 60
+    pool = NodePool([broken.url, spare.url])
+    assert pool.rank() == [node, health.get(spare.url)]
+    assert node.state == NodeHealth.OPEN
+
+
+def test_due_probe_closes_circuit(nodes):
+    broken = nodes("http://broken")
+    spare = nodes("http://spare")
+    node = health.get(broken.url)
+    node.record_failure(1.0)
+    node.record_failure(1.0)
+    health.get(spare.url).record_success(0.1)
+    pool = NodePool([broken.url, spare.url])
+    pool.request(AccountTx(account="rSource"))
+    assert (broken.requests, spare.requests) == (0, 1)
+    # the probe goes first despite the error rate of the node
+    node.opened_at -= 60
+    pool.request(AccountTx(account="rSource"))
+    assert (broken.requests, spare.requests) == (1, 1)
+    assert node.state == NodeHealth.CLOSED
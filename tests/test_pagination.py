@@ -0,0 +1,146 @@
+from urllib.parse import urlencode
+
+import pytest
+from django.db import connection
+from django.urls import reverse
+
+from xrpl_app.admin import PaymentAdmin
+from xrpl_app.models import PaymentTransaction, XRPLAccount
+from xrpl_app.pagination import estimate_count
+
+
+@pytest.fixture
+def payments(transaction):
+    for idx in range(5):
+        PaymentTransaction.objects.create(
+            account_id=transaction.account_id,
+            destination_id=transaction.destination_id,
+            asset_info=transaction.asset_info,
+            # pairs of payments share a ledger
+            ledger_idx=20_000 + idx // 2,
+            hash=f"page-{idx}",
+            amount="1",
+            fee="10",
+        )
+    return transaction
+
+
+@pytest.mark.django_db
+def test_cursor_pagination_walks_all_pages(client, payments, schema_tester):
+    expected = list(
+        PaymentTransaction.objects.order_by("-ledger_idx", "-hash")
+        .values_list("hash", flat=True)
+    )
+    url = reverse("paymenttransaction-list")
+    url += f"?{urlencode({'cursor': '', 'limit': 2})}"
+    pages = []
+    while url:
+        response = client.get(url, HTTP_HOST="localhost:8001")
+        schema_tester.validate_response(response)
+        data = response.json()
+        assert "count" not in data
+        pages.append([payment["hash"] for payment in data["results"]])
+        url = data["next"]
+    assert [tx_hash for page in pages for tx_hash in page] == expected
+    assert [len(page) for page in pages] == [2, 2, 2, 1]
+
+    # and back from the last page
+    url = data["previous"]
+    previous_pages = []
+    while url:
+        data = client.get(url, HTTP_HOST="localhost:8001").json()
+        previous_pages.append([payment["hash"] for payment in data["results"]])
+        url = data["previous"]
+    assert previous_pages == pages[-2::-1]
+
+
+@pytest.mark.django_db
+def test_cursor_pagination_with_filters(client, payments):
+    url = reverse("paymenttransaction-list")
+    params = {"cursor": "", "limit": 10, "ledger_idx": 20_001}
+    response = client.get(f"{url}?{urlencode(params)}",
+                          HTTP_HOST="localhost:8001")
+    data = response.json()
+    assert [payment["hash"] for payment in data["results"]] == [
+        "page-3", "page-2"
+    ]
+    assert data["next"] is None
+    assert data["previous"] is None
+
+
+@pytest.mark.django_db
+def test_cursor_pagination_invalid_cursor(client, payments):
+    url = reverse("paymenttransaction-list")
+    response = client.get(f"{url}?{urlencode({'cursor': 'invalid'})}",
+                          HTTP_HOST="localhost:8001")
+    assert response.status_code == 404
+
+
+@pytest.mark.django_db
+def test_small_results_have_exact_count(client, payments, schema_tester):
+    response = client.get(reverse("paymenttransaction-list"),
+                          HTTP_HOST="localhost:8001")
+    schema_tester.validate_response(response)
+    data = response.json()
+    assert data["count"] == 7
+    assert data["count_is_exact"] is True
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("url_name", ["paymenttransaction-list",
+                                      "xrplaccount-list"])
+def test_large_results_have_estimated_count(client, payments, settings,
+                                            schema_tester, url_name):
+    settings.COUNT_ESTIMATE_THRESHOLD = 0
+    response = client.get(reverse(url_name), HTTP_HOST="localhost:8001")
+    schema_tester.validate_response(response)
+    assert response.json()["count_is_exact"] is False
+
+
+@pytest.mark.django_db
+def test_estimate_count(payments):
+    with connection.cursor() as cursor:
+        cursor.execute(f"ANALYZE {XRPLAccount._meta.db_table}")
+    assert estimate_count(XRPLAccount.objects.all()) == 4
+    estimate = estimate_count(XRPLAccount.objects.filter(hash="dest"))
+    assert isinstance(estimate, int)
+
+
+@pytest.mark.django_db
+def test_admin_changelist_with_estimated_count(admin_client, payments,
+                                               settings):
+    settings.COUNT_ESTIMATE_THRESHOLD = 0
+    response = admin_client.get(
+        reverse("admin:xrpl_app_paymenttransaction_changelist"),
+        HTTP_HOST="localhost:8001",
+    )
+    assert response.status_code == 200
+
+
+@pytest.mark.django_db
+def test_underestimated_results_keep_next_link(client, payments, settings,
+                                               monkeypatch):
+    settings.COUNT_ESTIMATE_THRESHOLD = 0
+    monkeypatch.setattr("xrpl_app.pagination.estimate_count",
+                        lambda queryset: 1)
+    url = reverse("paymenttransaction-list") + "?limit=2"
+    hashes = []
+    while url:
+        data = client.get(url, HTTP_HOST="localhost:8001").json()
+        assert data["count"] == 1
+        hashes += [payment["hash"] for payment in data["results"]]
+        url = data["next"]
+    assert len(hashes) == 7
+
+
+@pytest.mark.django_db
+def test_admin_pages_beyond_underestimated_count(admin_client, payments,
+                                                 settings, monkeypatch):
+    settings.COUNT_ESTIMATE_THRESHOLD = 0
+    monkeypatch.setattr(PaymentAdmin, "list_per_page", 2)
+    monkeypatch.setattr("xrpl_app.pagination.estimate_count",
+                        lambda queryset: 3)
+    url = reverse("admin:xrpl_app_paymenttransaction_changelist")
+    response = admin_client.get(f"{url}?p=4", HTTP_HOST="localhost:8001")
+    assert response.status_code == 200
+    assert len(response.context["cl"].result_list) == 1
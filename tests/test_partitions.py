@@ -0,0 +1,79 @@
+import re
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+
+from xrpl_app.filters import PaymentsFilter
+from xrpl_app.models import PaymentTransaction
+from xrpl_app.partitions import LedgerPartitions
+from xrpl_app.payments import PaymentsQuery
+
+
+def partition_of(tx_hash):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT tableoid::regclass::text FROM xrpl_app_paymenttransaction "
+            "WHERE hash = %s",
+            [tx_hash],
+        )
+        return cursor.fetchone()[0]
+
+
+@pytest.mark.django_db
+def test_partitions_are_created_ahead(transaction, settings):
+    settings.XRPL_LEDGER_PARTITION_SIZE = 10_000
+    assert partition_of("1234567") == "xrpl_app_paymenttransaction_default"
+
+    out = StringIO()
+    call_command("create_payment_partitions", "--ahead", "1", stdout=out)
+    # ledgers 12345 and 54321 and one range after the highest one
+    assert out.getvalue().endswith("6 partitions created\n")
+    assert partition_of("1234567") == "xrpl_app_paymenttransaction_l10000"
+    assert partition_of("unique-hash") == "xrpl_app_paymenttransaction_l50000"
+    assert LedgerPartitions().get_partitions()[
+        "xrpl_app_paymenttransaction_l60000"
+    ] == (60_000, 70_000)
+
+    out = StringIO()
+    call_command("create_payment_partitions", stdout=out)
+    assert out.getvalue() == "0 partitions created\n"
+
+
+@pytest.mark.django_db
+def test_ledger_range_is_pruned(transaction, settings):
+    settings.XRPL_LEDGER_PARTITION_SIZE = 10_000
+    LedgerPartitions().ensure(0, 60_000)
+    plan = PaymentTransaction.objects.filter(
+        ledger_idx__gte=50_000, ledger_idx__lt=55_000
+    ).explain()
+    assert "xrpl_app_paymenttransaction_l50000" in plan
+    assert "xrpl_app_paymenttransaction_l10000" not in plan
+    assert "xrpl_app_paymenttransaction_default" not in plan
+
+
+@pytest.mark.django_db
+def test_stored_payments_are_skipped_across_partitions(payment_tx, settings):
+    settings.XRPL_LEDGER_PARTITION_SIZE = 10_000
+    LedgerPartitions().ensure(0, 30_000)
+    transactions = [payment_tx("a", 5_000), payment_tx("b", 25_000)]
+    assert len(PaymentsQuery("rSource").save_data(transactions)) == 2
+    assert len(PaymentsQuery("rSource").save_data(transactions)) == 0
+    assert PaymentTransaction.objects.count() == 2
+
+
+@pytest.mark.django_db
+def test_latest_account_payments_walk_index(transaction, settings):
+    settings.XRPL_LEDGER_PARTITION_SIZE = 10_000
+    LedgerPartitions().ensure(0, 60_000)
+    with connection.cursor() as cursor:
+        cursor.execute("SET LOCAL enable_seqscan = off")
+        cursor.execute("SET LOCAL enable_bitmapscan = off")
+    plan = PaymentsFilter(
+        {"account": transaction.account.hash, "ledger_idx__gte": 10_000},
+        queryset=PaymentTransaction.objects.all(),
+    ).qs[:10].explain()
+    # partitions index payments of an account in ledger order, no sort node
+    assert re.search(r"Index Scan \w* ?using \w*account_id\w*_idx", plan)
+    assert not re.search(r"^(.*->)?\s*Sort  \(", plan, re.M)
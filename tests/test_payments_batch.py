@@ -0,0 +1,133 @@
+import time
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from httpx import ConnectError
+
+from xrpl_app.models import AccountSyncState, PaymentTransaction
+from xrpl_app.payments import BatchSync
+
+
+@pytest.mark.django_db(transaction=True)
+def test_batch_queues_sync_job(client, monkeypatch, xrpl_client, payment_tx,
+                               schema_tester):
+    shared = payment_tx("shared", 2, account="rA", destination="rB")
+    histories = {
+        "rA": [[payment_tx("a", 1, account="rA")], [shared]],
+        "rB": [[shared, payment_tx("b", 3, account="rB",
+                                   tx_type="OfferCreate")]],
+    }
+    monkeypatch.setattr("xrpl_app.payments.jobs.get_client",
+                        lambda url: xrpl_client(histories))
+    response = client.post(
+        reverse("paymenttransaction-batch"),
+        {"accounts": ["rB", "rA", "rB"], "url": "http://localhost:5005"},
+        content_type="application/json",
+        HTTP_HOST="localhost:8001",
+    )
+    schema_tester.validate_response(response)
+    assert response.status_code == 202
+    assert response.json()["accounts"] == ["rA", "rB"]
+
+    out = StringIO()
+    call_command("run_payment_jobs", "--once", stdout=out)
+    assert "for 2 accounts" in out.getvalue()
+
+    response = client.get(response["Location"], HTTP_HOST="localhost:8001")
+    schema_tester.validate_response(response)
+    job = response.json()
+    assert job["status"] == "done"
+    assert (job["pages"], job["transactions"], job["stored"]) == (3, 4, 2)
+    assert job["results"]["rA"]["stored"] == 2
+    assert job["results"]["rB"]["stored"] == 1
+    assert job["results"]["rB"]["ledger_idx"] == 100_000
+    assert set(PaymentTransaction.objects.values_list("hash", flat=True)) == {
+        "a", "shared"
+    }
+
+
+@pytest.mark.django_db
+def test_batch_stores_accounts_together(xrpl_client, payment_tx,
+                                        django_assert_max_num_queries):
+    histories = {
+        f"r{idx}": [[payment_tx(f"tx-{idx}", idx, account=f"r{idx}")]]
+        for idx in range(20)
+    }
+    sync = BatchSync(xrpl_client(histories), list(histories), concurrency=4)
+    # accounts and states lookups, one flush for all accounts
+    with django_assert_max_num_queries(15):
+        result = sync.run()
+    assert result.stored == 20
+    assert AccountSyncState.objects.filter(ledger_idx=100_000).count() == 20
+
+
+@pytest.mark.django_db
+def test_batch_keeps_other_accounts_on_errors(xrpl_client, payment_tx):
+    class Client(xrpl_client):
+        def request(self, request):
+            if request.account == "rBroken":
+                raise ConnectError("connection refused")
+            return super().request(request)
+
+    client = Client({"rA": [[payment_tx("a", 1, account="rA")]]})
+    sync = BatchSync(client, ["rA", "rBroken"], flush_size=1)
+    result = sync.run()
+    assert result.stored == 1
+    assert sync.results["rBroken"]["error"].startswith("XRPL request error")
+    assert sync.results["rBroken"]["ledger_idx"] is None
+    assert sync.results["rA"]["error"] == ""
+
+
+@pytest.mark.django_db
+def test_batch_stores_pages_while_fetching(xrpl_client, payment_tx):
+    pages = [[payment_tx(f"tx-{idx}", idx)] for idx in range(10)]
+    client = xrpl_client(pages)
+    requested, markers = [], []
+
+    def on_flush(sync):
+        requested.append(len(client.requests))
+        markers.append(AccountSyncState.objects.get().marker)
+
+    sync = BatchSync(client, ["rSource"], concurrency=1, flush_size=1,
+                     on_flush=on_flush)
+    result = sync.run()
+    assert result.stored == 10
+    # a page in the queue and another one waiting to be put
+    assert requested[0] <= 3
+    assert markers[:3] == [1, 2, 3]
+    assert sync.results["rSource"]["pages"] == 10
+    assert sync.results["rSource"]["ledger_idx"] == 100_000
+
+
+@pytest.mark.django_db
+def test_batch_fails_on_unexpected_errors(xrpl_client, payment_tx):
+    class Client(xrpl_client):
+        def request(self, request):
+            if request.account == "rBroken":
+                raise ValueError("unexpected")
+            return super().request(request)
+
+    pages = [[payment_tx(f"tx-{idx}", idx)] for idx in range(10)]
+    sync = BatchSync(Client(pages), ["rBroken", "rA", "rB"], concurrency=2,
+                     flush_size=1)
+    with pytest.raises(ValueError):
+        sync.run()
+
+
+@pytest.mark.django_db
+def test_batch_reports_progress_while_waiting(xrpl_client, payment_tx):
+    class Client(xrpl_client):
+        def request(self, request):
+            time.sleep(0.2)
+            return super().request(request)
+
+    flushed = []
+    sync = BatchSync(Client([[payment_tx("a", 1)]]), ["rSource"],
+                     flush_interval=0.05,
+                     on_flush=lambda obj: flushed.append(dict(obj.results)))
+    assert sync.run().stored == 1
+    # flushed before the page arrived
+    assert flushed[0] == {}
+    assert flushed[-1]["rSource"]["stored"] == 1
@@ -0,0 +1,41 @@
+import pytest
+
+from xrpl_app.payments import PaymentsQuery
+from xrpl_app.payments.data import Amount, Payment
+
+
+def test_filter_input_data_skips_other_transactions(payment_tx):
+    unvalidated = payment_tx("d", 1)
+    unvalidated["validated"] = False
+    transactions = [
+        payment_tx("a", 1),
+        payment_tx("b", 1, tx_type="OfferCreate"),
+        payment_tx("c", 1, result="tecPATH_DRY"),
+        unvalidated,
+        {"tx": {"TransactionType": "Payment"}, "validated": True},
+    ]
+    assert list(PaymentsQuery.filter_input_data(transactions)) == ["a"]
+
+
+def test_payment_record(payment_tx):
+    elem = payment_tx("a", 7, amount={"issuer": "rIssuer",
+                                      "currency": "USD", "value": "1.5"})
+    elem["tx"]["DestinationTag"] = 42
+    payment = Payment.from_transaction(elem)
+    assert payment == Payment(
+        hash="a",
+        ledger_index=7,
+        source="rSource",
+        destination="rDest",
+        destination_tag=42,
+        fee="12",
+        amount=Amount(issuer="rIssuer", currency="USD", value="1.5"),
+    )
+    assert payment.amount_value == "1.5"
+
+
+def test_payment_record_invalid(payment_tx):
+    elem = payment_tx("a", 7)
+    del elem["tx"]["Destination"]
+    with pytest.raises(ValueError):
+        Payment.from_transaction(elem)
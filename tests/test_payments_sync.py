@@ -0,0 +1,143 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from httpx import TimeoutException
+
+from xrpl_app.models import AccountSyncState, PaymentJob, PaymentTransaction
+from xrpl_app.payments import AccountSync, AccountTxFetcher, PaymentJobQueue
+
+
+def test_fetcher_follows_markers(xrpl_client, payment_tx):
+    client = xrpl_client([[payment_tx("a", 1)], [payment_tx("b", 2)],
+                          [payment_tx("c", 3)]])
+    fetcher = AccountTxFetcher(client, "rSource")
+    pages = list(fetcher)
+    assert [page.transactions[0]["tx"]["hash"] for page in pages] == [
+        "a", "b", "c"
+    ]
+    assert [req.marker for req in client.requests] == [None, 1, 2]
+    assert fetcher.is_exhausted
+
+
+def test_fetcher_stops_at_page_budget(xrpl_client, payment_tx):
+    client = xrpl_client([[payment_tx("a", 1)], [payment_tx("b", 2)],
+                          [payment_tx("c", 3)]])
+    fetcher = AccountTxFetcher(client, "rSource", max_pages=2)
+    assert len(list(fetcher)) == 2
+    assert fetcher.marker == 2
+    assert not fetcher.is_exhausted
+
+
+@pytest.mark.django_db(transaction=True)
+def test_create_queues_sync_job(client, monkeypatch, xrpl_client, payment_tx,
+                                schema_tester):
+    pages = [
+        [payment_tx("a", 3), payment_tx("b", 3, tx_type="OfferCreate")],
+        [payment_tx("c", 2), payment_tx("d", 2, result="tecPATH_DRY")],
+        [payment_tx("e", 1, amount={"issuer": "rIssuer", "currency": "USD",
+                                    "value": "1.5"})],
+    ]
+    monkeypatch.setattr("xrpl_app.payments.jobs.get_client",
+                        lambda url: xrpl_client(pages))
+    response = client.post(
+        reverse("paymenttransaction-list"),
+        {"url": "http://localhost:5005", "account": "rSource"},
+        HTTP_HOST="localhost:8001",
+    )
+    assert response.status_code == 202
+    job = response.json()
+    assert job["status"] == "pending"
+    assert not PaymentTransaction.objects.exists()
+
+    call_command("run_payment_jobs", "--once", stdout=StringIO())
+
+    response = client.get(response["Location"], HTTP_HOST="localhost:8001")
+    schema_tester.validate_response(response)
+    job = response.json()
+    assert job["status"] == "done"
+    assert (job["pages"], job["transactions"], job["stored"]) == (3, 5, 3)
+    assert job["ledger_idx"] == 100_000
+    assert set(PaymentTransaction.objects.values_list("hash", flat=True)) == {
+        "a", "c", "e"
+    }
+
+
+@pytest.mark.django_db
+def test_pending_job_is_reused(client):
+    data = {"url": "http://localhost:5005", "account": "rSource"}
+    first = client.post(reverse("paymenttransaction-list"), data,
+                        HTTP_HOST="localhost:8001")
+    second = client.post(reverse("paymenttransaction-list"), data,
+                         HTTP_HOST="localhost:8001")
+    assert first.json()["id"] == second.json()["id"]
+    assert PaymentJob.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_failed_job_reports_error(monkeypatch, xrpl_client):
+    def request(self, request):
+        raise TimeoutException("timed out")
+
+    monkeypatch.setattr(xrpl_client, "request", request)
+    monkeypatch.setattr("xrpl_app.payments.jobs.get_client",
+                        lambda url: xrpl_client([]))
+    queue = PaymentJobQueue()
+    queue.enqueue(account="rSource", url="http://localhost:5005")
+    job = queue.run(queue.claim())
+    assert job.status == PaymentJob.Status.FAILED
+    assert "timed out" in job.error
+
+
+@pytest.mark.django_db
+def test_failed_sync_setup_fails_job(monkeypatch):
+    def get_client(url):
+        raise ValueError("bad node")
+
+    monkeypatch.setattr("xrpl_app.payments.jobs.get_client", get_client)
+    queue = PaymentJobQueue()
+    queue.enqueue(account="rSource", url="http://localhost:5005")
+    job = queue.run(queue.claim())
+    assert job.status == PaymentJob.Status.FAILED
+    assert "bad node" in job.error
+    assert job.finished is not None
+
+
+@pytest.mark.django_db
+def test_sync_continues_after_last_stored_ledger(xrpl_client, payment_tx):
+    AccountSync(xrpl_client([[payment_tx("a", 1)]]), "rSource").run()
+    client = xrpl_client([[payment_tx("b", 100_001)]])
+    result = AccountSync(client, "rSource").run()
+    assert result.stored == 1
+    assert client.requests[0].ledger_index_min == 100_001
+    assert client.requests[0].forward
+
+
+@pytest.mark.django_db
+def test_sync_resumes_from_saved_marker(xrpl_client, payment_tx):
+    pages = [[payment_tx("a", 1)], [payment_tx("b", 2)], [payment_tx("c", 3)]]
+    result = AccountSync(xrpl_client(pages), "rSource", max_pages=2).run()
+    assert result.marker == 2
+    assert result.ledger_idx is None
+    state = AccountSyncState.objects.get(account__hash="rSource")
+    assert state.marker == 2
+
+    client = xrpl_client(pages)
+    result = AccountSync(client, "rSource").run()
+    assert [req.marker for req in client.requests] == [2]
+    assert result.stored == 1
+    assert result.ledger_idx == 100_000
+    state.refresh_from_db()
+    assert state.marker is None
+    assert PaymentTransaction.objects.count() == 3
+
+
+@pytest.mark.django_db
+def test_sync_of_ledger_range_keeps_state(xrpl_client, payment_tx):
+    client = xrpl_client([[payment_tx("a", 10)]])
+    result = AccountSync(client, "rSource", ledger_index_min=5,
+                         ledger_index_max=15).run()
+    assert result.ledger_idx is None
+    assert not client.requests[0].forward
+    assert not AccountSyncState.objects.exists()
@@ -0,0 +1,80 @@
+from urllib.parse import urlencode
+
+import pytest
+from django.urls import reverse
+
+from xrpl_app.models import PaymentTransaction
+
+
+@pytest.fixture
+def payments(transaction):
+    for idx, amount in enumerate(("10", "20.5")):
+        PaymentTransaction.objects.create(
+            account_id=transaction.destination_id,
+            destination_id=transaction.account_id,
+            asset_info=transaction.asset_info,
+            ledger_idx=12_345 + idx * 10_000,
+            hash=f"volume-{idx}",
+            amount=amount,
+            fee="10",
+        )
+    return transaction
+
+
+@pytest.mark.django_db
+def test_volume_by_asset(client, payments, schema_tester):
+    response = client.get(reverse("paymenttransaction-volume-assets"),
+                          HTTP_HOST="localhost:8001")
+    schema_tester.validate_response(response)
+    results = response.json()["results"]
+    assert results[0] == {
+        "issuer": "some-hash",
+        "currency": "UAH",
+        "count": 1,
+        "total": "4321",
+        "min": "4321",
+        "max": "4321",
+        "avg": "4321",
+    }
+    assert results[1] == {
+        "issuer": payments.asset_info.issuer.hash,
+        "currency": payments.asset_info.currency,
+        "count": 3,
+        "total": "1264.5",
+        "min": "10",
+        "max": "1234",
+        "avg": "421.5",
+    }
+
+
+@pytest.mark.django_db
+def test_volume_by_account(client, payments, schema_tester):
+    url = reverse("paymenttransaction-volume-accounts")
+    url += f"?{urlencode({'direction': 'received', 'currency': 'XRP drops'})}"
+    response = client.get(url, HTTP_HOST="localhost:8001")
+    schema_tester.validate_response(response)
+    totals = {row["account"]: (row["count"], row["total"])
+              for row in response.json()["results"]}
+    assert totals == {
+        payments.destination.hash: (1, "1234"),
+        payments.account.hash: (2, "30.5"),
+    }
+
+
+@pytest.mark.django_db
+def test_volume_by_ledger(client, payments, schema_tester):
+    url = reverse("paymenttransaction-volume-ledgers")
+    params = {"bucket": 10_000, "account": payments.destination.hash}
+    url += f"?{urlencode(params)}"
+    response = client.get(url, HTTP_HOST="localhost:8001")
+    schema_tester.validate_response(response)
+    buckets = [(row["ledger_from"], row["ledger_to"], row["total"])
+               for row in response.json()["results"]]
+    assert buckets == [(10_000, 19_999, "10"), (20_000, 29_999, "20.5")]
+
+
+@pytest.mark.django_db
+def test_volume_by_ledger_invalid_bucket(client, payments):
+    url = reverse("paymenttransaction-volume-ledgers") + "?bucket=0"
+    response = client.get(url, HTTP_HOST="localhost:8001")
+    assert response.status_code == 400
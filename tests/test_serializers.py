@@ -0,0 +1,27 @@
+import json
+
+import pytest
+from django.urls import reverse
+
+from xrpl_app.models import PaymentTransaction
+from xrpl_app.serializers import ListPaymentSerializer, PaymentValuesSerializer
+
+
+@pytest.mark.django_db
+def test_payment_values_serializer_matches_model_serializer(transaction):
+    transaction.amount = "0.000125"
+    transaction.save()
+    queryset = PaymentTransaction.objects.order_by("hash")
+    rows = queryset.values(*PaymentValuesSerializer.value_fields)
+    expected = ListPaymentSerializer(queryset, many=True).data
+    data = PaymentValuesSerializer(rows, many=True).data
+    assert json.dumps(data) == json.dumps(expected)
+
+
+@pytest.mark.django_db
+def test_payments_list_is_one_query(client, transaction,
+                                    django_assert_num_queries):
+    url = reverse("paymenttransaction-list") + "?cursor="
+    with django_assert_num_queries(1):
+        response = client.get(url, HTTP_HOST="localhost:8001")
+    assert len(response.json()["results"]) == 2
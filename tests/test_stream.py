@@ -0,0 +1,158 @@
+import asyncio
+import json
+import threading
+
+import pytest
+import websockets
+
+from xrpl_app.models import AccountSyncState, PaymentTransaction
+from xrpl_app.payments import AccountStream
+from xrpl_app.payments.stream import normalize_message
+
+
+class StandInNode:
+    """
+    rippled stand-in which acknowledges the subscription of a connection
+    and pushes its prepared messages. Every connection but the last one is
+    dropped by the server shortly afterwards.
+    """
+
+    def __init__(self, sessions):
+        self.sessions = list(sessions)
+        self.subscriptions = []
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever,
+                                       daemon=True)
+        self.thread.start()
+        self.server = asyncio.run_coroutine_threadsafe(
+            self.serve(), self.loop
+        ).result(5)
+        port = self.server.sockets[0].getsockname()[1]
+        self.url = f"ws://127.0.0.1:{port}/"
+
+    async def serve(self):
+        return await websockets.serve(self.handler, "127.0.0.1", 0)
+
+    async def handler(self, websocket, path=None):
+        request = json.loads(await websocket.recv())
+        self.subscriptions.append(request)
+        await websocket.send(json.dumps(
+            {"type": "response", "status": "success", "result": {}}
+        ))
+        messages = self.sessions.pop(0) if self.sessions else []
+        for message in messages:
+            await websocket.send(json.dumps(message))
+        if self.sessions:
+            # give the client time to read the messages before dropping it
+            await asyncio.sleep(0.5)
+        else:
+            await websocket.wait_closed()
+
+    def close(self):
+        async def shutdown():
+            self.server.close()
+            await self.server.wait_closed()
+
+        asyncio.run_coroutine_threadsafe(shutdown(), self.loop).result(5)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(5)
+
+
+@pytest.fixture
+def stream_message(payment_tx):
+    def make(tx_hash, ledger_idx, **kwargs):
+        elem = payment_tx(tx_hash, ledger_idx, **kwargs)
+        tx = dict(elem["tx"])
+        del tx["ledger_index"]
+        return {
+            "type": "transaction",
+            "engine_result": elem["meta"]["TransactionResult"],
+            "ledger_index": ledger_idx,
+            "meta": elem["meta"],
+            "transaction": tx,
+            "validated": True,
+        }
+
+    return make
+
+
+def test_normalize_message(stream_message, payment_tx):
+    message = stream_message("hash", 7, account="rA")
+    assert normalize_message(message) == payment_tx("hash", 7, account="rA")
+    assert normalize_message({"type": "ledgerClosed"}) is None
+
+
+@pytest.mark.django_db(transaction=True)
+def test_stream_backfills_and_reconnects(xrpl_client, payment_tx,
+                                         stream_message):
+    node = StandInNode([
+        [
+            stream_message("live-1", 100_001, account="rWatched"),
+            stream_message("offer", 100_002, account="rWatched",
+                           tx_type="OfferCreate"),
+        ],
+        [stream_message("live-2", 100_005, destination="rWatched")],
+    ])
+    # the same history answers the backfill of both connections
+    history = {"rWatched": [[payment_tx("old", 10, account="rWatched")]]}
+
+    def on_flush(stream):
+        if stream.stored >= 2:
+            stream.stop()
+
+    stream = AccountStream(
+        node.url,
+        ["rWatched"],
+        xrpl_client(history),
+        flush_interval=0.05,
+        reconnect_delay=0.01,
+        on_flush=on_flush,
+    )
+    watchdog = threading.Timer(10, stream.stop)
+    watchdog.start()
+    try:
+        stream.run()
+    finally:
+        watchdog.cancel()
+        node.close()
+
+    assert stream.connections == 2
+    assert [request["accounts"] for request in node.subscriptions] == [
+        ["rWatched"], ["rWatched"]
+    ]
+    assert set(PaymentTransaction.objects.values_list("hash", flat=True)) == {
+        "old", "live-1", "live-2"
+    }
+    state = AccountSyncState.objects.get(account__hash="rWatched")
+    assert state.ledger_idx == 100_004
+
+
+@pytest.mark.django_db(transaction=True)
+def test_stream_flushes_by_size(xrpl_client, stream_message):
+    node = StandInNode([[
+        stream_message(f"live-{idx}", 100_001 + idx, account="rWatched")
+        for idx in range(4)
+    ]])
+    flushed = []
+
+    def on_flush(stream):
+        flushed.append(stream.stored)
+        if stream.stored >= 4:
+            stream.stop()
+
+    stream = AccountStream(
+        node.url,
+        ["rWatched"],
+        xrpl_client({"rWatched": [[]]}),
+        flush_size=2,
+        flush_interval=60,
+        on_flush=on_flush,
+    )
+    watchdog = threading.Timer(10, stream.stop)
+    watchdog.start()
+    try:
+        stream.run()
+    finally:
+        watchdog.cancel()
+        node.close()
+    assert flushed == [2, 4]
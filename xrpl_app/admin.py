@@ -1,12 +1,19 @@
 from django.contrib import admin
 
-from xrpl_app.models import AssetInfo, PaymentTransaction, XRPLAccount
+from xrpl_app.models import (
+    AccountSyncState,
+    AssetInfo,
+    PaymentJob,
+    PaymentTransaction,
+    XRPLAccount,
+)
+from xrpl_app.pagination import EstimatedCountPaginator
 
 
 @admin.register(AssetInfo)
 class AssetInfoAdmin(admin.ModelAdmin):
     list_display = ("issuer", "currency")
-    search_fields = ("issuer", "currency")
+    search_fields = ("issuer__hash", "currency")
 
 
 @admin.register(XRPLAccount)
@@ -23,10 +30,26 @@ class PaymentAdmin(admin.ModelAdmin):
         "account_hash",
         "dest_hash",
         "destination_tag",
-        "amount",
+        "amount_value",
         "fee",
     )
 
     ordering = ("ledger_idx",)
     list_select_related = True
     search_fields = ("account__hash", "destination__hash", "hash")
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+@admin.register(AccountSyncState)
+class AccountSyncStateAdmin(admin.ModelAdmin):
+    list_display = ("account", "ledger_idx", "updated")
+    search_fields = ("account__hash",)
+
+
+@admin.register(PaymentJob)
+class PaymentJobAdmin(admin.ModelAdmin):
+    list_display = ("id", "account", "status", "stored", "created",
+                    "finished")
+    list_filter = ("status",)
+    search_fields = ("account",)
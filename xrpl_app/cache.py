@@ -0,0 +1,88 @@
+from hashlib import md5
+from typing import Any, Iterable, List
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+PAYMENTS_TAG = "payments"
+ACCOUNTS_TAG = "accounts"
+ASSETS_TAG = "assets"
+
+
+def account_tag(account_hash: str) -> str:
+    return f"account:{account_hash}"
+
+
+def currency_tag(currency: str) -> str:
+    return f"currency:{currency}"
+
+
+class ResponseCache:
+    """
+    Cache of list responses invalidated by tags.
+    Every tag has a version stored in the cache and the key of a response
+    includes the versions of its tags. Invalidation replaces the versions,
+    so the responses computed before are never read again and just expire.
+    """
+
+    key_prefix = "xrpl:response"
+    tag_prefix = "xrpl:tag"
+
+    def __init__(self):
+        self.cache = caches[settings.RESPONSE_CACHE_ALIAS]
+        self.timeout = settings.RESPONSE_CACHE_TIMEOUT
+
+    @property
+    def enabled(self) -> bool:
+        return self.timeout > 0
+
+    def get_tag_key(self, tag: str) -> str:
+        # tags contain user input, keep keys valid for every backend
+        return f"{self.tag_prefix}:{md5(tag.encode()).hexdigest()}"
+
+    def get_versions(self, tags: Iterable[str]) -> List[str]:
+        keys = sorted(self.get_tag_key(tag) for tag in tags)
+        versions = self.cache.get_many(keys)
+        for key in keys:
+            if key not in versions:
+                # never seen or evicted, entries made with an older
+                # version must not match again
+                self.cache.add(key, uuid4().hex, timeout=None)
+                versions[key] = self.cache.get(key)
+        return [versions[key] for key in keys]
+
+    def make_key(self, parts: Iterable[Any], tags: Iterable[str]) -> str:
+        """
+        Args:
+            parts: values identifying the response, e.g. URL and params
+            tags: data the response depends on
+
+        Returns:
+            str: cache key valid until one of the tags is invalidated
+        """
+        raw = repr((tuple(parts), self.get_versions(tags)))
+        return f"{self.key_prefix}:{md5(raw.encode()).hexdigest()}"
+
+    def get(self, key: str) -> Any:
+        return self.cache.get(key)
+
+    def set(self, key: str, value: Any) -> None:
+        self.cache.set(key, value, timeout=self.timeout)
+
+    def invalidate(self, tags: Iterable[str]) -> None:
+        self.cache.set_many(
+            {self.get_tag_key(tag): uuid4().hex for tag in tags},
+            timeout=None,
+        )
+
+
+def invalidate_on_commit(tags: Iterable[str]) -> None:
+    """
+    Invalidate responses by tags once the current transaction commits,
+    immediately in autocommit mode. Rolled back writes invalidate nothing.
+    """
+    tags = set(tags)
+    if tags:
+        transaction.on_commit(lambda: ResponseCache().invalidate(tags))
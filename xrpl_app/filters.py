@@ -1,12 +1,56 @@
+from django.db.models import Subquery
 from django_filters import BooleanFilter, CharFilter, FilterSet, NumberFilter
+from django_filters.constants import EMPTY_VALUES
 
 from xrpl_app.models import AssetInfo, PaymentTransaction, XRPLAccount
 
 
+class RelatedContainsFilter(CharFilter):
+    """
+    Case-sensitive containment match on a field of the referenced model.
+    The pattern is matched against the (much smaller) referenced table,
+    where it can use a trigram index, and the result is joined back by
+    primary key: `field IN (SELECT pk FROM related WHERE col LIKE '%x%')`.
+    """
+
+    def __init__(self, *args, related_model, related_field, **kwargs):
+        self.related_model = related_model
+        self.related_field = related_field
+        super().__init__(*args, **kwargs)
+
+    def filter(self, qs, value):
+        if value in EMPTY_VALUES:
+            return qs
+        related = self.related_model.objects.filter(
+            **{f"{self.related_field}__contains": value}
+        ).values("pk")
+        return qs.filter(**{f"{self.field_name}__in": related})
+
+
+class RelatedExactFilter(RelatedContainsFilter):
+    """
+    Exact match on a unique field of the referenced model, resolved to its
+    primary key once by a scalar subquery:
+    `field = (SELECT pk FROM related WHERE col = 'x')`. Unlike a join, the
+    filtered rows can be read in the order of an index on `field`.
+    """
+
+    def filter(self, qs, value):
+        if value in EMPTY_VALUES:
+            return qs
+        related = self.related_model.objects.filter(
+            **{self.related_field: value}
+        ).values("pk")
+        return qs.filter(**{self.field_name: Subquery(related)})
+
+
 class AssetsFilter(FilterSet):
-    issuer = CharFilter(field_name="issuer__hash", lookup_expr="exact")
-    issuer__contains = CharFilter(field_name="issuer__hash",
-                                  lookup_expr="contains")
+    issuer = RelatedExactFilter(
+        field_name="issuer", related_model=XRPLAccount, related_field="hash"
+    )
+    issuer__contains = RelatedContainsFilter(
+        field_name="issuer", related_model=XRPLAccount, related_field="hash"
+    )
 
     class Meta:
         model = AssetInfo
@@ -24,23 +68,38 @@ class AccountsFilter(FilterSet):
 
 
 class PaymentsFilter(FilterSet):
-    account = CharFilter(field_name="account__hash", lookup_expr="exact")
-    account__contains = CharFilter(field_name="account__hash",
-                                   lookup_expr="contains")
-    destination = CharFilter(field_name="destination__hash",
-                             lookup_expr="exact")
-    destination__contains = CharFilter(
-        field_name="destination__hash", lookup_expr="contains"
-    )
-    issuer = CharFilter(field_name="asset_info__issuer__hash",
-                        lookup_expr="exact")
-    issuer__contains = CharFilter(
-        field_name="asset_info__issuer__hash", lookup_expr="contains"
+    account = RelatedExactFilter(
+        field_name="account", related_model=XRPLAccount, related_field="hash"
+    )
+    account__contains = RelatedContainsFilter(
+        field_name="account", related_model=XRPLAccount, related_field="hash"
+    )
+    destination = RelatedExactFilter(
+        field_name="destination",
+        related_model=XRPLAccount,
+        related_field="hash",
+    )
+    destination__contains = RelatedContainsFilter(
+        field_name="destination",
+        related_model=XRPLAccount,
+        related_field="hash",
+    )
+    issuer = RelatedExactFilter(
+        field_name="asset_info__issuer",
+        related_model=XRPLAccount,
+        related_field="hash",
+    )
+    issuer__contains = RelatedContainsFilter(
+        field_name="asset_info__issuer",
+        related_model=XRPLAccount,
+        related_field="hash",
     )
     currency = CharFilter(field_name="asset_info__currency",
                           lookup_expr="exact")
-    currency__contains = CharFilter(
-        field_name="asset_info__currency", lookup_expr="contains"
+    currency__contains = RelatedContainsFilter(
+        field_name="asset_info",
+        related_model=AssetInfo,
+        related_field="currency",
     )
     destination_tag = NumberFilter(field_name="destination_tag",
                                    lookup_expr="exact")
@@ -51,6 +110,8 @@ class PaymentsFilter(FilterSet):
     class Meta:
         model = PaymentTransaction
         fields = {
-            "ledger_idx": ["exact"],
+            "ledger_idx": ["exact", "gte", "lte"],
             "hash": ["exact", "contains"],
+            "amount": ["gte", "lte"],
+            "fee": ["gte", "lte"],
         }
@@ -0,0 +1,39 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from xrpl_app.partitions import LedgerPartitions
+
+
+class Command(BaseCommand):
+    help = (
+        "Create the ledger range partitions of payments up to ahead of the "
+        "highest stored ledger, run it periodically"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--ahead",
+            type=int,
+            default=settings.XRPL_LEDGER_PARTITIONS_AHEAD,
+            help="Partitions to create after the highest ledger",
+        )
+        parser.add_argument(
+            "--ledger",
+            type=int,
+            default=0,
+            help="Highest ledger to cover if above the stored ones, "
+            "e.g. the last validated ledger",
+        )
+
+    def handle(self, *args, **options):
+        partitions = LedgerPartitions()
+        low, high = partitions.get_bounds()
+        high = max(high or 0, options["ledger"])
+        if low is None:
+            low = high
+        created = partitions.ensure(
+            low, high + options["ahead"] * partitions.size
+        )
+        for name in created:
+            self.stdout.write(f"Created {name}")
+        self.stdout.write(f"{len(created)} partitions created")
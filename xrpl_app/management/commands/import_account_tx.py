@@ -0,0 +1,77 @@
+import multiprocessing
+from functools import partial
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from xrpl_app.payments.dump import DumpImport, ImportResult, import_dump
+
+
+class Command(BaseCommand):
+    help = (
+        "Import account_tx dumps from JSONL or JSON files, optionally gzip "
+        "or zstd compressed. Set XRPL_PAYMENTS_LOADER=copy for large dumps."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("paths", nargs="+", help="Dump files")
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.XRPL_IMPORT_BATCH_SIZE,
+            help="Entries stored per transaction",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Processes importing files in parallel",
+        )
+
+    def handle(self, *args, **options):
+        paths, batch_size = options["paths"], options["batch_size"]
+        workers = min(options["workers"], len(paths))
+        try:
+            if workers > 1:
+                results = self.import_parallel(paths, batch_size, workers)
+            else:
+                results = self.import_serial(paths, batch_size)
+            entries = stored = 0
+            for result in results:
+                self.report(result)
+                entries += result.entries
+                stored += result.stored
+        except (OSError, ValueError) as exc:
+            raise CommandError(str(exc))
+        self.stdout.write(
+            f"Imported {len(paths)} files: {entries} entries, "
+            f"{stored} payments stored"
+        )
+
+    def import_serial(self, paths, batch_size):
+        for path in paths:
+            yield DumpImport(path, batch_size, on_batch=self.progress).run()
+
+    def import_parallel(self, paths, batch_size, workers):
+        # forked workers must not share the connections of the parent
+        connections.close_all()
+        with multiprocessing.Pool(workers) as pool:
+            yield from pool.imap_unordered(
+                partial(import_dump, batch_size=batch_size), paths
+            )
+
+    def progress(self, dump: DumpImport) -> None:
+        result = dump.result
+        rate = result.entries / max(result.seconds, 0.001)
+        self.stdout.write(
+            f"{result.path}: {result.entries} entries, {result.stored} "
+            f"stored, {rate:.0f} entries/s"
+        )
+
+    def report(self, result: ImportResult) -> None:
+        invalid = f", {result.invalid} invalid lines" if result.invalid else ""
+        self.stdout.write(
+            f"Done {result.path}: {result.entries} entries, {result.stored} "
+            f"stored in {result.seconds:.1f}s{invalid}"
+        )
@@ -0,0 +1,44 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from xrpl_app.payments import PaymentJobQueue
+
+
+class Command(BaseCommand):
+    help = "Process queued account payments sync jobs"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit as soon as the queue is empty",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=settings.XRPL_JOB_POLL_INTERVAL,
+            help="Seconds to wait before polling an empty queue again",
+        )
+
+    def handle(self, *args, **options):
+        queue = PaymentJobQueue()
+        while True:
+            close_old_connections()
+            requeued = queue.requeue_stale()
+            if requeued:
+                self.stdout.write(f"Requeued {requeued} stale jobs")
+            job = queue.claim()
+            if job is None:
+                if options["once"]:
+                    break
+                time.sleep(options["poll_interval"])
+                continue
+            account = job.account or f"{len(job.accounts)} accounts"
+            self.stdout.write(f"Processing job {job.pk} for {account}")
+            job = queue.run(job)
+            self.stdout.write(
+                f"Job {job.pk} {job.status}: {job.stored} payments stored"
+            )
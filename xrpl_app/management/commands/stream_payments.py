@@ -0,0 +1,60 @@
+import signal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from xrpl_app.models import AccountSyncState
+from xrpl_app.payments import AccountStream, get_node_pool
+
+
+class Command(BaseCommand):
+    help = "Store payments of watched accounts live from a rippled WebSocket"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "accounts",
+            nargs="*",
+            help="Accounts to watch, all synced accounts if omitted",
+        )
+        parser.add_argument(
+            "--url",
+            default=settings.XRPL_STREAM_URL,
+            help="WebSocket URL of the rippled node",
+        )
+        parser.add_argument(
+            "--flush-size",
+            type=int,
+            default=settings.XRPL_STREAM_FLUSH_SIZE,
+            help="Store buffered payments once that many are received",
+        )
+        parser.add_argument(
+            "--flush-interval",
+            type=float,
+            default=settings.XRPL_STREAM_FLUSH_INTERVAL,
+            help="Seconds after which buffered payments are stored",
+        )
+
+    def handle(self, *args, **options):
+        accounts = options["accounts"] or list(
+            AccountSyncState.objects.order_by("account__hash").values_list(
+                "account__hash", flat=True
+            )
+        )
+        if not accounts:
+            raise CommandError("No accounts to watch")
+        stream = AccountStream(
+            options["url"],
+            accounts,
+            get_node_pool(),
+            flush_size=options["flush_size"],
+            flush_interval=options["flush_interval"],
+        )
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *_: stream.stop())
+        self.stdout.write(f"Streaming payments of {len(accounts)} accounts "
+                          f"from {options['url']}")
+        stream.run()
+        self.stdout.write(
+            f"Stopped: {stream.stored} of {stream.received} streamed "
+            f"payments stored"
+        )
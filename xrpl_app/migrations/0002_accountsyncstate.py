@@ -0,0 +1,27 @@
+# Generated by Django 4.1.5 on 2026-10-18 09:06
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('xrpl_app', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AccountSyncState',
+            fields=[
+                ('account', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='sync_state', serialize=False, to='xrpl_app.xrplaccount')),
+                ('ledger_idx', models.PositiveBigIntegerField(null=True)),
+                ('marker', models.JSONField(null=True)),
+                ('updated', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Account Sync State',
+                'verbose_name_plural': 'Account Sync States',
+            },
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 4.1.5 on 2026-10-18 09:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('xrpl_app', '0002_accountsyncstate'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PaymentJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('account', models.CharField(max_length=35)),
+                ('url', models.URLField()),
+                ('ledger_index_min', models.PositiveBigIntegerField(null=True)),
+                ('ledger_index_max', models.PositiveBigIntegerField(null=True)),
+                ('max_pages', models.PositiveIntegerField(null=True)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='pending', max_length=16)),
+                ('pages', models.PositiveIntegerField(default=0)),
+                ('transactions', models.PositiveBigIntegerField(default=0)),
+                ('stored', models.PositiveBigIntegerField(default=0)),
+                ('marker', models.JSONField(null=True)),
+                ('ledger_idx', models.PositiveBigIntegerField(null=True)),
+                ('error', models.TextField(blank=True)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('updated', models.DateTimeField(auto_now=True)),
+                ('started', models.DateTimeField(null=True)),
+                ('finished', models.DateTimeField(null=True)),
+            ],
+            options={
+                'verbose_name': 'Payment Job',
+                'verbose_name_plural': 'Payment Jobs',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='paymentjob',
+            index=models.Index(fields=['status', 'created'], name='paymentjob_status_created'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.1.5 on 2026-10-18 09:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("xrpl_app", "0003_paymentjob"),
+    ]
+
+    # existing numeric strings are converted in place, PostgreSQL casts the
+    # columns with `ALTER COLUMN ... TYPE ... USING column::type`
+    operations = [
+        migrations.AlterField(
+            model_name="paymenttransaction",
+            name="amount",
+            field=models.DecimalField(decimal_places=96, max_digits=192),
+        ),
+        migrations.AlterField(
+            model_name="paymenttransaction",
+            name="fee",
+            field=models.PositiveBigIntegerField(),
+        ),
+        migrations.AddIndex(
+            model_name="paymenttransaction",
+            index=models.Index(fields=["amount"], name="payment_amount"),
+        ),
+        migrations.AddIndex(
+            model_name="paymenttransaction",
+            index=models.Index(fields=["fee"], name="payment_fee"),
+        ),
+    ]
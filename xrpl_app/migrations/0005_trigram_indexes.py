@@ -0,0 +1,43 @@
+# Generated by Django 4.1.5 on 2026-10-18 09:12
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import (
+    AddIndexConcurrently,
+    TrigramExtension,
+)
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # indexes are built without locking the tables for writes
+    atomic = False
+
+    dependencies = [
+        ("xrpl_app", "0004_numeric_amount_fee"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        AddIndexConcurrently(
+            model_name="assetinfo",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["currency"],
+                name="assetinfo_currency_trgm",
+                opclasses=["gin_trgm_ops"],
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="paymenttransaction",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["hash"], name="payment_hash_trgm", opclasses=["gin_trgm_ops"]
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="xrplaccount",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["hash"],
+                name="xrplaccount_hash_trgm",
+                opclasses=["gin_trgm_ops"],
+            ),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.1.5 on 2026-10-18 09:12
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("xrpl_app", "0005_trigram_indexes"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="paymenttransaction",
+            index=models.Index(
+                fields=["ledger_idx", "hash"], name="payment_ledger_hash"
+            ),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.1.5 on 2026-10-18 09:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("xrpl_app", "0006_payment_ledger_hash_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="paymentjob",
+            name="accounts",
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AddField(
+            model_name="paymentjob",
+            name="results",
+            field=models.JSONField(null=True),
+        ),
+        migrations.AlterField(
+            model_name="paymentjob",
+            name="account",
+            field=models.CharField(blank=True, max_length=35),
+        ),
+    ]
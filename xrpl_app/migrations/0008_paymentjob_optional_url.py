@@ -0,0 +1,18 @@
+# Generated by Django 4.1.5 on 2026-10-18 09:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("xrpl_app", "0007_paymentjob_batch"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="paymentjob",
+            name="url",
+            field=models.URLField(blank=True),
+        ),
+    ]
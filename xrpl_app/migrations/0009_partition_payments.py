@@ -0,0 +1,99 @@
+from django.conf import settings
+from django.db import migrations
+
+PAYMENTS = "xrpl_app_paymenttransaction"
+COLUMNS = ("ledger_idx, destination_tag, hash, amount, fee, account_id, "
+           "asset_info_id, destination_id")
+# the indexes and foreign keys of the payments table under their Django
+# names, which later migrations look up
+INDEXES = {
+    "xrpl_app_paymenttransaction_hash_8d688d86_like":
+        "hash varchar_pattern_ops",
+    "xrpl_app_paymenttransaction_account_id_8634cb8a": "account_id",
+    "xrpl_app_paymenttransaction_account_id_8634cb8a_like":
+        "account_id varchar_pattern_ops",
+    "xrpl_app_paymenttransaction_asset_info_id_c1e3c300": "asset_info_id",
+    "xrpl_app_paymenttransaction_destination_id_74bae103": "destination_id",
+    "xrpl_app_paymenttransaction_destination_id_74bae103_like":
+        "destination_id varchar_pattern_ops",
+    "payment_amount": "amount",
+    "payment_fee": "fee",
+    "payment_ledger_hash": "ledger_idx, hash",
+}
+TRIGRAM_INDEXES = {"payment_hash_trgm": "hash gin_trgm_ops"}
+FOREIGN_KEYS = {
+    "xrpl_app_paymenttran_account_id_8634cb8a_fk_xrpl_app_":
+        "FOREIGN KEY (account_id) REFERENCES xrpl_app_xrplaccount (hash)",
+    "xrpl_app_paymenttran_asset_info_id_c1e3c300_fk_xrpl_app_":
+        "FOREIGN KEY (asset_info_id) REFERENCES xrpl_app_assetinfo (id)",
+    "xrpl_app_paymenttran_destination_id_74bae103_fk_xrpl_app_":
+        "FOREIGN KEY (destination_id) REFERENCES xrpl_app_xrplaccount (hash)",
+}
+
+
+def rebuild(schema_editor, partitioned):
+    """
+    Recreate the payments table, partitioned by ledger_idx or as a plain
+    heap, and copy its rows. Unique constraints of a partitioned table
+    must include the partition key, so its primary key is
+    (hash, ledger_idx). Indexes and foreign keys are recreated under
+    their Django names.
+    """
+    execute = schema_editor.execute
+    new = f"{PAYMENTS}_rebuilt"
+    # writes committed between the copy and the drop would be lost, they
+    # wait for the end of the migration instead
+    execute(f"LOCK TABLE {PAYMENTS} IN SHARE MODE")
+    if partitioned:
+        execute(f"CREATE TABLE {new} (LIKE {PAYMENTS} "
+                f"INCLUDING DEFAULTS INCLUDING CONSTRAINTS) "
+                f"PARTITION BY RANGE (ledger_idx)")
+        execute(f"CREATE TABLE {PAYMENTS}_default PARTITION OF {new} DEFAULT")
+        # ranges of the stored payments, later ones are created by
+        # `manage.py create_payment_partitions`
+        size = settings.XRPL_LEDGER_PARTITION_SIZE
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute(f"SELECT min(ledger_idx), max(ledger_idx) "
+                           f"FROM {PAYMENTS}")
+            low, high = cursor.fetchone()
+        if low is not None:
+            for start in range(low - low % size, high + 1, size):
+                execute(f"CREATE TABLE {PAYMENTS}_l{start} "
+                        f"PARTITION OF {new} "
+                        f"FOR VALUES FROM ({start}) TO ({start + size})")
+        primary_key = "hash, ledger_idx"
+    else:
+        execute(f"CREATE TABLE {new} (LIKE {PAYMENTS} "
+                f"INCLUDING DEFAULTS INCLUDING CONSTRAINTS)")
+        primary_key = "hash"
+    execute(f"INSERT INTO {new} ({COLUMNS}) SELECT {COLUMNS} FROM {PAYMENTS}")
+    execute(f"DROP TABLE {PAYMENTS}")
+    execute(f"ALTER TABLE {new} RENAME TO {PAYMENTS}")
+    execute(f"ALTER TABLE {PAYMENTS} ADD CONSTRAINT {PAYMENTS}_pkey "
+            f"PRIMARY KEY ({primary_key})")
+    for name, columns in INDEXES.items():
+        execute(f"CREATE INDEX {name} ON {PAYMENTS} ({columns})")
+    for name, columns in TRIGRAM_INDEXES.items():
+        execute(f"CREATE INDEX {name} ON {PAYMENTS} USING gin ({columns})")
+    for name, definition in FOREIGN_KEYS.items():
+        execute(f"ALTER TABLE {PAYMENTS} ADD CONSTRAINT {name} {definition} "
+                f"DEFERRABLE INITIALLY DEFERRED")
+
+
+def partition(apps, schema_editor):
+    rebuild(schema_editor, partitioned=True)
+
+
+def unpartition(apps, schema_editor):
+    rebuild(schema_editor, partitioned=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("xrpl_app", "0008_paymentjob_optional_url"),
+    ]
+
+    operations = [
+        migrations.RunPython(partition, unpartition),
+    ]
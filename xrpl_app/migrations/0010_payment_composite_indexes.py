@@ -0,0 +1,74 @@
+# Generated by Django 4.1.5 on 2026-10-18 09:47
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    # indexes of a partitioned table can't be built concurrently, the
+    # composite indexes are created before the foreign key ones they
+    # replace are dropped
+
+    dependencies = [
+        ("xrpl_app", "0009_partition_payments"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="paymenttransaction",
+            index=models.Index(
+                fields=["account", "ledger_idx", "hash"], name="payment_account_ledger"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="paymenttransaction",
+            index=models.Index(
+                fields=["destination", "ledger_idx", "hash"],
+                name="payment_destination_ledger",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="paymenttransaction",
+            index=models.Index(
+                fields=["asset_info", "ledger_idx", "hash"], name="payment_asset_ledger"
+            ),
+        ),
+        migrations.AlterModelOptions(
+            name="paymenttransaction",
+            options={
+                "ordering": ("-ledger_idx", "-hash"),
+                "verbose_name": "Payment Transaction",
+                "verbose_name_plural": "Payment Transactions",
+            },
+        ),
+        migrations.AlterField(
+            model_name="paymenttransaction",
+            name="account",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="account",
+                to="xrpl_app.xrplaccount",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="paymenttransaction",
+            name="asset_info",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="asset_info",
+                to="xrpl_app.assetinfo",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="paymenttransaction",
+            name="destination",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="destination",
+                to="xrpl_app.xrplaccount",
+            ),
+        ),
+    ]
@@ -0,0 +1,72 @@
+from django.db import migrations
+
+# Accounts get bigint surrogate keys in three steps, so the tables stay
+# writable while the references are rewritten:
+# 0011 adds the new nullable columns and keeps them in sync with triggers,
+# 0012 fills them in batches and builds their indexes and constraints
+# without blocking writes, 0013 swaps them in for the old hash columns.
+
+ACCOUNT_IDS_FUNCTION = """
+CREATE FUNCTION xrpl_app_account_ids() RETURNS trigger
+LANGUAGE plpgsql AS $$
+DECLARE
+    data jsonb := to_jsonb(NEW);
+    ids jsonb := '{}';
+BEGIN
+    -- arguments are pairs of hash and id columns
+    FOR i IN 0..(TG_NARGS / 2 - 1) LOOP
+        ids := ids || jsonb_build_object(
+            TG_ARGV[2 * i + 1],
+            (SELECT id FROM xrpl_app_xrplaccount
+             WHERE hash = data ->> TG_ARGV[2 * i])
+        );
+    END LOOP;
+    NEW := jsonb_populate_record(NEW, ids);
+    RETURN NEW;
+END
+$$
+"""
+
+# table -> pairs of hash and id columns
+REFERENCES = {
+    "xrpl_app_accountsyncstate": [("account_id", "account_new")],
+    "xrpl_app_assetinfo": [("issuer_id", "issuer_new")],
+    "xrpl_app_paymenttransaction": [
+        ("account_id", "account_new"),
+        ("destination_id", "destination_new"),
+    ],
+}
+
+
+def get_operations():
+    operations = [
+        "ALTER TABLE xrpl_app_xrplaccount ADD COLUMN id bigint",
+        "CREATE SEQUENCE xrpl_app_xrplaccount_id_seq "
+        "OWNED BY xrpl_app_xrplaccount.id",
+        # new accounts get their ids right away
+        "ALTER TABLE xrpl_app_xrplaccount ALTER COLUMN id "
+        "SET DEFAULT nextval('xrpl_app_xrplaccount_id_seq')",
+        ACCOUNT_IDS_FUNCTION,
+    ]
+    for table, columns in REFERENCES.items():
+        operations += [
+            f"ALTER TABLE {table} ADD COLUMN {new} bigint"
+            for _, new in columns
+        ]
+        arguments = ", ".join(f"'{column}'" for pair in columns
+                              for column in pair)
+        operations.append(
+            f"CREATE TRIGGER xrpl_app_account_ids BEFORE INSERT OR UPDATE "
+            f"ON {table} FOR EACH ROW "
+            f"EXECUTE FUNCTION xrpl_app_account_ids({arguments})"
+        )
+    return [migrations.RunSQL(sql) for sql in operations]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("xrpl_app", "0010_payment_composite_indexes"),
+    ]
+
+    operations = get_operations()
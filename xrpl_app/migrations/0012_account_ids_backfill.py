@@ -0,0 +1,171 @@
+import logging
+
+from django.db import migrations, transaction
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 10_000
+ACCOUNTS = "xrpl_app_xrplaccount"
+SYNC_STATES = "xrpl_app_accountsyncstate"
+ASSETS = "xrpl_app_assetinfo"
+PAYMENTS = "xrpl_app_paymenttransaction"
+REFERENCE = (f"REFERENCES {ACCOUNTS} (id) "
+             f"DEFERRABLE INITIALLY DEFERRED")
+
+
+def backfill(connection, table, key, assignment, join="", condition="TRUE"):
+    """
+    Run the `assignment` update over `table` in batches of its `key`
+    order, one transaction per batch so rows are locked only briefly.
+    """
+    columns = ", ".join(key)
+    prefixed = ", ".join(f"t.{column}" for column in key)
+    last, total = None, 0
+    while True:
+        with transaction.atomic(using=connection.alias), \
+                connection.cursor() as cursor:
+            after = "" if last is None else f"WHERE ({columns}) > %s"
+            cursor.execute(
+                f"SELECT {columns} FROM {table} {after} "
+                f"ORDER BY {columns} OFFSET {BATCH_SIZE - 1} LIMIT 1",
+                [] if last is None else [last],
+            )
+            upper = cursor.fetchone()
+            bounds = [condition]
+            if last is not None:
+                bounds.append(f"({prefixed}) > %s")
+            if upper is not None:
+                bounds.append(f"({prefixed}) <= %s")
+            cursor.execute(
+                f"UPDATE {table} t SET {assignment} {join} "
+                f"WHERE {' AND '.join(bounds)}",
+                [bound for bound in (last, upper) if bound is not None],
+            )
+            total += cursor.rowcount
+        if upper is None:
+            break
+        last = upper
+    logger.info(f"Assigned account ids to {total} rows of {table}.")
+
+
+def get_partitions(connection, table):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = %s::regclass",
+            [table],
+        )
+        return [name for name, in cursor.fetchall()]
+
+
+def create_index(schema_editor, name, table, columns, unique=False):
+    """Build an index without blocking writes, rebuilt if left invalid."""
+    unique = "UNIQUE " if unique else ""
+    schema_editor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+    schema_editor.execute(
+        f"CREATE {unique}INDEX CONCURRENTLY {name} ON {table} ({columns})"
+    )
+
+
+def create_partitioned_index(schema_editor, name, table, columns):
+    """
+    Indexes of a partitioned table can't be built concurrently, the index
+    of every partition is built on its own and attached instead.
+    """
+    schema_editor.execute(f"DROP INDEX IF EXISTS {name}")
+    schema_editor.execute(f"CREATE INDEX {name} ON ONLY {table} ({columns})")
+    for partition in get_partitions(schema_editor.connection, table):
+        index = f"{partition}_{columns.split(',')[0]}_idx"
+        create_index(schema_editor, index, partition, columns)
+        schema_editor.execute(f"ALTER INDEX {name} ATTACH PARTITION {index}")
+
+
+def add_constraint(schema_editor, table, name, definition):
+    """
+    Add the constraint as NOT VALID and validate it afterwards, which
+    doesn't block writes.
+    """
+    schema_editor.execute(f"ALTER TABLE {table} DROP CONSTRAINT IF EXISTS "
+                          f"{name}")
+    schema_editor.execute(f"ALTER TABLE {table} ADD CONSTRAINT {name} "
+                          f"{definition} NOT VALID")
+    schema_editor.execute(f"ALTER TABLE {table} VALIDATE CONSTRAINT {name}")
+
+
+def add_not_null(schema_editor, table, column):
+    # a validated check spares the table scan of SET NOT NULL in 0013
+    add_constraint(schema_editor, table, f"{table}_{column}_not_null",
+                   f"CHECK ({column} IS NOT NULL)")
+
+
+def assign_ids(apps, schema_editor):
+    connection = schema_editor.connection
+    backfill(connection, ACCOUNTS, ["hash"],
+             "id = nextval('xrpl_app_xrplaccount_id_seq')",
+             condition="t.id IS NULL")
+    join = f"FROM {ACCOUNTS} a"
+    backfill(connection, SYNC_STATES, ["account_id"], "account_new = a.id",
+             join, "a.hash = t.account_id")
+    backfill(connection, ASSETS, ["id"], "issuer_new = a.id",
+             join, "a.hash = t.issuer_id")
+    backfill(connection, PAYMENTS, ["ledger_idx", "hash"],
+             "account_new = a.id, destination_new = d.id",
+             f"{join}, {ACCOUNTS} d",
+             "a.hash = t.account_id AND d.hash = t.destination_id")
+
+
+def build_constraints(apps, schema_editor):
+    # unique indexes to become the primary key and the unique hash in 0013
+    create_index(schema_editor, f"{ACCOUNTS}_id_new", ACCOUNTS, "id",
+                 unique=True)
+    create_index(schema_editor,
+                 schema_editor._create_index_name(ACCOUNTS, ["hash"],
+                                                  suffix="_uniq"),
+                 ACCOUNTS, "hash", unique=True)
+    add_not_null(schema_editor, ACCOUNTS, "id")
+
+    create_index(schema_editor, f"{SYNC_STATES}_account_new", SYNC_STATES,
+                 "account_new", unique=True)
+    create_index(schema_editor, "unique_issuer_currency_new", ASSETS,
+                 "issuer_new, currency", unique=True)
+    create_index(schema_editor, f"{ASSETS}_issuer_new", ASSETS, "issuer_new")
+    for table, column in [(SYNC_STATES, "account_new"),
+                          (ASSETS, "issuer_new")]:
+        add_not_null(schema_editor, table, column)
+        add_constraint(schema_editor, table, f"{table}_{column}_fk",
+                       f"FOREIGN KEY ({column}) {REFERENCE}")
+
+    create_partitioned_index(schema_editor, "payment_account_ledger_new",
+                             PAYMENTS, "account_new, ledger_idx, hash")
+    create_partitioned_index(schema_editor, "payment_destination_ledger_new",
+                             PAYMENTS, "destination_new, ledger_idx, hash")
+    partitions = get_partitions(schema_editor.connection, PAYMENTS)
+    for column in ["account_new", "destination_new"]:
+        add_not_null(schema_editor, PAYMENTS, column)
+        # foreign keys of a partitioned table can't be NOT VALID, the ones
+        # of its partitions are validated first and then adopted by it
+        schema_editor.execute(f"ALTER TABLE {PAYMENTS} DROP CONSTRAINT "
+                              f"IF EXISTS {PAYMENTS}_{column}_fk")
+        for partition in partitions:
+            add_constraint(schema_editor, partition,
+                           f"{partition}_{column}_fk",
+                           f"FOREIGN KEY ({column}) {REFERENCE}")
+        schema_editor.execute(
+            f"ALTER TABLE {PAYMENTS} ADD CONSTRAINT {PAYMENTS}_{column}_fk "
+            f"FOREIGN KEY ({column}) {REFERENCE}"
+        )
+
+
+class Migration(migrations.Migration):
+    # every batch and index build commits on its own
+    atomic = False
+
+    dependencies = [
+        ("xrpl_app", "0011_account_ids_prepare"),
+    ]
+
+    operations = [
+        migrations.RunPython(assign_ids),
+        migrations.RunPython(build_constraints),
+    ]
@@ -0,0 +1,134 @@
+from django.db import migrations, models
+
+ACCOUNTS = "xrpl_app_xrplaccount"
+SYNC_STATES = "xrpl_app_accountsyncstate"
+ASSETS = "xrpl_app_assetinfo"
+PAYMENTS = "xrpl_app_paymenttransaction"
+
+
+def get_partitions(connection, table):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = %s::regclass",
+            [table],
+        )
+        return [name for name, in cursor.fetchall()]
+
+
+def swap(apps, schema_editor):
+    """
+    Replace the hash references with the id columns filled by 0012 and
+    make the id the primary key of accounts. The indexes and constraints
+    are already built and validated, so the tables are locked only for
+    the catalog changes.
+    """
+    execute = schema_editor.execute
+
+    def set_not_null(table, column):
+        execute(f"ALTER TABLE {table} ALTER COLUMN {column} SET NOT NULL")
+        execute(f"ALTER TABLE {table} DROP CONSTRAINT "
+                f"{table}_{column}_not_null")
+
+    def adopt(table, column):
+        """Rename the new column and its foreign key after the old ones."""
+        old = column.replace("_new", "_id")
+        execute(f"ALTER TABLE {table} RENAME COLUMN {column} TO {old}")
+        execute(f"ALTER TABLE {table} RENAME CONSTRAINT "
+                f"{table}_{column}_not_null TO {table}_{old}_not_null")
+        set_not_null(table, old)
+        fk_name = schema_editor._create_index_name(
+            table, [old], suffix=f"_fk_{ACCOUNTS}_id"
+        )
+        execute(f"ALTER TABLE {table} RENAME CONSTRAINT {table}_{column}_fk "
+                f"TO {fk_name}")
+
+    for table in [SYNC_STATES, ASSETS, PAYMENTS]:
+        execute(f"DROP TRIGGER xrpl_app_account_ids ON {table}")
+    execute("DROP FUNCTION xrpl_app_account_ids()")
+    # the old columns go along with their indexes and foreign keys
+    execute(f"ALTER TABLE {SYNC_STATES} DROP COLUMN account_id")
+    execute(f"ALTER TABLE {ASSETS} DROP COLUMN issuer_id")
+    execute(f"ALTER TABLE {PAYMENTS} DROP COLUMN account_id, "
+            f"DROP COLUMN destination_id")
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f"SELECT coalesce(max(id), 0) + 1 FROM {ACCOUNTS}")
+        start, = cursor.fetchone()
+    execute(f"ALTER TABLE {ACCOUNTS} DROP CONSTRAINT {ACCOUNTS}_pkey")
+    set_not_null(ACCOUNTS, "id")
+    execute(f"ALTER TABLE {ACCOUNTS} ADD CONSTRAINT {ACCOUNTS}_pkey "
+            f"PRIMARY KEY USING INDEX {ACCOUNTS}_id_new")
+    unique = schema_editor._create_index_name(ACCOUNTS, ["hash"],
+                                              suffix="_uniq")
+    execute(f"ALTER TABLE {ACCOUNTS} ADD CONSTRAINT {unique} "
+            f"UNIQUE USING INDEX {unique}")
+    # an identity column like the other Django primary keys
+    execute(f"ALTER TABLE {ACCOUNTS} ALTER COLUMN id DROP DEFAULT")
+    execute(f"DROP SEQUENCE {ACCOUNTS}_id_seq")
+    execute(f"ALTER TABLE {ACCOUNTS} ALTER COLUMN id "
+            f"ADD GENERATED BY DEFAULT AS IDENTITY (START WITH {start})")
+
+    adopt(SYNC_STATES, "account_new")
+    execute(f"ALTER TABLE {SYNC_STATES} ADD CONSTRAINT {SYNC_STATES}_pkey "
+            f"PRIMARY KEY USING INDEX {SYNC_STATES}_account_new")
+
+    adopt(ASSETS, "issuer_new")
+    execute(f"ALTER TABLE {ASSETS} ADD CONSTRAINT unique_issuer_currency "
+            f"UNIQUE USING INDEX unique_issuer_currency_new")
+    execute(f"ALTER INDEX {ASSETS}_issuer_new RENAME TO "
+            f"{schema_editor._create_index_name(ASSETS, ['issuer_id'])}")
+
+    partitions = get_partitions(schema_editor.connection, PAYMENTS)
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT conname FROM pg_constraint "
+            "WHERE conrelid = ANY(%s::regclass[])",
+            [partitions],
+        )
+        constraints = {name for name, in cursor.fetchall()}
+    for column, index in [("account_new", "payment_account_ledger"),
+                          ("destination_new", "payment_destination_ledger")]:
+        adopt(PAYMENTS, column)
+        execute(f"ALTER INDEX {index}_new RENAME TO {index}")
+        # partitions created since 0012 have their own names
+        old = column.replace("_new", "_id")
+        for partition in partitions:
+            execute(f"ALTER INDEX IF EXISTS {partition}_{column}_idx "
+                    f"RENAME TO {partition}_{old}_idx")
+            if f"{partition}_{column}_fk" in constraints:
+                execute(f"ALTER TABLE {partition} RENAME CONSTRAINT "
+                        f"{partition}_{column}_fk TO {partition}_{old}_fk")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("xrpl_app", "0012_account_ids_backfill"),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[migrations.RunPython(swap)],
+            state_operations=[
+                migrations.AddField(
+                    model_name="xrplaccount",
+                    name="id",
+                    field=models.BigAutoField(
+                        auto_created=True,
+                        default=None,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                    preserve_default=False,
+                ),
+                migrations.AlterField(
+                    model_name="xrplaccount",
+                    name="hash",
+                    field=models.CharField(max_length=35, unique=True),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,130 @@
+from hashlib import md5
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+from rest_framework import mixins
+from rest_framework.response import Response
+
+from xrpl_app.cache import ResponseCache
+
+
+class ConditionalListMixin(mixins.ListModelMixin):
+    """
+    List a queryset with an ETag derived from the keys of the page rows
+    (`etag_fields`) and the count and links reported by the pagination,
+    so it costs no query besides the page. Requests with a matching
+    If-None-Match get 304 Not Modified before anything is serialized.
+    """
+
+    etag_fields = ("pk",)
+
+    def get_list_etag(self, rows: list, links: tuple = ()) -> str:
+        keys = (
+            "/".join(
+                str(row[name] if isinstance(row, dict)
+                    else getattr(row, name))
+                for name in self.etag_fields
+            )
+            for row in rows
+        )
+        key = "|".join(
+            [
+                self.request.get_full_path(),
+                self.request.accepted_renderer.format,
+                f"count={getattr(self.paginator, 'count', None)}",
+                *(str(link) for link in links),
+                *keys,
+            ]
+        )
+        return quote_etag(md5(key.encode()).hexdigest())
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        if page is None:
+            rows, links = list(queryset), ()
+        else:
+            rows = page
+            links = (self.paginator.get_next_link(),
+                     self.paginator.get_previous_link())
+        etag = self.get_list_etag(rows, links)
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            serializer = self.get_serializer(rows, many=True)
+            if page is None:
+                response = Response(serializer.data)
+            else:
+                response = self.get_paginated_response(serializer.data)
+        response["ETag"] = etag
+        return response
+
+
+class ConditionalRetrieveMixin(mixins.RetrieveModelMixin):
+    """
+    Retrieve an object with an ETag, by default its primary key, which
+    fits immutable objects such as validated payments.
+    """
+
+    def get_object_etag(self, instance) -> str:
+        return quote_etag(str(instance.pk))
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        etag = self.get_object_etag(instance)
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = Response(self.get_serializer(instance).data)
+        response["ETag"] = etag
+        return response
+
+
+class CachedListMixin(ConditionalListMixin):
+    """
+    Keep list responses in the response cache, keyed by the URL with
+    normalized query parameters and the versions of the cache tags.
+    Exact filters by account or currency tag the response with the value,
+    other lists depend on all the data and use `cache_tag`.
+    """
+
+    cache_tag = None
+    cache_tag_params = {}
+
+    def get_cache_tags(self) -> set:
+        params = self.request.query_params
+        tags = {
+            make_tag(params[name])
+            for name, make_tag in self.cache_tag_params.items()
+            if params.get(name)
+        }
+        return tags or {self.cache_tag}
+
+    def get_cache_key(self, response_cache: ResponseCache) -> str:
+        request = self.request
+        params = sorted(
+            (name, sorted(values))
+            for name, values in request.query_params.lists()
+        )
+        parts = (
+            request.build_absolute_uri(request.path),
+            request.accepted_renderer.format,
+            params,
+        )
+        return response_cache.make_key(parts, self.get_cache_tags())
+
+    def list(self, request, *args, **kwargs):
+        response_cache = ResponseCache()
+        if not response_cache.enabled:
+            return super().list(request, *args, **kwargs)
+        key = self.get_cache_key(response_cache)
+        cached = response_cache.get(key)
+        if cached is None:
+            response = super().list(request, *args, **kwargs)
+            if response.status_code == 200:
+                response_cache.set(key, (response.data, response["ETag"]))
+            return response
+        data, etag = cached
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = Response(data)
+        response["ETag"] = etag
+        return response
@@ -1,15 +1,31 @@
+from decimal import Decimal
+
 from django.conf import settings
 from django.contrib import admin
+from django.contrib.postgres.indexes import GinIndex
 from django.db import models
 
-from xrpl_app.validators import validate_numeric
+# https://xrpl.org/currency-formats.html#token-precision
+# token amounts have 16 significant digits and exponents from -96 to 80
+AMOUNT_MAX_DIGITS = 192
+AMOUNT_DECIMAL_PLACES = 96
+
+
+def format_amount(value: Decimal) -> str:
+    """Plain notation of a decimal without trailing zeros."""
+    return format(value.normalize(), "f")
 
 
 class XRPLAccount(models.Model):
     # https://xrpl.org/accounts.html#addresses
-    hash = models.CharField(max_length=35, primary_key=True)
+    hash = models.CharField(max_length=35, unique=True)
 
     class Meta:
+        indexes = [
+            # backs `contains` filters
+            GinIndex(fields=["hash"], opclasses=["gin_trgm_ops"],
+                     name="xrplaccount_hash_trgm"),
+        ]
         verbose_name_plural = "XRPL Accounts"
         verbose_name = "XRPL Account"
 
@@ -36,6 +52,10 @@ class AssetInfo(models.Model):
                 fields=["issuer", "currency"], name="unique_issuer_currency"
             )
         ]
+        indexes = [
+            GinIndex(fields=["currency"], opclasses=["gin_trgm_ops"],
+                     name="assetinfo_currency_trgm"),
+        ]
         verbose_name_plural = "Assets Info"
         verbose_name = "Asset Info"
 
@@ -51,14 +71,24 @@ class AssetInfo(models.Model):
 
 
 class PaymentTransaction(models.Model):
+    # foreign keys are covered by the composite indexes below
     account = models.ForeignKey(
-        XRPLAccount, on_delete=models.CASCADE, related_name="account"
+        XRPLAccount,
+        on_delete=models.CASCADE,
+        related_name="account",
+        db_index=False,
     )
     destination = models.ForeignKey(
-        XRPLAccount, on_delete=models.CASCADE, related_name="destination"
+        XRPLAccount,
+        on_delete=models.CASCADE,
+        related_name="destination",
+        db_index=False,
     )
     asset_info = models.ForeignKey(
-        AssetInfo, on_delete=models.CASCADE, related_name="asset_info"
+        AssetInfo,
+        on_delete=models.CASCADE,
+        related_name="asset_info",
+        db_index=False,
     )
     # https://xrpl.org/basic-data-types.html#ledger-index
     ledger_idx = models.PositiveBigIntegerField()
@@ -66,10 +96,32 @@ class PaymentTransaction(models.Model):
     # https://xrpl.org/basic-data-types.html#hashes
     hash = models.CharField(max_length=64, primary_key=True)
     # https://xrpl.org/currency-formats.html
-    amount = models.CharField(max_length=24, validators=[validate_numeric])
-    fee = models.CharField(max_length=24, validators=[validate_numeric])
+    # drops for XRP payments, token value for IOU payments
+    amount = models.DecimalField(max_digits=AMOUNT_MAX_DIGITS,
+                                 decimal_places=AMOUNT_DECIMAL_PLACES)
+    # https://xrpl.org/transaction-cost.html, always in drops
+    fee = models.PositiveBigIntegerField()
 
     class Meta:
+        indexes = [
+            models.Index(fields=["amount"], name="payment_amount"),
+            models.Index(fields=["fee"], name="payment_fee"),
+            # keyset pagination
+            models.Index(fields=["ledger_idx", "hash"],
+                         name="payment_ledger_hash"),
+            # latest payments of an account or asset, read in index order
+            # for the default ordering and ledger ranges
+            models.Index(fields=["account", "ledger_idx", "hash"],
+                         name="payment_account_ledger"),
+            models.Index(fields=["destination", "ledger_idx", "hash"],
+                         name="payment_destination_ledger"),
+            models.Index(fields=["asset_info", "ledger_idx", "hash"],
+                         name="payment_asset_ledger"),
+            GinIndex(fields=["hash"], opclasses=["gin_trgm_ops"],
+                     name="payment_hash_trgm"),
+        ]
+        # stable pages, matches the keyset pagination
+        ordering = ("-ledger_idx", "-hash")
         verbose_name_plural = "Payment Transactions"
         verbose_name = "Payment Transaction"
 
@@ -84,6 +136,11 @@ class PaymentTransaction(models.Model):
             return f"{trans_hash[:10]}…"
         return trans_hash
 
+    @property
+    @admin.display(description="Amount", ordering="amount")
+    def amount_value(self):
+        return format_amount(self.amount)
+
     @property
     @admin.display(description="Source Hash")
     def account_hash(self):
@@ -99,3 +156,73 @@ class PaymentTransaction(models.Model):
         if len(dest_hash) > 10:
             return f"{dest_hash[:10]}…"
         return dest_hash
+
+
+class AccountSyncState(models.Model):
+    account = models.OneToOneField(
+        XRPLAccount,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="sync_state",
+    )
+    # the account history is fully stored up to this ledger (inclusive)
+    ledger_idx = models.PositiveBigIntegerField(null=True)
+    # https://xrpl.org/markers-and-pagination.html
+    marker = models.JSONField(null=True)
+    updated = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = "Account Sync States"
+        verbose_name = "Account Sync State"
+
+    def __str__(self):
+        return f"{self.account.hash}@{self.ledger_idx}"
+
+    @property
+    def ledger_index_min(self) -> int | None:
+        if self.ledger_idx is None:
+            return None
+        return self.ledger_idx + 1
+
+
+class PaymentJob(models.Model):
+    class Status(models.TextChoices):
+        PENDING = "pending"
+        RUNNING = "running"
+        DONE = "done"
+        FAILED = "failed"
+
+    # a single account or the accounts of a batch
+    account = models.CharField(max_length=35, blank=True)
+    accounts = models.JSONField(default=list, blank=True)
+    # the nodes of XRPL_NODES if not set
+    url = models.URLField(blank=True)
+    ledger_index_min = models.PositiveBigIntegerField(null=True)
+    ledger_index_max = models.PositiveBigIntegerField(null=True)
+    max_pages = models.PositiveIntegerField(null=True)
+    status = models.CharField(max_length=16, choices=Status.choices,
+                              default=Status.PENDING)
+    pages = models.PositiveIntegerField(default=0)
+    transactions = models.PositiveBigIntegerField(default=0)
+    stored = models.PositiveBigIntegerField(default=0)
+    marker = models.JSONField(null=True)
+    ledger_idx = models.PositiveBigIntegerField(null=True)
+    # progress of each account of a batch
+    results = models.JSONField(null=True)
+    error = models.TextField(blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+    updated = models.DateTimeField(auto_now=True)
+    started = models.DateTimeField(null=True)
+    finished = models.DateTimeField(null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "created"],
+                         name="paymentjob_status_created"),
+        ]
+        verbose_name_plural = "Payment Jobs"
+        verbose_name = "Payment Job"
+
+    def __str__(self):
+        account = self.account or f"{len(self.accounts)} accounts"
+        return f"{account} ({self.status})"
@@ -0,0 +1,287 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as BinasciiError
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.paginator import EmptyPage, PageNotAnInteger, Paginator
+from django.db import connections
+from django.db.models import Q, QuerySet
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import (
+    BasePagination,
+    LimitOffsetPagination,
+    _positive_int,
+)
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+def estimate_count(queryset: QuerySet) -> int | None:
+    """
+    Planner estimate of the number of rows returned by the queryset.
+    Plain table scans take the table statistics from `pg_class.reltuples`,
+    other queries the row estimate of EXPLAIN.
+    Returns:
+        int: estimated number of rows, None if the table was never analyzed
+    """
+    query = queryset.query
+    if not (query.where or query.group_by or query.distinct
+            or query.annotations or query.combinator):
+        with connections[queryset.db].cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples FROM pg_class WHERE oid = %s::regclass",
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        if row is not None and row[0] >= 0:
+            return int(row[0])
+    plan = json.loads(queryset.explain(format="json"))
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def get_count(queryset: QuerySet) -> tuple[int, bool]:
+    """
+    Exact count for small results, planner estimate above the threshold
+    where COUNT(*) would have to visit too many rows.
+    Returns:
+        int: number of rows
+        bool: whether the number is exact
+    """
+    estimate = estimate_count(queryset)
+    if estimate is not None and estimate >= settings.COUNT_ESTIMATE_THRESHOLD:
+        return estimate, False
+    return queryset.count(), True
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Django paginator with estimated counts for large querysets. Page
+    numbers aren't checked against an estimate, a page reads one more row
+    to tell whether there is a next one.
+    """
+
+    @cached_property
+    def counted(self) -> tuple[int, bool]:
+        return get_count(self.object_list)
+
+    @property
+    def count(self):
+        count, _ = self.counted
+        return count
+
+    @property
+    def count_is_exact(self):
+        _, is_exact = self.counted
+        return is_exact
+
+    def validate_number(self, number):
+        if self.count_is_exact:
+            return super().validate_number(number)
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger(self.error_messages["invalid_page"])
+        if number < 1:
+            raise EmptyPage(self.error_messages["min_page"])
+        return number
+
+    def page(self, number):
+        if self.count_is_exact:
+            return super().page(number)
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom: bottom + self.per_page + 1])
+        if not rows and number > 1:
+            raise EmptyPage(self.error_messages["no_results"])
+        if len(rows) > self.per_page:
+            self.num_pages = max(self.num_pages, number + 1)
+        else:
+            self.num_pages = number
+        return self._get_page(rows[: self.per_page], number, self)
+
+
+class EstimatedCountPagination(LimitOffsetPagination):
+    """
+    Limit/offset pagination which reports planner estimates instead of
+    exact counts for large results, the response tells which one it is.
+    The estimate is only reported: a page reads one more row to tell
+    whether there is a next one.
+    """
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.limit = self.get_limit(request)
+        if self.limit is None:
+            return None
+        self.count_is_exact = True
+        self.count = self.get_count(queryset)
+        self.offset = self.get_offset(request)
+        if self.count > self.limit and self.template is not None:
+            self.display_page_controls = True
+        results = list(queryset[self.offset: self.offset + self.limit + 1])
+        self.has_next = len(results) > self.limit
+        return results[: self.limit]
+
+    def get_count(self, queryset):
+        if not isinstance(queryset, QuerySet):
+            return super().get_count(queryset)
+        count, self.count_is_exact = get_count(queryset)
+        return count
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        url = replace_query_param(url, self.limit_query_param, self.limit)
+        offset = self.offset + self.limit
+        return replace_query_param(url, self.offset_query_param, offset)
+
+    def get_paginated_response(self, data):
+        return Response(
+            OrderedDict(
+                [
+                    ("count", self.count),
+                    ("count_is_exact", self.count_is_exact),
+                    ("next", self.get_next_link()),
+                    ("previous", self.get_previous_link()),
+                    ("results", data),
+                ]
+            )
+        )
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset pagination over `(ledger_idx, hash)`, latest payments first.
+    Pages are selected with `WHERE (ledger_idx, hash) < (last seen key)`
+    walking the composite index, so deep pages cost as much as the first
+    one. Cursors are opaque tokens which encode the boundary key.
+    """
+
+    cursor_query_param = "cursor"
+    limit_query_param = "limit"
+    page_size = api_settings.PAGE_SIZE
+    max_page_size = 1000
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.limit = self.get_limit(request)
+        self.key, self.reverse = self.decode_cursor(request)
+        if self.key is not None:
+            ledger_idx, tx_hash = self.key
+            # the redundant bound on ledger_idx gives the planner an index
+            # range to scan instead of evaluating the OR for every row
+            if self.reverse:
+                after = Q(ledger_idx__gt=ledger_idx) | Q(hash__gt=tx_hash)
+                queryset = queryset.filter(after, ledger_idx__gte=ledger_idx)
+            else:
+                before = Q(ledger_idx__lt=ledger_idx) | Q(hash__lt=tx_hash)
+                queryset = queryset.filter(before, ledger_idx__lte=ledger_idx)
+        if self.reverse:
+            queryset = queryset.order_by("ledger_idx", "hash")
+        else:
+            queryset = queryset.order_by("-ledger_idx", "-hash")
+        results = list(queryset[: self.limit + 1])
+        self.has_more = len(results) > self.limit
+        results = results[: self.limit]
+        if self.reverse:
+            results.reverse()
+        self.page = results
+        return results
+
+    def get_paginated_response(self, data):
+        return Response(
+            OrderedDict(
+                [
+                    ("next", self.get_next_link()),
+                    ("previous", self.get_previous_link()),
+                    ("results", data),
+                ]
+            )
+        )
+
+    def get_limit(self, request):
+        try:
+            return _positive_int(
+                request.query_params[self.limit_query_param],
+                strict=True,
+                cutoff=self.max_page_size,
+            )
+        except (KeyError, ValueError):
+            return self.page_size
+
+    def get_next_link(self):
+        has_next = self.has_more if not self.reverse else True
+        if not (has_next and self.page):
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        has_previous = self.has_more if self.reverse else self.key is not None
+        if not (has_previous and self.page):
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    @staticmethod
+    def get_key(item):
+        if isinstance(item, dict):
+            return item["ledger_idx"], item["hash"]
+        return item.ledger_idx, item.hash
+
+    def encode_cursor(self, item, reverse):
+        ledger_idx, tx_hash = self.get_key(item)
+        data = json.dumps({"l": ledger_idx, "h": tx_hash, "r": reverse})
+        token = urlsafe_b64encode(data.encode()).decode()
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, token)
+
+    def decode_cursor(self, request):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None, False
+        try:
+            data = json.loads(urlsafe_b64decode(token.encode()))
+            key = (int(data["l"]), str(data["h"]))
+            return key, bool(data["r"])
+        except (BinasciiError, KeyError, TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+
+class PaymentsPagination(EstimatedCountPagination):
+    """
+    Limit/offset pagination with estimated counts by default, keyset
+    pagination for payment listings requested with the `cursor` query
+    parameter (empty for the first page).
+    """
+
+    keyset_class = KeysetPagination
+    keyset_actions = ("list",)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if (
+            getattr(view, "action", None) in self.keyset_actions
+            and self.keyset_class.cursor_query_param in request.query_params
+        ):
+            self.keyset = self.keyset_class()
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def get_next_link(self):
+        if self.keyset is not None:
+            return self.keyset.get_next_link()
+        return super().get_next_link()
+
+    def get_previous_link(self):
+        if self.keyset is not None:
+            return self.keyset.get_previous_link()
+        return super().get_previous_link()
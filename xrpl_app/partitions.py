@@ -0,0 +1,129 @@
+import logging
+import re
+from typing import Dict, List, Tuple
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, models, transaction
+
+from xrpl_app.models import PaymentTransaction
+
+logger = logging.getLogger(__name__)
+
+# https://www.postgresql.org/docs/current/sql-createtable.html
+PARTITION_BOUND = re.compile(r"FROM \('?(\d+)'?\) TO \('?(\d+)'?\)")
+
+
+class LedgerPartitions:
+    """
+    Range partitions of the payments table by `ledger_idx`, `size` ledgers
+    wide and aligned to multiples of it. Payments outside of the created
+    ranges are stored in the default partition and moved to their range
+    partition when it is created.
+    """
+
+    def __init__(
+        self,
+        model: type[models.Model] = PaymentTransaction,
+        size: int | None = None,
+        using: str = DEFAULT_DB_ALIAS,
+    ):
+        self.model = model
+        self.size = size or settings.XRPL_LEDGER_PARTITION_SIZE
+        self.using = using
+        self.table = model._meta.db_table
+
+    @property
+    def connection(self):
+        return connections[self.using]
+
+    def get_partitions(self) -> Dict[str, Tuple[int, int] | None]:
+        """
+        Returns:
+            dict: ledger range of every partition by name, None for the
+                default partition
+        """
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) "
+                "FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+                "WHERE i.inhparent = %s::regclass",
+                [self.table],
+            )
+            rows = cursor.fetchall()
+        partitions = {}
+        for name, bound in rows:
+            match = PARTITION_BOUND.search(bound)
+            partitions[name] = (
+                (int(match[1]), int(match[2])) if match else None
+            )
+        return partitions
+
+    def get_bounds(self) -> Tuple[int | None, int | None]:
+        """Lowest and highest stored ledgers."""
+        return tuple(self.model.objects.aggregate(
+            low=models.Min("ledger_idx"), high=models.Max("ledger_idx")
+        ).values())
+
+    def create(self, start: int) -> str:
+        """
+        Create the partition of ledgers from `start` on and move its
+        payments out of the default partition, which is locked meanwhile.
+
+        Returns:
+            str: table name of the partition
+        """
+        quote = self.connection.ops.quote_name
+        name = f"{self.table}_l{start}"
+        default = next((partition for partition, bounds
+                        in self.get_partitions().items() if bounds is None),
+                       None)
+        columns = ", ".join(quote(field.column)
+                            for field in self.model._meta.local_fields)
+        end = start + self.size
+        with transaction.atomic(using=self.using), \
+                self.connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE TABLE {quote(name)} (LIKE {quote(self.table)} "
+                f"INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+            )
+            if default is not None:
+                cursor.execute(
+                    f"LOCK TABLE {quote(default)} IN ACCESS EXCLUSIVE MODE"
+                )
+                cursor.execute(
+                    f"WITH moved AS (DELETE FROM {quote(default)} "
+                    f"WHERE ledger_idx >= %s AND ledger_idx < %s "
+                    f"RETURNING {columns}) "
+                    f"INSERT INTO {quote(name)} ({columns}) "
+                    f"SELECT {columns} FROM moved",
+                    [start, end],
+                )
+                if cursor.rowcount:
+                    logger.info(f"Moved {cursor.rowcount} payments from "
+                                f"{default} to {name}.")
+            cursor.execute(
+                f"ALTER TABLE {quote(self.table)} ATTACH PARTITION "
+                f"{quote(name)} FOR VALUES FROM ({start}) TO ({end})"
+            )
+        return name
+
+    def ensure(self, low: int, high: int) -> List[str]:
+        """
+        Create the missing partitions of the ledgers from `low` to `high`.
+        Ranges overlapping an existing partition, e.g. one created with
+        another size, are skipped.
+
+        Returns:
+            list: names of the created partitions
+        """
+        ranges = [bounds for bounds in self.get_partitions().values()
+                  if bounds is not None]
+        created = []
+        for start in range(low - low % self.size, high + 1, self.size):
+            end = start + self.size
+            if any(start < other_end and other_start < end
+                   for other_start, other_end in ranges):
+                continue
+            created.append(self.create(start))
+            ranges.append((start, end))
+        return created
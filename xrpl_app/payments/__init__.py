@@ -1 +1,8 @@
+from .batch import BatchSync  # noqa: F401
+from .clients import get_client  # noqa: F401
+from .fetcher import AccountTxFetcher  # noqa: F401
+from .jobs import PaymentJobQueue  # noqa: F401
+from .nodes import NodePool, get_node_pool  # noqa: F401
 from .queries import PaymentsQuery  # noqa: F401
+from .stream import AccountStream  # noqa: F401
+from .sync import AccountSync  # noqa: F401
@@ -0,0 +1,226 @@
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from queue import Empty, Queue
+from threading import Event
+from typing import Callable, Dict, List, NamedTuple
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from httpx import NetworkError, TimeoutException
+from xrpl.clients import XRPLRequestFailureException
+from xrpl.clients.sync_client import SyncClient
+
+from xrpl_app.models import AccountSyncState
+
+from .fetcher import AccountTxFetcher, AccountTxPage
+from .queries import AccountsQuery, PaymentsQuery
+from .sync import LEDGER_RANGE_INVALID, SyncResult
+
+logger = logging.getLogger(__name__)
+
+
+class AccountFetch(NamedTuple):
+    """A page of an account history, or its end when `page` is None."""
+
+    account: str
+    page: AccountTxPage | None
+    error: str = ""
+    exception: Exception | None = None
+
+
+class BatchSync:
+    """
+    Incremental sync of many accounts at once.
+
+    Histories are requested concurrently by a bounded pool of threads,
+    which only talk to the XRPL node and pass the pages through a bounded
+    queue, so memory use doesn't depend on the size of the histories.
+    Pages are stored in batches of about `flush_size` transactions or
+    what arrived within `flush_interval` seconds, so the progress of a
+    slow batch is still reported in time. Each batch is stored in one
+    transaction with one `PaymentsQuery.save_data` call, so
+    accounts and assets shared between the histories are resolved and
+    inserted once. An account whose requests failed keeps the pages
+    received before the error and resumes from their marker next time.
+    """
+
+    def __init__(
+        self,
+        client: SyncClient,
+        accounts: List[str],
+        max_pages: int | None = None,
+        concurrency: int | None = None,
+        flush_size: int | None = None,
+        flush_interval: float | None = None,
+        on_flush: Callable[["BatchSync"], None] | None = None,
+    ):
+        self.client = client
+        self.accounts = list(dict.fromkeys(accounts))
+        self.max_pages = max_pages
+        self.concurrency = concurrency or settings.XRPL_BATCH_CONCURRENCY
+        self.flush_size = flush_size or settings.XRPL_BATCH_FLUSH_SIZE
+        self.flush_interval = (flush_interval
+                               or settings.XRPL_BATCH_FLUSH_INTERVAL)
+        self.flushed_at = time.monotonic()
+        self.on_flush = on_flush
+        self.query = PaymentsQuery(f"{len(self.accounts)} accounts")
+        self.results = {}
+        self.done = 0
+        self.stored = 0
+
+    def get_states(self) -> Dict[str, AccountSyncState]:
+        accounts = AccountsQuery()
+        accounts.setup_cache(set(self.accounts))
+        pks = {account: accounts.get_pk(account) for account in self.accounts}
+        AccountSyncState.objects.bulk_create(
+            [AccountSyncState(account_id=pk) for pk in pks.values()],
+            ignore_conflicts=True,
+        )
+        states = AccountSyncState.objects.in_bulk(list(pks.values()))
+        return {account: states[pk] for account, pk in pks.items()}
+
+    def fetch(self, account: str, state: AccountSyncState, pages: Queue,
+              stopped: Event) -> None:
+        """
+        Put the pages of the account into the queue, followed by its end.
+        """
+        fetcher = AccountTxFetcher(
+            self.client,
+            account,
+            ledger_index_min=state.ledger_index_min,
+            marker=state.marker,
+            max_pages=self.max_pages,
+            forward=True,
+        )
+        error, exception = "", None
+        try:
+            if not stopped.is_set():
+                for page in fetcher:
+                    pages.put(AccountFetch(account, page))
+                    if stopped.is_set():
+                        break
+        except XRPLRequestFailureException as exc:
+            if exc.error != LEDGER_RANGE_INVALID:
+                error = str(exc)
+        except (TimeoutException, NetworkError) as exc:
+            logger.warning(f"XRPL request error for {account}: {exc!r}")
+            error = f"XRPL request error: {exc}"
+        except Exception as exc:
+            exception = exc
+        pages.put(AccountFetch(account, None, error, exception))
+
+    def run(self) -> SyncResult:
+        """
+        Returns:
+            SyncResult: counters summed over all accounts, per account
+            results are available as `results`
+        """
+        states = self.get_states()
+        # a page waiting for every thread
+        pages, stopped = Queue(maxsize=self.concurrency), Event()
+        running = len(self.accounts)
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            for account in self.accounts:
+                executor.submit(self.fetch, account, states[account], pages,
+                                stopped)
+            try:
+                pending, size = [], 0
+                while running:
+                    try:
+                        fetched = pages.get(timeout=self.wait_time)
+                    except Empty:
+                        fetched = None
+                    if fetched is not None:
+                        if fetched.exception is not None:
+                            running -= 1
+                            raise fetched.exception
+                        pending.append(fetched)
+                        if fetched.page is None:
+                            running -= 1
+                        else:
+                            size += len(fetched.page.transactions)
+                    if size >= self.flush_size or not self.wait_time:
+                        self.flush(pending, states)
+                        pending, size = [], 0
+                if pending:
+                    self.flush(pending, states)
+            finally:
+                # unblock the threads still putting pages
+                stopped.set()
+                while running:
+                    if pages.get().page is None:
+                        running -= 1
+        return self.result
+
+    @property
+    def wait_time(self) -> float:
+        """Seconds left until the next flush is due."""
+        return max(
+            self.flushed_at + self.flush_interval - time.monotonic(), 0
+        )
+
+    def flush(self, fetched: List[AccountFetch],
+              states: Dict[str, AccountSyncState]) -> None:
+        self.flushed_at = time.monotonic()
+        transactions = [
+            tx for item in fetched if item.page is not None
+            for tx in item.page.transactions
+        ]
+        updated, now = {}, timezone.now()
+        with transaction.atomic():
+            objects = (self.query.save_data(transactions) if transactions
+                       else [])
+            for item in fetched:
+                if item.page is not None:
+                    state = states[item.account]
+                    state.marker = item.page.marker
+                    if item.page.marker is None:
+                        state.ledger_idx = item.page.ledger_index_max
+                    state.updated = now
+                    updated[item.account] = state
+            AccountSyncState.objects.bulk_update(
+                list(updated.values()), ["marker", "ledger_idx", "updated"]
+            )
+        stored = {obj.hash for obj in objects}
+        self.stored += len(stored)
+        for item in fetched:
+            result = self.results.setdefault(item.account, {
+                "pages": 0,
+                "transactions": 0,
+                "stored": 0,
+                "marker": None,
+                "ledger_idx": states[item.account].ledger_idx,
+                "error": "",
+            })
+            if item.page is None:
+                result["error"] = item.error
+                self.done += 1
+                continue
+            result["pages"] += 1
+            result["transactions"] += len(item.page.transactions)
+            # payments between two of the accounts count for both
+            result["stored"] += sum(
+                1 for tx in item.page.transactions
+                if tx.get("tx", {}).get("hash") in stored
+            )
+            result["marker"] = item.page.marker
+            result["ledger_idx"] = states[item.account].ledger_idx
+        logger.info(f"Stored {len(stored)} payments of {len(updated)} "
+                    f"accounts, {self.done}/{len(self.accounts)} "
+                    f"accounts done.")
+        if self.on_flush is not None:
+            self.on_flush(self)
+
+    @property
+    def result(self) -> SyncResult:
+        results = self.results.values()
+        return SyncResult(
+            account="",
+            pages=sum(item["pages"] for item in results),
+            transactions=sum(item["transactions"] for item in results),
+            stored=self.stored,
+            marker=None,
+            ledger_idx=None,
+        )
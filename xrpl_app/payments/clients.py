@@ -0,0 +1,126 @@
+import asyncio
+import atexit
+import os
+from json import JSONDecodeError
+from threading import Lock
+from typing import Dict
+
+import httpx
+from django.conf import settings
+from xrpl.asyncio.clients.utils import json_to_response, request_to_json_rpc
+from xrpl.clients import XRPLRequestFailureException
+from xrpl.clients.sync_client import SyncClient
+from xrpl.models.requests.request import Request
+from xrpl.models.response import Response
+
+try:
+    import h2  # noqa: F401
+except ImportError:
+    HTTP2_AVAILABLE = False
+else:
+    HTTP2_AVAILABLE = True
+
+
+def create_http_client() -> httpx.Client:
+    return httpx.Client(
+        http2=settings.XRPL_HTTP2 and HTTP2_AVAILABLE,
+        timeout=httpx.Timeout(settings.XRPL_HTTP_TIMEOUT,
+                              connect=settings.XRPL_HTTP_CONNECT_TIMEOUT),
+        limits=httpx.Limits(
+            max_connections=settings.XRPL_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.XRPL_HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=settings.XRPL_HTTP_KEEPALIVE_EXPIRY,
+        ),
+    )
+
+
+class PooledJsonRpcClient(SyncClient):
+    """
+    JSON-RPC client which sends requests through a shared `httpx.Client`,
+    reusing its keep-alive connections instead of opening a new one for
+    every request like `JsonRpcClient` does. Without a shared client
+    every request opens a short-lived one.
+    """
+
+    def __init__(self, url: str, http_client: httpx.Client | None = None):
+        super().__init__(url)
+        self.http_client = http_client
+
+    def request(self, request: Request,
+                timeout: float | None = None) -> Response:
+        """
+        Args:
+            request: XRPL request
+            timeout: seconds to wait for the response instead of the
+                timeout of the pool
+        """
+        kwargs = {} if timeout is None else {"timeout": timeout}
+        if self.http_client is None:
+            with create_http_client() as http_client:
+                response = http_client.post(
+                    self.url, json=request_to_json_rpc(request), **kwargs
+                )
+        else:
+            response = self.http_client.post(
+                self.url, json=request_to_json_rpc(request), **kwargs
+            )
+        try:
+            return json_to_response(response.json())
+        except JSONDecodeError:
+            raise XRPLRequestFailureException(
+                {
+                    "error": response.status_code,
+                    "error_message": response.text,
+                }
+            )
+
+    async def request_impl(self, request: Request) -> Response:
+        return await asyncio.to_thread(self.request, request)
+
+
+class ClientRegistry:
+    """
+    HTTP connection pools of the process by XRPL node URL, only for the
+    nodes configured in `XRPL_NODES`: other URLs come from requests, a
+    pool of each one would be kept for the life of the process.
+    Pools are safe to share between threads. A forked child, e.g. a
+    gunicorn worker, starts with an empty registry, since connections
+    inherited from the parent are still used by the parent.
+    """
+
+    def __init__(self):
+        self.http_clients: Dict[str, httpx.Client] = {}
+        self.lock = Lock()
+
+    def get(self, url: str) -> PooledJsonRpcClient:
+        if url not in settings.XRPL_NODES:
+            return PooledJsonRpcClient(url)
+        with self.lock:
+            http_client = self.http_clients.get(url)
+            if http_client is None:
+                http_client = create_http_client()
+                self.http_clients[url] = http_client
+        return PooledJsonRpcClient(url, http_client)
+
+    def close(self) -> None:
+        with self.lock:
+            for http_client in self.http_clients.values():
+                http_client.close()
+            self.http_clients.clear()
+
+    def after_fork(self) -> None:
+        self.http_clients = {}
+        self.lock = Lock()
+
+
+registry = ClientRegistry()
+os.register_at_fork(after_in_child=registry.after_fork)
+atexit.register(registry.close)
+
+
+def get_client(url: str) -> PooledJsonRpcClient:
+    """
+    XRPL client of the node which shares the pool of the process, if the
+    node is configured.
+    """
+    return registry.get(url)
@@ -1,77 +1,80 @@
-from pydantic import BaseModel
-
-
-class TransactionMeta(BaseModel):
-    TransactionResult: str
-
-
-class Amount(BaseModel):
+from typing import Any, Dict, NamedTuple
+
+# https://xrpl.org/tes-success.html
+TRANSACTION_SUCCESS = "tesSUCCESS"
+PAYMENT_TYPE = "Payment"
+
+
+def is_successful_payment(elem: Dict[str, Any]) -> bool:
+    """
+    Cheap check of a raw account_tx entry, so records are built only for
+    validated and successful payments.
+    """
+    if elem.get("validated") is not True:
+        return False
+    tx, meta = elem.get("tx"), elem.get("meta")
+    return (
+        isinstance(tx, dict)
+        and isinstance(meta, dict)
+        and tx.get("TransactionType") == PAYMENT_TYPE
+        and meta.get("TransactionResult") == TRANSACTION_SUCCESS
+    )
+
+
+class Amount(NamedTuple):
     issuer: str
     currency: str
     value: str
 
 
-class TransactionData(BaseModel):
-    Account: str
-    Amount: str | Amount
-    Destination: str
-    DestinationTag: int | None
-    Fee: str
-    TransactionType: str
+class Payment(NamedTuple):
     hash: str
     ledger_index: int
-
-
-class XRPTransaction(BaseModel):
-    meta: TransactionMeta
-    tx: TransactionData
-    validated: bool
-    _transaction_success: str = "tesSUCCESS"
-    _payment_type: str = "Payment"
-
-    @property
-    def is_successful(self) -> bool:
-        return self.meta.TransactionResult == self._transaction_success
-
-    @property
-    def is_validated(self) -> bool:
-        return self.validated
-
-    @property
-    def is_it_payment(self) -> bool:
-        return self.tx.TransactionType == self._payment_type
-
-    @property
-    def hash(self) -> str:
-        return self.tx.hash
-
-    @property
-    def source(self) -> str:
-        return self.tx.Account
-
-    @property
-    def destination(self) -> str:
-        return self.tx.Destination
-
-    @property
-    def destination_tag(self) -> int | None:
-        return self.tx.DestinationTag
-
-    @property
-    def fee(self) -> str:
-        return self.tx.Fee
-
-    @property
-    def amount(self) -> str | Amount:
-        return self.tx.Amount
-
-    @property
-    def ledger_index(self) -> int:
-        return self.tx.ledger_index
+    source: str
+    destination: str
+    destination_tag: int | None
+    fee: str
+    amount: str | Amount
+
+    @classmethod
+    def from_transaction(cls, elem: Dict[str, Any]) -> "Payment":
+        """
+        Args:
+            elem (dict): raw account_tx entry of a payment
+
+        Returns:
+            Payment: payment record
+
+        Raises:
+            ValueError: if the entry misses fields or has invalid values
+        """
+        try:
+            tx = elem["tx"]
+            amount = tx["Amount"]
+            if isinstance(amount, dict):
+                amount = Amount(
+                    issuer=str(amount["issuer"]),
+                    currency=str(amount["currency"]),
+                    value=str(amount["value"]),
+                )
+            elif not isinstance(amount, str):
+                raise TypeError(f"unexpected Amount {amount!r}")
+            destination_tag = tx.get("DestinationTag")
+            return cls(
+                hash=str(tx["hash"]),
+                ledger_index=int(tx["ledger_index"]),
+                source=str(tx["Account"]),
+                destination=str(tx["Destination"]),
+                destination_tag=(None if destination_tag is None
+                                 else int(destination_tag)),
+                fee=str(tx["Fee"]),
+                amount=amount,
+            )
+        except (KeyError, TypeError, ValueError) as exc:
+            raise ValueError(f"Invalid payment transaction: {exc!r}") from exc
 
     @property
     def amount_value(self) -> str:
-        if isinstance(self.tx.Amount, Amount):
-            return self.tx.Amount.value
-        else:
-            return self.tx.Amount
+        if isinstance(self.amount, Amount):
+            return self.amount.value
+        return self.amount
@@ -0,0 +1,244 @@
+import codecs
+import gzip
+import io
+import json
+import logging
+import mmap
+import os
+import re
+import time
+from contextlib import contextmanager
+from itertools import islice
+from typing import IO, Any, Callable, Dict, Iterator, NamedTuple
+
+from django.conf import settings
+from django.db import transaction
+
+from .queries import PaymentsQuery
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+COMPRESSIONS = (".gz", ".zst", ".zstd")
+LINE_FORMATS = (".jsonl", ".ndjson")
+# the array of entries in an account_tx response or result object
+TRANSACTIONS_KEY = re.compile(r'"transactions"\s*:\s*\[')
+# the end of a document cut within a literal, number or escape, e.g. `tr`
+PARTIAL_TOKEN = re.compile(r'[^\s,:\[\]{}"]{0,32}')
+
+
+@contextmanager
+def open_dump(path: str) -> Iterator[IO[bytes]]:
+    """
+    Binary stream of a dump file, decompressed by its suffix. Plain files
+    are memory-mapped, so reading them doesn't copy through a file buffer.
+
+    Raises:
+        ValueError: if the file is zstd-compressed and zstandard isn't
+            installed
+    """
+    if path.endswith(".gz"):
+        with gzip.open(path, "rb") as stream:
+            yield stream
+    elif path.endswith((".zst", ".zstd")):
+        if zstandard is None:
+            raise ValueError(f"Install zstandard to read {path}")
+        with open(path, "rb") as file:
+            reader = zstandard.ZstdDecompressor().stream_reader(file)
+            with io.BufferedReader(reader) as stream:
+                yield stream
+    elif os.path.getsize(path) == 0:
+        # empty files can't be mapped
+        yield io.BytesIO()
+    else:
+        with open(path, "rb") as file:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                yield mm
+
+
+def iter_entries(obj: Any) -> Iterator[Dict[str, Any]]:
+    """account_tx entries of an entry, a result or a whole response."""
+    if not isinstance(obj, dict):
+        return
+    if "tx" in obj:
+        yield obj
+    elif isinstance(obj.get("transactions"), list):
+        yield from obj["transactions"]
+    elif isinstance(obj.get("result"), dict):
+        yield from iter_entries(obj["result"])
+
+
+def is_truncated(error: json.JSONDecodeError) -> bool:
+    """Whether decoding failed only because the text ends mid-item."""
+    if error.msg.startswith("Unterminated string"):
+        return True
+    return PARTIAL_TOKEN.fullmatch(error.doc, error.pos) is not None
+
+
+def iter_json_array(stream: IO[bytes], chunk_size: int = 1 << 20,
+                    max_item_size: int = 64 << 20) -> Iterator[Any]:
+    """
+    Decode the items of a JSON array one by one, holding only a chunk of
+    the file in memory. The array is either the whole document or the
+    first `transactions` array of an account_tx response.
+
+    Raises:
+        ValueError: if the document is not valid JSON or an item is
+            longer than `max_item_size` characters
+    """
+    decoder = json.JSONDecoder()
+    text = codecs.getincrementaldecoder("utf-8")()
+    buffer, pos, eof = "", 0, False
+
+    def fill() -> None:
+        nonlocal buffer, pos, eof
+        if len(buffer) - pos > max_item_size:
+            raise ValueError(f"JSON item over {max_item_size} characters")
+        chunk = stream.read(chunk_size)
+        eof = not chunk
+        buffer = buffer[pos:] + text.decode(chunk, final=eof)
+        pos = 0
+
+    while not buffer.strip() and not eof:
+        fill()
+    start = buffer.lstrip()[:1]
+    if start == "[":
+        pos = buffer.index("[") + 1
+    elif start == "{":
+        match = TRANSACTIONS_KEY.search(buffer)
+        while match is None and not eof:
+            fill()
+            match = TRANSACTIONS_KEY.search(buffer)
+        if match is None:
+            return
+        pos = match.end()
+    elif start:
+        raise ValueError("Expected a JSON array or object")
+    else:
+        return
+    while True:
+        while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+            pos += 1
+        if pos == len(buffer):
+            if eof:
+                raise ValueError("Unterminated JSON array")
+            fill()
+            continue
+        if buffer[pos] == "]":
+            return
+        try:
+            item, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError as exc:
+            if eof or not is_truncated(exc):
+                raise
+            fill()
+            continue
+        if end == len(buffer) and not eof:
+            # a number may go on in the next chunk
+            fill()
+            continue
+        pos = end
+        yield item
+
+
+class ImportResult(NamedTuple):
+    path: str
+    entries: int
+    stored: int
+    invalid: int
+    seconds: float
+
+
+class DumpImport:
+    """
+    Load a dump of `account_tx` entries without the XRPL node.
+
+    JSONL files (`.jsonl`, `.ndjson`) hold an entry, a result or a whole
+    response per line, JSON files an array of entries or one response.
+    Both may be gzip or zstd compressed. The file is read incrementally
+    and stored in batches of `batch_size` entries, each batch with one
+    `PaymentsQuery.save_data` call in its own transaction. Payments which
+    are already stored are skipped, so an interrupted import can be
+    started again.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        batch_size: int | None = None,
+        on_batch: Callable[["DumpImport"], None] | None = None,
+    ):
+        self.path = path
+        self.batch_size = batch_size or settings.XRPL_IMPORT_BATCH_SIZE
+        self.on_batch = on_batch
+        self.query = PaymentsQuery(os.path.basename(path))
+        self.entries = 0
+        self.stored = 0
+        self.invalid = 0
+        self.started = time.monotonic()
+
+    @property
+    def is_lines(self) -> bool:
+        name = self.path
+        for suffix in COMPRESSIONS:
+            name = name.removesuffix(suffix)
+        return name.endswith(LINE_FORMATS)
+
+    def read(self, stream: IO[bytes]) -> Iterator[Dict[str, Any]]:
+        if not self.is_lines:
+            for item in iter_json_array(stream):
+                yield from iter_entries(item)
+            return
+        for lineno, line in enumerate(iter(stream.readline, b""), 1):
+            if not line.strip():
+                continue
+            try:
+                obj = json.loads(line)
+            except ValueError as exc:
+                self.invalid += 1
+                logger.warning(f"{self.path}:{lineno}: {exc}")
+                continue
+            yield from iter_entries(obj)
+
+    def run(self) -> ImportResult:
+        """
+        Raises:
+            ValueError: if a JSON file is malformed or an entry is not a
+                valid payment
+        """
+        with open_dump(self.path) as stream:
+            entries = self.read(stream)
+            while batch := list(islice(entries, self.batch_size)):
+                with transaction.atomic():
+                    objects = self.query.save_data(batch)
+                self.entries += len(batch)
+                self.stored += len(objects)
+                if self.on_batch is not None:
+                    self.on_batch(self)
+        return self.result
+
+    @property
+    def result(self) -> ImportResult:
+        return ImportResult(
+            path=self.path,
+            entries=self.entries,
+            stored=self.stored,
+            invalid=self.invalid,
+            seconds=time.monotonic() - self.started,
+        )
+
+
+def import_dump(path: str, batch_size: int | None = None) -> ImportResult:
+    """Entry point of worker processes, which import whole files."""
+    dump = DumpImport(
+        path,
+        batch_size,
+        on_batch=lambda dump: logger.info(
+            f"{dump.path}: {dump.entries} entries, {dump.stored} stored"
+        ),
+    )
+    return dump.run()
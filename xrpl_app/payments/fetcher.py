@@ -0,0 +1,92 @@
+import logging
+from typing import Any, Dict, Iterator, List, NamedTuple
+
+from django.conf import settings
+from xrpl.clients import XRPLRequestFailureException
+from xrpl.clients.sync_client import SyncClient
+from xrpl.models.requests import AccountTx
+
+logger = logging.getLogger(__name__)
+
+
+class AccountTxPage(NamedTuple):
+    transactions: List[Dict[str, Any]]
+    marker: Any
+    ledger_index_min: int
+    ledger_index_max: int
+
+
+class AccountTxFetcher:
+    """
+    Page through the `account_tx` history of an account following markers.
+    https://xrpl.org/account_tx.html#pagination
+
+    Pages are yielded as soon as they arrive, so the caller can store them
+    one by one instead of collecting the whole history in memory.
+    """
+
+    def __init__(
+        self,
+        client: SyncClient,
+        account: str,
+        ledger_index_min: int | None = None,
+        ledger_index_max: int | None = None,
+        marker: Any = None,
+        max_pages: int | None = None,
+        limit: int | None = None,
+        forward: bool = False,
+    ):
+        self.client = client
+        self.account = account
+        self.ledger_index_min = ledger_index_min
+        self.ledger_index_max = ledger_index_max
+        self.marker = marker
+        self.max_pages = max_pages or settings.XRPL_ACCOUNT_TX_MAX_PAGES
+        self.limit = limit or settings.XRPL_ACCOUNT_TX_PAGE_LIMIT
+        self.forward = forward
+        self.pages = 0
+
+    @property
+    def is_exhausted(self) -> bool:
+        """True when the last received page had no marker."""
+        return self.pages > 0 and self.marker is None
+
+    def build_request(self) -> AccountTx:
+        return AccountTx(
+            account=self.account,
+            ledger_index_min=self.ledger_index_min,
+            ledger_index_max=self.ledger_index_max,
+            limit=self.limit,
+            marker=self.marker,
+            forward=self.forward,
+        )
+
+    def __iter__(self) -> Iterator[AccountTxPage]:
+        """
+        Request pages until the server stops returning a marker or the page
+        budget is spent.
+        Yields:
+            AccountTxPage: raw transactions of a page and its marker
+        Raises:
+            XRPLRequestFailureException: if the server rejected a request
+            httpx.TimeoutException, httpx.NetworkError: on connection issues
+        """
+        while self.max_pages is None or self.pages < self.max_pages:
+            response = self.client.request(self.build_request())
+            if not response.is_successful():
+                raise XRPLRequestFailureException(response.result)
+            result = response.result
+            self.marker = result.get("marker")
+            self.pages += 1
+            logger.debug(
+                f"Got page {self.pages} of {self.account} history, "
+                f"{len(result['transactions'])} transactions."
+            )
+            yield AccountTxPage(
+                transactions=result["transactions"],
+                marker=self.marker,
+                ledger_index_min=result.get("ledger_index_min"),
+                ledger_index_max=result.get("ledger_index_max"),
+            )
+            if self.marker is None:
+                break
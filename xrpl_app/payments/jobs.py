@@ -0,0 +1,131 @@
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from httpx import NetworkError, TimeoutException
+from xrpl.clients import XRPLRequestFailureException
+
+from xrpl_app.models import PaymentJob
+
+from .batch import BatchSync
+from .clients import get_client
+from .nodes import get_node_pool
+from .sync import AccountSync
+
+logger = logging.getLogger(__name__)
+
+
+class PaymentJobQueue:
+    """
+    Database backed queue of account sync jobs. Jobs are claimed with
+    `SELECT ... FOR UPDATE SKIP LOCKED`, so any number of workers can poll
+    the same table.
+    """
+
+    model = PaymentJob
+
+    def enqueue(self, **params) -> PaymentJob:
+        """
+        Reuse a pending job with the same parameters or create a new one.
+        """
+        job = (
+            self.model.objects.filter(status=self.model.Status.PENDING,
+                                      **params)
+            .order_by("created")
+            .first()
+        )
+        if job is None:
+            job = self.model.objects.create(**params)
+        return job
+
+    def claim(self) -> PaymentJob | None:
+        with transaction.atomic():
+            job = (
+                self.model.objects.select_for_update(skip_locked=True)
+                .filter(status=self.model.Status.PENDING)
+                .order_by("created")
+                .first()
+            )
+            if job is None:
+                return None
+            job.status = self.model.Status.RUNNING
+            job.started = timezone.now()
+            job.save(update_fields=("status", "started", "updated"))
+        return job
+
+    def requeue_stale(self) -> int:
+        """
+        Put back jobs of workers that stopped reporting progress.
+        Returns:
+            int: number of requeued jobs
+        """
+        deadline = timezone.now() - timedelta(
+            seconds=settings.XRPL_JOB_STALE_TIMEOUT
+        )
+        return self.model.objects.filter(
+            status=self.model.Status.RUNNING, updated__lt=deadline
+        ).update(status=self.model.Status.PENDING, updated=timezone.now())
+
+    def get_sync(self, job: PaymentJob) -> AccountSync | BatchSync:
+        # a node requested by the caller or the failover pool
+        client = get_client(job.url) if job.url else get_node_pool()
+        if job.accounts:
+            return BatchSync(
+                client,
+                job.accounts,
+                max_pages=job.max_pages,
+                on_flush=lambda obj: self.save_progress(job, obj),
+            )
+        return AccountSync(
+            client,
+            job.account,
+            ledger_index_min=job.ledger_index_min,
+            ledger_index_max=job.ledger_index_max,
+            max_pages=job.max_pages,
+            on_page=lambda obj: self.save_progress(job, obj),
+        )
+
+    def run(self, job: PaymentJob) -> PaymentJob:
+        sync = None
+        try:
+            # connecting and reading the sync states may fail as well
+            sync = self.get_sync(job)
+            sync.run()
+        except (TimeoutException, NetworkError) as exc:
+            logger.exception("XRPL request error")
+            return self.finish(job, sync, f"XRPL request error: {exc}")
+        except XRPLRequestFailureException as exc:
+            return self.finish(job, sync, str(exc))
+        except Exception as exc:
+            logger.exception(f"Payment job {job.pk} failed")
+            return self.finish(job, sync, repr(exc))
+        return self.finish(job, sync)
+
+    @staticmethod
+    def set_progress(job: PaymentJob, sync: AccountSync | BatchSync) -> None:
+        result = sync.result
+        job.pages = result.pages
+        job.transactions = result.transactions
+        job.stored = result.stored
+        job.marker = result.marker
+        job.ledger_idx = result.ledger_idx
+        job.results = getattr(sync, "results", None)
+
+    def save_progress(self, job: PaymentJob,
+                      sync: AccountSync | BatchSync) -> None:
+        self.set_progress(job, sync)
+        job.save(update_fields=("pages", "transactions", "stored", "marker",
+                                "ledger_idx", "results", "updated"))
+
+    def finish(self, job: PaymentJob, sync: AccountSync | BatchSync | None,
+               error: str = "") -> PaymentJob:
+        if sync is not None:
+            self.set_progress(job, sync)
+        job.status = (self.model.Status.FAILED if error
+                      else self.model.Status.DONE)
+        job.error = error
+        job.finished = timezone.now()
+        job.save()
+        return job
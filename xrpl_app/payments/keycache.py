@@ -0,0 +1,69 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Dict, Hashable, Iterable
+
+from django.db import transaction
+
+
+class KeyCache:
+    """
+    Bounded LRU mapping of natural keys (account hashes, issuer and
+    currency pairs) to primary keys of rows known to exist.
+    One instance is shared by all syncs of a worker process. Rows created
+    inside a transaction are published with `put_on_commit`, so a rolled
+    back sync never leaves keys of rows which don't exist.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get_many(self, keys: Iterable[Hashable]) -> Dict[Hashable, Any]:
+        """
+        Args:
+            keys: natural keys to look up
+
+        Returns:
+            dict: primary keys of the known keys, missing ones are omitted
+        """
+        found = {}
+        with self._lock:
+            for key in keys:
+                try:
+                    found[key] = self._data[key]
+                except KeyError:
+                    self.misses += 1
+                    continue
+                self._data.move_to_end(key)
+                self.hits += 1
+        return found
+
+    def put_many(self, items: Dict[Hashable, Any]) -> None:
+        with self._lock:
+            self._data.update(items)
+            for key in items:
+                self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def discard_many(self, keys: Iterable[Hashable]) -> None:
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def put_on_commit(self, items: Dict[Hashable, Any]) -> None:
+        """Publish the items once the current transaction commits."""
+        if items:
+            items = dict(items)
+            transaction.on_commit(lambda: self.put_many(items))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = 0
@@ -0,0 +1,209 @@
+from typing import Iterable, Iterator, List, Sequence
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DEFAULT_DB_ALIAS, connections, models, transaction
+from django.db.models.constants import OnConflict
+
+
+def sort_by_fields(objs: List[models.Model],
+                   fields: Sequence[models.Field]) -> List[models.Model]:
+    """
+    Concurrent inserts of overlapping keys wait on each other, inserting
+    in the same order keeps them from deadlocking.
+    """
+    return sorted(
+        objs,
+        key=lambda obj: tuple(getattr(obj, field.attname)
+                              for field in fields),
+    )
+
+
+def get_inserted(objs: List[models.Model],
+                 conflict_fields: Sequence[models.Field],
+                 inserted: dict, using: str) -> List[models.Model]:
+    """
+    Instances of the inserted rows, with primary keys set.
+    Args:
+        inserted: primary keys by the conflict fields values of the rows
+            returned by the insert
+    """
+    result = []
+    for obj in objs:
+        key = tuple(getattr(obj, field.attname) for field in conflict_fields)
+        if key in inserted:
+            obj.pk = inserted.pop(key)
+            obj._state.adding = False
+            obj._state.db = using
+            result.append(obj)
+    return result
+
+
+class BulkCreateLoader:
+    """
+    Insert rows with a parameterized
+    `INSERT ... ON CONFLICT DO NOTHING RETURNING` per batch, the insert
+    of `bulk_create(ignore_conflicts=True)` which doesn't tell the
+    skipped rows apart.
+    """
+
+    def __init__(
+        self,
+        model: type[models.Model],
+        conflict_fields: Sequence[str],
+    ):
+        self.model = model
+        self.conflict_fields = [model._meta.get_field(name)
+                                for name in conflict_fields]
+
+    def load(self, objs: List[models.Model]) -> List[models.Model]:
+        """
+        Args:
+            objs: unsaved model instances
+
+        Returns:
+            list: instances which were inserted, with primary keys set
+        """
+        if not objs:
+            return []
+        opts = self.model._meta
+        fields = [field for field in opts.concrete_fields
+                  if field is not opts.auto_field]
+        rows = self.model.objects._insert(
+            sort_by_fields(objs, self.conflict_fields),
+            fields,
+            returning_fields=[*self.conflict_fields, opts.pk],
+            on_conflict=OnConflict.IGNORE,
+        )
+        # a single row skipped on conflict comes back as None
+        inserted = {tuple(row[:-1]): row[-1] for row in rows
+                    if row is not None}
+        return get_inserted(objs, self.conflict_fields, inserted,
+                            DEFAULT_DB_ALIAS)
+
+
+class CopyStream:
+    """File-like object which encodes rows for COPY in text format lazily."""
+
+    def __init__(self, rows: Iterable[Sequence]):
+        self.lines = map(self.encode_row, rows)
+        self.buffer = ""
+
+    @staticmethod
+    def encode_value(value) -> str:
+        if value is None:
+            return "\\N"
+        return (
+            str(value)
+            .replace("\\", "\\\\")
+            .replace("\t", "\\t")
+            .replace("\n", "\\n")
+            .replace("\r", "\\r")
+        )
+
+    def encode_row(self, row: Sequence) -> str:
+        return "\t".join(map(self.encode_value, row)) + "\n"
+
+    def read(self, size: int = -1) -> str:
+        while size < 0 or len(self.buffer) < size:
+            line = next(self.lines, None)
+            if line is None:
+                break
+            self.buffer += line
+        if size < 0:
+            size = len(self.buffer)
+        chunk, self.buffer = self.buffer[:size], self.buffer[size:]
+        return chunk
+
+
+class CopyLoader:
+    """
+    Stream rows with `COPY ... FROM STDIN` into a temporary staging table
+    and merge them into the model table with
+    `INSERT ... ON CONFLICT DO NOTHING`, rows which already exist are
+    skipped. No statement is built per row, which makes large batches
+    several times faster than `bulk_create`.
+    """
+
+    def __init__(
+        self,
+        model: type[models.Model],
+        conflict_fields: Sequence[str],
+        using: str = DEFAULT_DB_ALIAS,
+    ):
+        self.model = model
+        self.using = using
+        opts = model._meta
+        self.fields = [
+            field for field in opts.concrete_fields
+            if field is not opts.auto_field
+        ]
+        self.conflict_fields = [opts.get_field(name)
+                                for name in conflict_fields]
+
+    def get_rows(self, objs: List[models.Model]) -> Iterator[tuple]:
+        connection = connections[self.using]
+        for obj in objs:
+            yield tuple(
+                field.get_db_prep_save(getattr(obj, field.attname),
+                                       connection)
+                for field in self.fields
+            )
+
+    def load(self, objs: List[models.Model]) -> List[models.Model]:
+        """
+        Args:
+            objs: unsaved model instances
+
+        Returns:
+            list: instances which were inserted, with primary keys set
+        """
+        if not objs:
+            return []
+        connection = connections[self.using]
+        quote = connection.ops.quote_name
+        table = quote(self.model._meta.db_table)
+        staging = quote(f"{self.model._meta.db_table}_staging")
+        columns = ", ".join(quote(field.column) for field in self.fields)
+        conflict = ", ".join(quote(field.column)
+                             for field in self.conflict_fields)
+        pk = quote(self.model._meta.pk.column)
+        # the staging table is dropped with the transaction
+        with transaction.atomic(using=self.using), connection.cursor() as c:
+            c.execute(
+                f"CREATE TEMPORARY TABLE IF NOT EXISTS {staging} "
+                f"ON COMMIT DROP AS SELECT {columns} FROM {table} "
+                f"WITH NO DATA"
+            )
+            c.execute(f"TRUNCATE {staging}")
+            c.copy_expert(f"COPY {staging} ({columns}) FROM STDIN",
+                          CopyStream(self.get_rows(objs)))
+            c.execute(
+                f"INSERT INTO {table} ({columns}) "
+                f"SELECT {columns} FROM {staging} ORDER BY {conflict} "
+                f"ON CONFLICT ({conflict}) DO NOTHING "
+                f"RETURNING {conflict}, {pk}"
+            )
+            inserted = {tuple(row[:-1]): row[-1] for row in c.fetchall()}
+        return get_inserted(objs, self.conflict_fields, inserted, self.using)
+
+
+LOADERS = {
+    "orm": BulkCreateLoader,
+    "copy": CopyLoader,
+}
+
+
+def get_loader(model: type[models.Model], conflict_fields: Sequence[str]):
+    """
+    Loader selected by the `XRPL_PAYMENTS_LOADER` setting. Both skip rows
+    which conflict on `conflict_fields`, so concurrent syncs of the same
+    accounts don't fail on unique constraints.
+    """
+    try:
+        loader_class = LOADERS[settings.XRPL_PAYMENTS_LOADER]
+    except KeyError:
+        raise ImproperlyConfigured(
+            f"XRPL_PAYMENTS_LOADER must be one of {', '.join(LOADERS)}"
+        )
+    return loader_class(model, conflict_fields)
@@ -0,0 +1,239 @@
+import asyncio
+import logging
+from collections import deque
+from threading import Lock
+from time import monotonic
+from typing import Dict, List
+
+from django.conf import settings
+from httpx import NetworkError, TimeoutException
+from xrpl.clients import XRPLRequestFailureException
+from xrpl.clients.sync_client import SyncClient
+from xrpl.models.requests.request import Request
+from xrpl.models.response import Response
+
+from .clients import get_client
+
+logger = logging.getLogger(__name__)
+
+# https://xrpl.org/error-formatting.html#universal-errors
+# errors of an overloaded or out of sync server, another one may answer
+NODE_ERRORS = frozenset(
+    {
+        "amendmentBlocked",
+        "failedToForward",
+        "noClosed",
+        "noCurrent",
+        "noNetwork",
+        "notReady",
+        "slowDown",
+        "tooBusy",
+    }
+)
+
+
+class NodeHealth:
+    """
+    Rolling latencies and outcomes of the last requests to a node, and
+    its circuit breaker. The circuit opens after `failure_threshold`
+    consecutive failures, the node then gets no requests for
+    `reset_timeout` seconds. After that a single probe request is let
+    through, which closes the circuit on success or opens it again.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half-open"
+
+    def __init__(self, url: str, window: int, failure_threshold: int,
+                 reset_timeout: float):
+        self.url = url
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.latencies = deque(maxlen=window)
+        self.outcomes = deque(maxlen=window)
+        self.failures = 0
+        self.state = self.CLOSED
+        self.opened_at = 0.0
+        self.lock = Lock()
+
+    def percentile(self, q: float) -> float:
+        """Latency in seconds, 0 until the node answered a request."""
+        with self.lock:
+            latencies = sorted(self.latencies)
+        if not latencies:
+            return 0.0
+        return latencies[min(len(latencies) - 1, int(q * len(latencies)))]
+
+    @property
+    def error_rate(self) -> float:
+        with self.lock:
+            if not self.outcomes:
+                return 0.0
+            return self.outcomes.count(False) / len(self.outcomes)
+
+    @property
+    def score(self) -> float:
+        """Median latency weighted by the error rate, lower is better."""
+        return self.percentile(0.5) / (1 - min(self.error_rate, 0.9))
+
+    @property
+    def probe_due(self) -> bool:
+        """Whether the circuit isn't closed and may be probed now."""
+        with self.lock:
+            elapsed = monotonic() - self.opened_at
+            # a probe which never reported back doesn't block the node
+            return self.state != self.CLOSED and elapsed >= self.reset_timeout
+
+    @property
+    def available(self) -> bool:
+        """Whether a request could be sent now, without claiming a probe."""
+        return self.state == self.CLOSED or self.probe_due
+
+    def acquire(self) -> bool:
+        """
+        Whether a request may be sent to the node now, claims the probe
+        of an open circuit. Call it only right before sending.
+        """
+        with self.lock:
+            if self.state == self.CLOSED:
+                return True
+            if monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self.opened_at = monotonic()
+                return True
+            return False
+
+    def record_success(self, latency: float) -> None:
+        with self.lock:
+            self.latencies.append(latency)
+            self.outcomes.append(True)
+            self.failures = 0
+            self.state = self.CLOSED
+
+    def record_failure(self, latency: float) -> None:
+        with self.lock:
+            self.latencies.append(latency)
+            self.outcomes.append(False)
+            self.failures += 1
+            if (self.state == self.HALF_OPEN
+                    or self.failures >= self.failure_threshold):
+                if self.state != self.OPEN:
+                    logger.warning(f"XRPL node {self.url} is unavailable.")
+                self.state = self.OPEN
+                self.opened_at = monotonic()
+
+    def snapshot(self) -> dict:
+        return {
+            "state": self.state,
+            "p50": self.percentile(0.5),
+            "p90": self.percentile(0.9),
+            "p99": self.percentile(0.99),
+            "error_rate": self.error_rate,
+        }
+
+
+class HealthRegistry:
+    """Health of XRPL nodes by URL, shared by all syncs of the process."""
+
+    def __init__(self):
+        self.nodes: Dict[str, NodeHealth] = {}
+        self.lock = Lock()
+
+    def get(self, url: str) -> NodeHealth:
+        with self.lock:
+            node = self.nodes.get(url)
+            if node is None:
+                node = NodeHealth(
+                    url,
+                    window=settings.XRPL_NODE_WINDOW,
+                    failure_threshold=settings.XRPL_NODE_FAILURE_THRESHOLD,
+                    reset_timeout=settings.XRPL_NODE_RESET_TIMEOUT,
+                )
+                self.nodes[url] = node
+        return node
+
+    def snapshot(self) -> Dict[str, dict]:
+        with self.lock:
+            nodes = list(self.nodes.values())
+        return {node.url: node.snapshot() for node in nodes}
+
+
+health = HealthRegistry()
+
+
+class NodePool(SyncClient):
+    """
+    XRPL client which sends each request to the fastest available node
+    of the pool and fails over to the next ones on connection errors and
+    errors of overloaded servers, as long as the deadline allows.
+    If all circuits are open, the node which failed first is tried anyway.
+    """
+
+    def __init__(self, urls: List[str], deadline: float | None = None):
+        super().__init__(urls[0])
+        self.urls = list(dict.fromkeys(urls))
+        self.deadline = deadline or settings.XRPL_REQUEST_DEADLINE
+
+    def rank(self) -> List[NodeHealth]:
+        """
+        Available nodes, due probes first: their stale error rates would
+        keep them behind the healthy nodes, which would never let their
+        circuits close again.
+        """
+        nodes = [health.get(url) for url in self.urls]
+        return sorted((node for node in nodes if node.available),
+                      key=lambda node: (not node.probe_due, node.score))
+
+    def request(self, request: Request) -> Response:
+        """
+        Raises:
+            XRPLRequestFailureException: if no node returned a response
+            httpx.TimeoutException, httpx.NetworkError: if no node could
+            be reached in time
+        """
+        deadline = monotonic() + self.deadline
+        error = None
+        nodes = self.rank()
+        forced = not nodes
+        if forced:
+            nodes = [min((health.get(url) for url in self.urls),
+                         key=lambda node: node.opened_at)]
+        for node in nodes:
+            remaining = deadline - monotonic()
+            if remaining <= 0:
+                break
+            # another request may have claimed the probe meanwhile
+            if not forced and not node.acquire():
+                continue
+            started = monotonic()
+            try:
+                response = get_client(node.url).request(
+                    request,
+                    timeout=min(remaining, settings.XRPL_HTTP_TIMEOUT),
+                )
+            except (TimeoutException, NetworkError,
+                    XRPLRequestFailureException) as exc:
+                node.record_failure(monotonic() - started)
+                logger.info(f"XRPL node {node.url} failed: {exc!r}")
+                error = exc
+                continue
+            if response.result.get("error") in NODE_ERRORS:
+                node.record_failure(monotonic() - started)
+                logger.info(f"XRPL node {node.url} failed: "
+                            f"{response.result['error']}")
+                error = XRPLRequestFailureException(response.result)
+                continue
+            node.record_success(monotonic() - started)
+            return response
+        if error is None:
+            raise TimeoutException(
+                f"No XRPL node answered in {self.deadline}s", request=None
+            )
+        raise error
+
+    async def request_impl(self, request: Request) -> Response:
+        return await asyncio.to_thread(self.request, request)
+
+
+def get_node_pool() -> NodePool:
+    """Client of the XRPL nodes configured by the `XRPL_NODES` setting."""
+    return NodePool(settings.XRPL_NODES)
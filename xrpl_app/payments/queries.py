@@ -1,64 +1,150 @@
 import logging
-from functools import lru_cache
+from abc import ABC, abstractmethod
 from typing import Dict, Tuple
 
+from django.conf import settings
+from django.db import IntegrityError, connection, models, transaction
 from django.db.models import QuerySet
 
+from xrpl_app.cache import (
+    ACCOUNTS_TAG,
+    ASSETS_TAG,
+    PAYMENTS_TAG,
+    account_tag,
+    currency_tag,
+    invalidate_on_commit,
+)
 from xrpl_app.models import AssetInfo, PaymentTransaction, XRPLAccount
 
-from .data import Amount, XRPTransaction
+from .data import Amount, Payment, is_successful_payment
+from .keycache import KeyCache
+from .loader import get_loader
 
 logger = logging.getLogger(__name__)
 
 
-class AccountsQuery:
-    model = XRPLAccount
+class NaturalKeysQuery(ABC):
+    """
+    Resolve primary keys of rows by their natural keys (`key_fields`),
+    creating the rows which don't exist yet.
+    """
+
+    model = None
+    key_fields = ()
+    # natural key -> pk of rows stored by this process
+    known: KeyCache = None
 
     def __init__(self):
         self.cache = {}
+        # keys of the last batch resolved by the process cache
+        self.reused = set()
+        self.created = set()
+        self.loader = get_loader(self.model, self.key_fields)
 
-    def setup_cache(self, accounts: set) -> None:
+    def setup_cache(self, keys: set) -> None:
         """
-        Select already exist accounts, create new accountsand put them
-        into cache.
+        Resolve primary keys of all rows of a batch: the ones known by
+        the process, then the others with a single query, and create those
+        that don't exist yet with a single insert.
         Args:
-            accounts: all accounts hashes from successful payments
+            keys: natural keys from successful payments
 
         Returns:
             None
         """
-        exists_accounts_set = self.model.objects.filter(hash__in=accounts)
-        self.cache = {obj.hash: obj for obj in exists_accounts_set}
-        isnt_exists_accounts = accounts - set(self.cache)
-        if isnt_exists_accounts:
-            new_accounts = self.model.objects.bulk_create(
-                [XRPLAccount(hash=val) for val in isnt_exists_accounts]
+        self.cache = self.known.get_many(keys)
+        self.reused = set(self.cache)
+        missing = keys - self.reused
+        if not missing:
+            return
+        found = self.select(missing)
+        isnt_exists = missing - set(found)
+        if isnt_exists:
+            new_objs = self.loader.load([self.build(key)
+                                         for key in isnt_exists])
+            for obj in new_objs:
+                key = self.get_key(obj)
+                self.created.add(key)
+                found[key] = obj.pk
+            # rows skipped on conflict were created by another sync
+            found.update(self.select(isnt_exists - set(found)))
+        self.known.put_on_commit(found)
+        self.cache.update(found)
+
+    def forget(self) -> None:
+        """
+        Drop the keys of the last batch from the process cache, their rows
+        may have been deleted since they were cached.
+        """
+        self.known.discard_many(self.reused)
+        self.reused = set()
+
+    @abstractmethod
+    def select(self, keys: set) -> dict:
+        """Primary keys of the existing rows by their natural keys."""
+
+    @abstractmethod
+    def build(self, key) -> models.Model:
+        """Unsaved instance of the row with the natural key."""
+
+    @abstractmethod
+    def get_key(self, obj: models.Model):
+        """Natural key of the instance."""
+
+
+class AccountsQuery(NaturalKeysQuery):
+    model = XRPLAccount
+    key_fields = ("hash",)
+    known = KeyCache(settings.XRPL_ACCOUNT_CACHE_SIZE)
+
+    def select(self, accounts: set) -> dict:
+        if not accounts:
+            return {}
+        return dict(
+            self.model.objects.filter(hash__in=accounts).values_list(
+                "hash", "pk"
             )
-            for acc in new_accounts:
-                self.cache[acc.hash] = acc
-
-    def get_or_set(self, item: str) -> QuerySet[XRPLAccount]:
-        obj = self.cache.get(item)
-        if not obj:
-            source = self.model.objects.create(hash=item)
-            self.cache[item] = source
-        return obj
+        )
+
+    def build(self, key: str) -> XRPLAccount:
+        return XRPLAccount(hash=key)
+
+    def get_key(self, obj: XRPLAccount) -> str:
+        return obj.hash
 
+    def get_pk(self, item: str):
+        return self.cache[item]
 
-class AssetsQuery:
+
+class AssetsQuery(NaturalKeysQuery):
     model = AssetInfo
+    # (issuer pk, currency) pairs
+    key_fields = ("issuer", "currency")
+    known = KeyCache(settings.XRPL_ASSET_CACHE_SIZE)
 
-    @lru_cache
-    def get_asset_info(self, issuer: str | QuerySet[XRPLAccount],
-                       currency: str):
-        obj, _ = self.model.objects.get_or_create(issuer=issuer,
-                                                  currency=currency)
-        return obj
+    def select(self, assets: set) -> dict:
+        if not assets:
+            return {}
+        issuers = {issuer_id for issuer_id, _ in assets}
+        currencies = {currency for _, currency in assets}
+        rows = self.model.objects.filter(
+            issuer_id__in=issuers, currency__in=currencies
+        ).values_list("issuer_id", "currency", "pk")
+        return {
+            (issuer_id, currency): pk
+            for issuer_id, currency, pk in rows
+            if (issuer_id, currency) in assets
+        }
 
-    @lru_cache
-    def get_default_asset(self):
-        obj = self.model.get_default_asset()
-        return obj
+    def build(self, key: Tuple[int, str]) -> AssetInfo:
+        issuer_id, currency = key
+        return AssetInfo(issuer_id=issuer_id, currency=currency)
+
+    def get_key(self, obj: AssetInfo) -> Tuple[int, str]:
+        return obj.issuer_id, obj.currency
+
+    def get_pk(self, issuer_id, currency: str) -> int:
+        return self.cache[(issuer_id, currency)]
 
 
 class PaymentsQuery:
@@ -66,9 +152,12 @@ class PaymentsQuery:
         self.account_id = src
         self.accounts = AccountsQuery()
         self.assets = AssetsQuery()
+        # the primary key of the partitioned table, a transaction hash
+        # belongs to a single ledger
+        self.loader = get_loader(PaymentTransaction, ["hash", "ledger_idx"])
 
     @staticmethod
-    def parse_payments(payments: Dict[str, XRPTransaction]) -> Tuple[set, list]:
+    def parse_payments(payments: Dict[str, Payment]) -> Tuple[set, list]:
         """
         Collect info about accounts that already exist in DB.
         Collect new payments to store them in DB.
@@ -80,10 +169,14 @@ class PaymentsQuery:
             list: target payments
 
         """
+        ledgers = [payment.ledger_index for payment in payments.values()]
+        # the ledger range limits the lookup to the partitions of the batch
         exists_payments = set(
-            PaymentTransaction.objects.filter(hash__in=payments).values_list(
-                "hash", flat=True
-            )
+            PaymentTransaction.objects.filter(
+                hash__in=payments,
+                ledger_idx__range=(min(ledgers, default=0),
+                                   max(ledgers, default=0)),
+            ).values_list("hash", flat=True)
         )
         target_data, acc_hashes = [], set()
         for payment_hash, payment in payments.items():
@@ -91,9 +184,8 @@ class PaymentsQuery:
                 continue
             acc_hashes.add(payment.source)
             acc_hashes.add(payment.destination)
-            amount = payment.amount
-            if isinstance(amount, Amount):
-                acc_hashes.add(amount.issuer)
+            issuer, _ = PaymentsQuery.get_asset(payment)
+            acc_hashes.add(issuer)
             target_data.append(payment)
         return acc_hashes, target_data
 
@@ -112,16 +204,77 @@ class PaymentsQuery:
             f"Found {len(payments)} payments of {self.account_id}. "
             f"{len(target_data)} entries will be stored to DB."
         )
+        try:
+            with transaction.atomic():
+                obj = self.insert(acc_hashes, target_data)
+                if self.accounts.reused or self.assets.reused:
+                    # foreign keys are deferred, rows of cached keys which
+                    # were deleted meanwhile fail here instead of on commit
+                    connection.check_constraints()
+        except IntegrityError:
+            if not (self.accounts.reused or self.assets.reused):
+                raise
+            logger.warning("Cached keys of deleted rows, resolving again.")
+            self.accounts.forget()
+            self.assets.forget()
+            obj = self.insert(acc_hashes, target_data)
+        logger.debug(
+            f"Accounts cache: {AccountsQuery.known.hits} hits, "
+            f"{AccountsQuery.known.misses} misses. "
+            f"Assets cache: {AssetsQuery.known.hits} hits, "
+            f"{AssetsQuery.known.misses} misses."
+        )
+        invalidate_on_commit(self.get_cache_tags(target_data))
+        return obj
+
+    def insert(self, acc_hashes: set, target_data: list) -> list:
+        """
+        Resolve the accounts and assets of the payments, creating the
+        missing ones, and insert the payments.
+        Returns:
+            list: inserted payments
+        """
         self.accounts.setup_cache(acc_hashes)
+        self.assets.setup_cache(
+            {
+                (self.accounts.get_pk(issuer), currency)
+                for issuer, currency in map(self.get_asset, target_data)
+            }
+        )
         insert_data = []
         for payment in target_data:
             insert_obj = self.prepare_payment_query(payment)
             insert_data.append(insert_obj)
-        obj = PaymentTransaction.objects.bulk_create(insert_data)
-        return obj
+        return self.loader.load(insert_data)
+
+    def get_cache_tags(self, payments: list) -> set:
+        """
+        Tags of the cached responses which the stored payments change:
+        lists filtered by the involved accounts and currencies, and the
+        unfiltered lists of payments, accounts or assets if rows were added.
+        Args:
+            payments (list): stored payments
+
+        Returns:
+            set: cache tags
+        """
+        tags = set()
+        for payment in payments:
+            tags.add(account_tag(payment.source))
+            tags.add(account_tag(payment.destination))
+            issuer, currency = self.get_asset(payment)
+            tags.add(account_tag(issuer))
+            tags.add(currency_tag(currency))
+        if payments:
+            tags.add(PAYMENTS_TAG)
+        if self.accounts.created:
+            tags.add(ACCOUNTS_TAG)
+        if self.assets.created:
+            tags.add(ASSETS_TAG)
+        return tags
 
     @staticmethod
-    def filter_input_data(transactions: list) -> Dict[str, XRPTransaction]:
+    def filter_input_data(transactions: list) -> Dict[str, Payment]:
         """
 
         Args:
@@ -132,30 +285,37 @@ class PaymentsQuery:
         """
         payments = {}
         for elem in transactions:
-            elem = XRPTransaction(**elem)
-            if not (elem.is_successful and elem.is_validated
-                    and elem.is_it_payment):
+            # most of the history are offers, trust lines and failed
+            # transactions, drop them before building records
+            if not is_successful_payment(elem):
                 continue
-            payments[elem.hash] = elem
+            payment = Payment.from_transaction(elem)
+            payments[payment.hash] = payment
         return payments
 
-    def prepare_payment_query(self, payment: XRPTransaction) -> PaymentTransaction:
-        source = self.accounts.get_or_set(payment.source)
-        dest = self.accounts.get_or_set(payment.destination)
+    @staticmethod
+    def get_asset(payment: Payment) -> Tuple[str, str]:
+        """
+        Returns:
+            str: issuer hash of the payment amount
+            str: currency code of the payment amount
+        """
         amount = payment.amount
-        if isinstance(amount, str):
-            asset = self.assets.get_default_asset()
-        else:
-            issuer = self.accounts.get_or_set(amount.issuer)
-            asset = self.assets.get_asset_info(issuer, amount.currency)
+        if isinstance(amount, Amount):
+            return amount.issuer, amount.currency
+        return settings.DEFAULT_XRPL_ACCOUNT, settings.DEFAULT_XRPL_ASSET
+
+    def prepare_payment_query(self, payment: Payment) -> PaymentTransaction:
+        issuer, currency = self.get_asset(payment)
         obj = PaymentTransaction(
-            account=source,
-            destination=dest,
+            account_id=self.accounts.get_pk(payment.source),
+            destination_id=self.accounts.get_pk(payment.destination),
             ledger_idx=payment.ledger_index,
             destination_tag=payment.destination_tag,
             amount=payment.amount_value,
             hash=payment.hash,
             fee=payment.fee,
-            asset_info=asset,
+            asset_info_id=self.assets.get_pk(self.accounts.get_pk(issuer),
+                                             currency),
         )
         return obj
@@ -0,0 +1,216 @@
+import logging
+import time
+from typing import Any, Callable, Dict, List
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+from websockets.exceptions import WebSocketException
+from xrpl.asyncio.clients.exceptions import XRPLWebsocketException
+from xrpl.clients import WebsocketClient, XRPLRequestFailureException
+from xrpl.clients.sync_client import SyncClient
+from xrpl.models.requests import Subscribe
+
+from xrpl_app.models import AccountSyncState
+
+from .batch import BatchSync
+from .data import is_successful_payment
+from .queries import PaymentsQuery
+
+logger = logging.getLogger(__name__)
+
+MAX_RECONNECT_DELAY = 60.0
+CONNECTION_ERRORS = (OSError, WebSocketException, XRPLWebsocketException)
+
+
+def normalize_message(message: Dict[str, Any]) -> Dict[str, Any] | None:
+    """
+    Transaction stream message in the shape of an `account_tx` entry,
+    so it goes through the same parsing as synced histories.
+    https://xrpl.org/subscribe.html#transaction-streams
+
+    Returns:
+        dict: account_tx entry, None for other messages
+    """
+    if message.get("type") != "transaction":
+        return None
+    tx = message.get("transaction") or message.get("tx_json")
+    if not isinstance(tx, dict):
+        return None
+    tx = {**tx, "ledger_index": message.get("ledger_index")}
+    tx.setdefault("hash", message.get("hash"))
+    return {
+        "tx": tx,
+        "meta": message.get("meta"),
+        "validated": message.get("validated"),
+    }
+
+
+class AccountStream:
+    """
+    Live ingestion of the payments of watched accounts from an `accounts`
+    subscription of a rippled WebSocket.
+
+    Streamed payments are buffered and stored with one
+    `PaymentsQuery.save_data` call once `flush_size` of them are collected
+    or `flush_interval` seconds passed. On every connection the accounts
+    are subscribed first and then backfilled with `account_tx` from the
+    last stored ledger of each account, so payments validated while the
+    stream was down are not missed. Payments received by both ways are
+    skipped when stored.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        accounts: List[str],
+        client: SyncClient,
+        flush_size: int | None = None,
+        flush_interval: float | None = None,
+        reconnect_delay: float | None = None,
+        on_flush: Callable[["AccountStream"], None] | None = None,
+    ):
+        self.url = url
+        self.accounts = list(dict.fromkeys(accounts))
+        self.watched = set(self.accounts)
+        self.client = client
+        self.flush_size = flush_size or settings.XRPL_STREAM_FLUSH_SIZE
+        self.flush_interval = (flush_interval
+                               or settings.XRPL_STREAM_FLUSH_INTERVAL)
+        self.reconnect_delay = (reconnect_delay
+                                or settings.XRPL_STREAM_RECONNECT_DELAY)
+        self.on_flush = on_flush
+        self.query = PaymentsQuery(f"stream of {len(self.accounts)} accounts")
+        self.buffer = []
+        # last streamed ledger of each watched account in the buffer
+        self.ledgers: Dict[str, int] = {}
+        self.flushed_at = time.monotonic()
+        self.stopped = False
+        self.connections = 0
+        self.received = 0
+        self.stored = 0
+
+    def stop(self) -> None:
+        """Stop after the current wait for messages, buffer is flushed."""
+        self.stopped = True
+
+    def run(self) -> None:
+        """
+        Stream until `stop` is called, reconnecting on connection errors.
+
+        Raises:
+            XRPLRequestFailureException: if the subscription was rejected
+        """
+        delay = self.reconnect_delay
+        while not self.stopped:
+            try:
+                self.listen()
+            except CONNECTION_ERRORS as exc:
+                logger.warning(f"XRPL stream {self.url} failed: {exc!r}")
+            else:
+                delay = self.reconnect_delay
+            self.flush()
+            if self.stopped:
+                break
+            logger.info(f"Reconnecting to {self.url} in {delay}s.")
+            time.sleep(delay)
+            delay = min(delay * 2, MAX_RECONNECT_DELAY)
+
+    def listen(self) -> None:
+        """
+        Raises:
+            OSError, WebSocketException: if the node can't be reached
+            XRPLRequestFailureException: if the subscription was rejected
+        """
+        with WebsocketClient(self.url, timeout=self.flush_interval) as ws:
+            ws.send(Subscribe(accounts=self.accounts))
+            self.connections += 1
+            logger.info(f"Subscribed to {len(self.accounts)} accounts "
+                        f"at {self.url}.")
+            self.backfill()
+            # iteration ends when no message came within the interval
+            while ws.is_open() and not self.stopped:
+                for message in ws:
+                    self.handle(message)
+                    if self.is_due:
+                        self.flush()
+                    if self.stopped:
+                        break
+                if self.is_due:
+                    self.flush()
+        logger.info(f"XRPL stream {self.url} closed.")
+
+    def backfill(self) -> None:
+        """
+        Sync the accounts from their last stored ledgers up to now, streamed
+        messages wait in the queue of the connection meanwhile.
+        """
+        accounts = self.accounts
+        while accounts:
+            close_old_connections()
+            sync = BatchSync(self.client, accounts)
+            result = sync.run()
+            logger.info(f"Backfilled {result.stored} payments of "
+                        f"{len(accounts)} accounts.")
+            for account, item in sync.results.items():
+                if item["error"]:
+                    logger.warning(f"Backfill of {account} failed: "
+                                   f"{item['error']}")
+            accounts = [
+                account for account, item in sync.results.items()
+                if item["marker"] is not None and not item["error"]
+            ]
+
+    def handle(self, message: Dict[str, Any]) -> None:
+        if message.get("type") == "response":
+            if message.get("status") != "success":
+                raise XRPLRequestFailureException(message)
+            return
+        elem = normalize_message(message)
+        if elem is None or not is_successful_payment(elem):
+            return
+        self.received += 1
+        self.buffer.append(elem)
+        tx = elem["tx"]
+        for account in {tx.get("Account"), tx.get("Destination")}:
+            if account in self.watched:
+                self.ledgers[account] = max(self.ledgers.get(account, 0),
+                                            int(tx["ledger_index"]))
+
+    @property
+    def is_due(self) -> bool:
+        return len(self.buffer) >= self.flush_size or (
+            time.monotonic() - self.flushed_at >= self.flush_interval
+        )
+
+    def flush(self) -> None:
+        self.flushed_at = time.monotonic()
+        if not self.buffer:
+            return
+        transactions, ledgers = self.buffer, self.ledgers
+        self.buffer, self.ledgers = [], {}
+        close_old_connections()
+        with transaction.atomic():
+            objects = self.query.save_data(transactions)
+            self.update_states(ledgers)
+        self.stored += len(objects)
+        logger.info(f"Stored {len(objects)} of {len(transactions)} "
+                    f"streamed payments.")
+        if self.on_flush is not None:
+            self.on_flush(self)
+
+    @staticmethod
+    def update_states(ledgers: Dict[str, int]) -> None:
+        """
+        The stream delivers transactions in ledger order and the gap before
+        the subscription is backfilled, so the history of an account is
+        complete up to the ledger before its last streamed payment.
+        Accounts in the middle of a paged sync are left to it.
+        """
+        now = timezone.now()
+        for account, ledger_idx in ledgers.items():
+            AccountSyncState.objects.filter(
+                account__hash=account,
+                marker__isnull=True,
+                ledger_idx__lt=ledger_idx - 1,
+            ).update(ledger_idx=ledger_idx - 1, updated=now)
@@ -0,0 +1,115 @@
+import logging
+from typing import Any, Callable, NamedTuple
+
+from django.db import transaction
+from xrpl.clients import XRPLRequestFailureException
+from xrpl.clients.sync_client import SyncClient
+
+from xrpl_app.models import AccountSyncState, XRPLAccount
+
+from .fetcher import AccountTxFetcher
+from .queries import PaymentsQuery
+
+logger = logging.getLogger(__name__)
+
+# rippled rejects a ledger range when ledger_index_min is ahead of the last
+# validated ledger, i.e. there is nothing new since the previous sync
+LEDGER_RANGE_INVALID = "lgrIdxsInvalid"
+
+
+class SyncResult(NamedTuple):
+    account: str
+    pages: int
+    transactions: int
+    stored: int
+    marker: Any
+    ledger_idx: int | None
+
+
+class AccountSync:
+    """
+    Store the payments history of an account page by page.
+
+    Without an explicit ledger range the sync is incremental: the history
+    is requested in ascending order starting right after the last fully
+    stored ledger of the account, and an interrupted sync resumes from the
+    saved marker. The sync state is updated in the same transaction as the
+    payments of each page.
+    """
+
+    def __init__(
+        self,
+        client: SyncClient,
+        account: str,
+        ledger_index_min: int | None = None,
+        ledger_index_max: int | None = None,
+        max_pages: int | None = None,
+        on_page: Callable[["AccountSync"], None] | None = None,
+    ):
+        self.account = account
+        self.on_page = on_page
+        self.query = PaymentsQuery(account)
+        self.incremental = ledger_index_min is None and ledger_index_max is None
+        self.state = None
+        if self.incremental:
+            self.state = self.get_state()
+            ledger_index_min = self.state.ledger_index_min
+        self.fetcher = AccountTxFetcher(
+            client,
+            account,
+            ledger_index_min=ledger_index_min,
+            ledger_index_max=ledger_index_max,
+            marker=self.state.marker if self.state else None,
+            max_pages=max_pages,
+            forward=self.incremental,
+        )
+        self.transactions = 0
+        self.stored = 0
+
+    def get_state(self) -> AccountSyncState:
+        account, _ = XRPLAccount.objects.get_or_create(hash=self.account)
+        state, _ = AccountSyncState.objects.get_or_create(account=account)
+        return state
+
+    def run(self) -> SyncResult:
+        """
+        Returns:
+            SyncResult: counters of the sync and the marker to continue from
+            if the page budget was spent
+        Raises:
+            XRPLRequestFailureException: if the server rejected a request
+            httpx.TimeoutException, httpx.NetworkError: on connection issues
+        """
+        try:
+            for page in self.fetcher:
+                with transaction.atomic():
+                    objects = self.query.save_data(page.transactions)
+                    if self.state is not None:
+                        self.update_state(page.marker, page.ledger_index_max)
+                self.transactions += len(page.transactions)
+                self.stored += len(objects)
+                if self.on_page is not None:
+                    self.on_page(self)
+        except XRPLRequestFailureException as exc:
+            if not (self.incremental and exc.error == LEDGER_RANGE_INVALID):
+                raise
+            logger.info(f"No new ledgers for {self.account} since "
+                        f"{self.state.ledger_idx}.")
+        return self.result
+
+    @property
+    def result(self) -> SyncResult:
+        return SyncResult(
+            account=self.account,
+            pages=self.fetcher.pages,
+            transactions=self.transactions,
+            stored=self.stored,
+            marker=self.fetcher.marker,
+            ledger_idx=self.state.ledger_idx if self.state else None,
+        )
+
+    def update_state(self, marker: Any, ledger_index_max: int) -> None:
+        self.state.marker = marker
+        if marker is None:
+            self.state.ledger_idx = ledger_index_max
+        self.state.save()
@@ -0,0 +1,70 @@
+import csv
+import json
+from abc import ABC, abstractmethod
+from io import StringIO
+from itertools import islice
+from typing import Iterable, Iterator, Sequence
+
+from rest_framework.renderers import BaseRenderer
+
+
+class StreamRenderer(BaseRenderer, ABC):
+    """
+    Renderer of large row sets. `render_stream` encodes rows lazily in
+    chunks for `StreamingHttpResponse`, `render` handles regular
+    responses such as errors.
+    """
+
+    charset = "utf-8"
+    chunk_size = 1000
+
+    @abstractmethod
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        pass
+
+    @abstractmethod
+    def render_rows(self, columns: Sequence[str],
+                    rows: Sequence[tuple]) -> str:
+        pass
+
+    def render_header(self, columns: Sequence[str]) -> str:
+        return ""
+
+    def render_stream(self, columns: Sequence[str],
+                      rows: Iterable[tuple]) -> Iterator[bytes]:
+        header = self.render_header(columns)
+        if header:
+            yield header.encode(self.charset)
+        rows = iter(rows)
+        while chunk := list(islice(rows, self.chunk_size)):
+            yield self.render_rows(columns, chunk).encode(self.charset)
+
+
+class NDJSONRenderer(StreamRenderer):
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return (json.dumps(data) + "\n").encode(self.charset)
+
+    def render_rows(self, columns, rows):
+        dumps = json.dumps
+        return "".join(dumps(dict(zip(columns, row))) + "\n" for row in rows)
+
+
+class CSVRenderer(StreamRenderer):
+    media_type = "text/csv"
+    format = "csv"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, dict):
+            data = [(key, value) for key, value in data.items()]
+        return self.render_rows((), data or ()).encode(self.charset)
+
+    def render_header(self, columns):
+        return self.render_rows(columns, [columns])
+
+    def render_rows(self, columns, rows):
+        buffer = StringIO()
+        csv.writer(buffer).writerows(rows)
+        return buffer.getvalue()
@@ -1,13 +1,98 @@
 from collections import OrderedDict
 
+from django.conf import settings
 from rest_framework import serializers
 
 from xrpl_app import models
 
 
 class RequestLastPaymentsSerializer(serializers.Serializer):
-    url = serializers.URLField()
+    url = serializers.URLField(required=False)
     account = serializers.CharField(max_length=35)
+    max_pages = serializers.IntegerField(min_value=1, required=False)
+    ledger_index_min = serializers.IntegerField(min_value=0, required=False)
+    ledger_index_max = serializers.IntegerField(min_value=0, required=False)
+
+    def validate(self, attrs):
+        ledger_min = attrs.get("ledger_index_min")
+        ledger_max = attrs.get("ledger_index_max")
+        if None not in (ledger_min, ledger_max) and ledger_min > ledger_max:
+            raise serializers.ValidationError(
+                "ledger_index_min must not be greater than ledger_index_max"
+            )
+        return attrs
+
+
+class RequestBatchPaymentsSerializer(serializers.Serializer):
+    url = serializers.URLField(required=False)
+    accounts = serializers.ListField(
+        child=serializers.CharField(max_length=35),
+        min_length=1,
+        max_length=settings.XRPL_BATCH_MAX_ACCOUNTS,
+    )
+    max_pages = serializers.IntegerField(min_value=1, required=False)
+
+
+class PaymentValuesSerializer(serializers.BaseSerializer):
+    """
+    Read-only serializer of payment rows selected as dicts with
+    `values(*PaymentValuesSerializer.value_fields)`, renders the same
+    output as ListPaymentSerializer without model instances. Account
+    hashes are selected from the joined accounts rows.
+    """
+
+    value_fields = (
+        "hash",
+        "account__hash",
+        "destination__hash",
+        "asset_info__issuer__hash",
+        "asset_info__currency",
+        "ledger_idx",
+        "destination_tag",
+        "amount",
+        "fee",
+    )
+
+    def to_representation(self, instance):
+        return OrderedDict(
+            hash=instance["hash"],
+            account=instance["account__hash"],
+            destination=instance["destination__hash"],
+            asset_info=OrderedDict(
+                issuer=instance["asset_info__issuer__hash"],
+                currency=instance["asset_info__currency"],
+            ),
+            ledger_idx=instance["ledger_idx"],
+            destination_tag=instance["destination_tag"],
+            amount=models.format_amount(instance["amount"]),
+            fee=str(instance["fee"]),
+        )
+
+
+class PaymentJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = models.PaymentJob
+        fields = (
+            "id",
+            "status",
+            "account",
+            "accounts",
+            "url",
+            "ledger_index_min",
+            "ledger_index_max",
+            "max_pages",
+            "pages",
+            "transactions",
+            "stored",
+            "marker",
+            "ledger_idx",
+            "results",
+            "error",
+            "created",
+            "started",
+            "finished",
+        )
+        read_only_fields = fields
 
 
 class XRPLAccountSerializer(serializers.ModelSerializer):
@@ -15,8 +100,8 @@ class XRPLAccountSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = models.XRPLAccount
-        fields = "__all__"
-        read_only_fields = ("hash",)
+        fields = ("hash",)
+        read_only_fields = fields
 
 
 class AssetInfoSerializer(serializers.ModelSerializer):
@@ -29,35 +114,77 @@ class AssetInfoSerializer(serializers.ModelSerializer):
 
     def to_representation(self, instance):
         ret = super().to_representation(instance)
-        ret["issuer"] = instance.issuer_id
+        ret["issuer"] = instance.issuer.hash
         return ret
 
 
+class AmountField(serializers.DecimalField):
+    """Keeps the plain numeric string representation of amounts."""
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault("max_digits", models.AMOUNT_MAX_DIGITS)
+        kwargs.setdefault("decimal_places", models.AMOUNT_DECIMAL_PLACES)
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        return models.format_amount(value)
+
+
 class ListPaymentSerializer(serializers.ModelSerializer):
     account = XRPLAccountSerializer()
     destination = XRPLAccountSerializer()
     asset_info = AssetInfoSerializer()
+    amount = AmountField(read_only=True)
+    fee = serializers.CharField(read_only=True)
 
     class Meta:
         model = models.PaymentTransaction
-        fields = "__all__"
-        read_only_fields = (
+        fields = (
+            "hash",
             "account",
             "destination",
             "asset_info",
             "ledger_idx",
             "destination_tag",
-            "hash",
             "amount",
             "fee",
         )
+        read_only_fields = fields
 
     def to_representation(self, instance):
         ret = super().to_representation(instance)
-        ret["account"] = instance.account_id
-        ret["destination"] = instance.destination_id
+        ret["account"] = instance.account.hash
+        ret["destination"] = instance.destination.hash
         ret["asset_info"] = OrderedDict(
-            issuer=instance.asset_info.issuer_id,
+            issuer=instance.asset_info.issuer.hash,
             currency=instance.asset_info.currency
         )
         return ret
+
+
+class VolumeSerializer(serializers.Serializer):
+    issuer = serializers.CharField(max_length=35)
+    currency = serializers.CharField(max_length=40)
+    count = serializers.IntegerField()
+    total = AmountField()
+    min = AmountField()
+    max = AmountField()
+    avg = AmountField()
+
+
+class AccountVolumeSerializer(VolumeSerializer):
+    account = serializers.CharField(max_length=35, source="account_hash")
+
+
+class LedgerVolumeSerializer(VolumeSerializer):
+    ledger_from = serializers.IntegerField()
+    ledger_to = serializers.IntegerField()
+
+
+class RequestAccountVolumeSerializer(serializers.Serializer):
+    direction = serializers.ChoiceField(choices=("sent", "received"),
+                                        default="sent")
+
+
+class RequestLedgerVolumeSerializer(serializers.Serializer):
+    bucket = serializers.IntegerField(min_value=1, default=10_000)
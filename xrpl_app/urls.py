@@ -15,11 +15,17 @@ Including another URLconf
 """
 from rest_framework import routers
 
-from xrpl_app.views import AccountsViewSet, AssetsInfoViewSet, PaymentsViewSet
+from xrpl_app.views import (
+    AccountsViewSet,
+    AssetsInfoViewSet,
+    PaymentJobsViewSet,
+    PaymentsViewSet,
+)
 
 router = routers.SimpleRouter()
 router.register(r"payments", PaymentsViewSet)
 router.register(r"xrpl-accounts", AccountsViewSet)
 router.register(r"assets", AssetsInfoViewSet)
+router.register(r"payment-jobs", PaymentJobsViewSet)
 
 urlpatterns = router.urls
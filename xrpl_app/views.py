@@ -1,38 +1,62 @@
 import logging
 
-from django.db import transaction
+from django.conf import settings
+from django.db.models import (
+    Avg,
+    BigIntegerField,
+    Count,
+    ExpressionWrapper,
+    F,
+    Func,
+    Max,
+    Min,
+    Sum,
+    TextField,
+    Value,
+)
+from django.db.models.functions import Cast
+from django.http import StreamingHttpResponse
 from django_filters.rest_framework import DjangoFilterBackend
-from httpx import NetworkError, TimeoutException
 from rest_framework import mixins, permissions, viewsets
+from rest_framework.decorators import action
 from rest_framework.response import Response
-from xrpl.account import get_account_transactions
-from xrpl.clients import JsonRpcClient
+from rest_framework.reverse import reverse
 
-from xrpl_app import filters, models, serializers
-from xrpl_app.exceptions import XRPLServiceUnavailable
-from xrpl_app.payments import PaymentsQuery
+from xrpl_app import cache, filters, models, renderers, serializers
+from xrpl_app.mixins import CachedListMixin, ConditionalRetrieveMixin
+from xrpl_app.pagination import EstimatedCountPagination, PaymentsPagination
+from xrpl_app.payments import PaymentJobQueue
 
 logger = logging.getLogger(__name__)
 
 
-class AccountsViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
+class AccountsViewSet(CachedListMixin, viewsets.GenericViewSet):
     queryset = models.XRPLAccount.objects.all()
     serializer_class = serializers.XRPLAccountSerializer
     filter_backends = (DjangoFilterBackend,)
     filterset_class = filters.AccountsFilter
+    pagination_class = EstimatedCountPagination
+    etag_fields = ("hash",)
+    cache_tag = cache.ACCOUNTS_TAG
+    cache_tag_params = {"hash": cache.account_tag}
 
 
-class AssetsInfoViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
+class AssetsInfoViewSet(CachedListMixin, viewsets.GenericViewSet):
     queryset = models.AssetInfo.objects.select_related("issuer")
     serializer_class = serializers.AssetInfoSerializer
     filter_backends = (DjangoFilterBackend,)
     filterset_class = filters.AssetsFilter
+    cache_tag = cache.ASSETS_TAG
+    cache_tag_params = {
+        "issuer": cache.account_tag,
+        "currency": cache.currency_tag,
+    }
 
 
 class PaymentsViewSet(
-    mixins.RetrieveModelMixin,
+    ConditionalRetrieveMixin,
     mixins.CreateModelMixin,
-    mixins.ListModelMixin,
+    CachedListMixin,
     viewsets.GenericViewSet,
 ):
     queryset = models.PaymentTransaction.objects.select_related(
@@ -41,24 +65,181 @@ class PaymentsViewSet(
     filter_backends = (DjangoFilterBackend,)
     permission_classes = (permissions.AllowAny,)
     filterset_class = filters.PaymentsFilter
+    pagination_class = PaymentsPagination
+    # stored payments never change, the page keys identify its content
+    etag_fields = ("ledger_idx", "hash")
+    cache_tag = cache.PAYMENTS_TAG
+    cache_tag_params = {
+        "account": cache.account_tag,
+        "destination": cache.account_tag,
+        "issuer": cache.account_tag,
+        "currency": cache.currency_tag,
+    }
+
+    export_columns = {
+        "hash": F("hash"),
+        "account": F("account__hash"),
+        "destination": F("destination__hash"),
+        "issuer": F("asset_info__issuer__hash"),
+        "currency": F("asset_info__currency"),
+        "ledger_idx": F("ledger_idx"),
+        "destination_tag": F("destination_tag"),
+        # plain numeric strings are produced by PostgreSQL
+        "amount": Cast(Func(F("amount"), function="TRIM_SCALE"),
+                       output_field=TextField()),
+        "fee": Cast(F("fee"), output_field=TextField()),
+    }
+    volume_aggregates = {
+        "count": Count("hash"),
+        "total": Sum("amount"),
+        "min": Min("amount"),
+        "max": Max("amount"),
+        "avg": Avg("amount"),
+    }
+
+    def get_queryset(self):
+        if self.action == "list":
+            return models.PaymentTransaction.objects.values(
+                *serializers.PaymentValuesSerializer.value_fields
+            )
+        return super().get_queryset()
 
     def get_serializer_class(self):
         if self.action == "create":
             return serializers.RequestLastPaymentsSerializer
-        elif self.action in ["list", "retrieve"]:
+        elif self.action == "batch":
+            return serializers.RequestBatchPaymentsSerializer
+        elif self.action == "list":
+            return serializers.PaymentValuesSerializer
+        elif self.action == "retrieve":
             return serializers.ListPaymentSerializer
+        elif self.action == "volume_by_asset":
+            return serializers.VolumeSerializer
+        elif self.action == "volume_by_account":
+            return serializers.AccountVolumeSerializer
+        elif self.action == "volume_by_ledger":
+            return serializers.LedgerVolumeSerializer
+
+    def get_volume_response(self, **expressions):
+        """
+        Group filtered payments by asset and the given expressions, and
+        compute count, total, min, max and average of amounts in DB.
+        """
+        queryset = (
+            self.filter_queryset(models.PaymentTransaction.objects.all())
+            .values(
+                issuer=F("asset_info__issuer__hash"),
+                currency=F("asset_info__currency"),
+                **expressions,
+            )
+            .annotate(**self.volume_aggregates)
+            .order_by(*expressions, "issuer", "currency")
+        )
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    @action(
+        detail=False,
+        renderer_classes=(renderers.NDJSONRenderer, renderers.CSVRenderer),
+    )
+    def export(self, request, *args, **kwargs):
+        """
+        Stream all filtered payments as NDJSON or CSV. Rows are read from a
+        server-side cursor as tuples and encoded in chunks, so memory use
+        doesn't depend on the number of rows.
+        """
+        queryset = (
+            self.filter_queryset(models.PaymentTransaction.objects.all())
+            .order_by("-ledger_idx", "-hash")
+            .values_list(*self.export_columns.values())
+        )
+        rows = queryset.iterator(chunk_size=settings.EXPORT_CHUNK_SIZE)
+        renderer = request.accepted_renderer
+        response = StreamingHttpResponse(
+            renderer.render_stream(tuple(self.export_columns), rows),
+            content_type=f"{renderer.media_type}; charset={renderer.charset}",
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="payments.{renderer.format}"'
+        )
+        return response
+
+    @action(detail=False, url_path="volume/assets",
+            url_name="volume-assets")
+    def volume_by_asset(self, request, *args, **kwargs):
+        return self.get_volume_response()
+
+    @action(detail=False, url_path="volume/accounts",
+            url_name="volume-accounts")
+    def volume_by_account(self, request, *args, **kwargs):
+        params = serializers.RequestAccountVolumeSerializer(
+            data=request.query_params
+        )
+        params.is_valid(raise_exception=True)
+        if params.validated_data["direction"] == "sent":
+            account = F("account__hash")
+        else:
+            account = F("destination__hash")
+        return self.get_volume_response(account_hash=account)
+
+    @action(detail=False, url_path="volume/ledgers",
+            url_name="volume-ledgers")
+    def volume_by_ledger(self, request, *args, **kwargs):
+        params = serializers.RequestLedgerVolumeSerializer(
+            data=request.query_params
+        )
+        params.is_valid(raise_exception=True)
+        bucket = params.validated_data["bucket"]
+        ledger_from = ExpressionWrapper(
+            F("ledger_idx") / Value(bucket) * Value(bucket),
+            output_field=BigIntegerField(),
+        )
+        ledger_to = ExpressionWrapper(
+            ledger_from + Value(bucket - 1), output_field=BigIntegerField()
+        )
+        return self.get_volume_response(ledger_from=ledger_from,
+                                        ledger_to=ledger_to)
+
+    def get_job_response(self, job: models.PaymentJob) -> Response:
+        result = serializers.PaymentJobSerializer(instance=job)
+        headers = {
+            "Location": reverse("paymentjob-detail", args=[job.pk],
+                                request=self.request)
+        }
+        return Response(result.data, status=202, headers=headers)
 
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer_class()(data=request.data)
         serializer.is_valid(raise_exception=True)
-        data = serializer.data
-        client = JsonRpcClient(data["url"])
-        try:
-            trans_data = get_account_transactions(data["account"], client)
-        except (TimeoutException, NetworkError):
-            logger.exception("XRPL request error")
-            raise XRPLServiceUnavailable()
-        with transaction.atomic():
-            objects = PaymentsQuery(data["account"]).save_data(trans_data)
-        result = serializers.ListPaymentSerializer(instance=objects, many=True)
-        return Response(result.data, status=201)
+        data = serializer.validated_data
+        job = PaymentJobQueue().enqueue(
+            account=data["account"],
+            url=data.get("url", ""),
+            ledger_index_min=data.get("ledger_index_min"),
+            ledger_index_max=data.get("ledger_index_max"),
+            max_pages=data.get("max_pages"),
+        )
+        return self.get_job_response(job)
+
+    @action(detail=False, methods=["post"])
+    def batch(self, request, *args, **kwargs):
+        """
+        Queue an incremental sync of many accounts, their histories are
+        fetched concurrently and stored together.
+        """
+        serializer = self.get_serializer_class()(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        job = PaymentJobQueue().enqueue(
+            accounts=sorted(set(data["accounts"])),
+            url=data.get("url", ""),
+            max_pages=data.get("max_pages"),
+        )
+        return self.get_job_response(job)
+
+
+class PaymentJobsViewSet(mixins.RetrieveModelMixin, viewsets.GenericViewSet):
+    queryset = models.PaymentJob.objects.all()
+    serializer_class = serializers.PaymentJobSerializer
+    permission_classes = (permissions.AllowAny,)